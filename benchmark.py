@@ -0,0 +1,382 @@
+# Imports
+# Python
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+import argparse
+import json
+from multiprocessing import Pool
+import random
+import os
+import subprocess
+import sys
+import tempfile
+from time import perf_counter, process_time
+# Internal
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from disk_cache import DiskCache
+from letters_solver import LetterCountEngine
+from lexicon import load_lexicon
+from profanity_model import (
+    PROFANITY_SHARED_CACHE_SIZE,
+    CachedProfanityModel,
+    load_profanity_model
+)
+
+
+def current_rss_kb():
+    """
+    Return this process's resident set size in kB.
+    """
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+
+def lookup_sample(size=5000, seed=1):
+    """
+    Return a fixed sample of hit and miss lookup words.
+
+    Parameters
+    ----------
+    size : int
+        Number of words in the lexicon to sample. The same
+        number of reversed words, mostly misses, are added.
+    seed : int
+        Random seed so every storage mode sees the same words.
+
+    Returns
+    -------
+    list
+        Words to look up.
+    """
+    lexicon = load_lexicon()
+    rng = random.Random(seed)
+    hits = [lexicon.word(rng.randrange(len(lexicon))) for _ in range(size)]
+    return hits + [word[::-1] for word in hits]
+
+
+def measure_storage(storage, words):
+    """
+    Load one word membership store and measure it.
+
+    Runs in a fresh child process so each store's memory
+    is measured on its own.
+
+    Parameters
+    ----------
+    storage : string
+        'set' for the original word_set.py set, or 'mmap'
+        for the memory-mapped lexicon.
+    words : list
+        Words to look up.
+
+    Returns
+    -------
+    dict
+        Load time, RSS added by loading and after the
+        lookups, and mean lookup latency.
+    """
+    rss_before = current_rss_kb()
+    start_time = perf_counter()
+    if storage == 'set':
+        from word_set import word_set
+    else:
+        word_set = load_lexicon()
+    load_time = perf_counter() - start_time
+    rss_loaded = current_rss_kb()
+    start_time = perf_counter()
+    for word in words:
+        word in word_set
+    lookup_time = perf_counter() - start_time
+    return {
+        'storage': storage,
+        'load_ms': load_time * 1000,
+        'load_rss_kb': rss_loaded - rss_before,
+        'total_rss_kb': current_rss_kb() - rss_before,
+        'lookup_us': lookup_time / len(words) * 1e6,
+    }
+
+
+def storage_benchmark():
+    """
+    Compare memory and lookup latency of the original
+    word set against the memory-mapped lexicon.
+    """
+    words = lookup_sample()
+    results = []
+    for storage in ['set', 'mmap']:
+        output = subprocess.run(
+            [sys.executable, __file__, '--child', storage],
+            input=json.dumps(words),
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout
+        results.append(json.loads(output))
+    set_rss = results[0]['total_rss_kb']
+    print(
+        f'{"storage":<12}{"load ms":>10}{"RSS kB":>10}'
+        f'{"saving kB":>11}{"lookup us":>11}'
+    )
+    for result in results:
+        print(
+            f'{result["storage"]:<12}{result["load_ms"]:>10.1f}'
+            f'{result["total_rss_kb"]:>10}'
+            f'{set_rss - result["total_rss_kb"]:>11}'
+            f'{result["lookup_us"]:>11.1f}'
+        )
+
+
+# Letters round tile bag with the Scrabble weights the
+# Letters class draws vowels and consonants from
+TILE_BAG = (
+    'A' * 9 + 'E' * 12 + 'I' * 9 + 'O' * 8 + 'U' * 4
+    + 'BBCCDDDDFFGGGHHJKLLLLMMNNNNNNPPQRRRRRRSSSSTTTTTTVVWWXYYZ'
+)
+
+
+def random_racks(rack_size, count=20, seed=1):
+    """
+    Return racks drawn from the tile bag.
+
+    Parameters
+    ----------
+    rack_size : int
+        Tiles in each rack.
+    count : int
+        Number of racks.
+    seed : int
+        Random seed so every search sees the same racks.
+
+    Returns
+    -------
+    list
+        Racks as lists of letters.
+    """
+    rng = random.Random(seed)
+    return [rng.sample(TILE_BAG, rack_size) for _ in range(count)]
+
+
+def racks_benchmark():
+    """
+    Time the longest word search on 9, 12 and 15 tile
+    racks.
+
+    The letter count matrix does the same work for any
+    rack, so the time barely grows with the tiles.
+    """
+    engine = LetterCountEngine(load_lexicon())
+    print(f'{"tiles":<8}{"longest words":>14}')
+    for rack_size in [9, 12, 15]:
+        racks = random_racks(rack_size)
+        start_time = perf_counter()
+        for rack in racks:
+            engine.longest_words(rack)
+        timing = (perf_counter() - start_time) / len(racks)
+        print(f'{rack_size:<8}{timing * 1000:>12.1f}ms')
+
+
+def stream_benchmark():
+    """
+    Compare the time to the first dictionary corner word
+    with the time to find every word, on 9, 12 and 15
+    tile racks.
+    """
+    engine = LetterCountEngine(load_lexicon())
+    print(f'{"tiles":<8}{"first word":>14}{"all words":>14}')
+    for rack_size in [9, 12, 15]:
+        racks = random_racks(rack_size)
+        first_time = 0
+        total_time = 0
+        for rack in racks:
+            start_time = perf_counter()
+            words = engine.iter_words(rack)
+            next(words, None)
+            first_time += perf_counter() - start_time
+            for word in words:
+                pass
+            total_time += perf_counter() - start_time
+        print(
+            f'{rack_size:<8}{first_time / len(racks) * 1000:>12.1f}ms'
+            f'{total_time / len(racks) * 1000:>12.1f}ms'
+        )
+
+
+def profanity_benchmark(repeats=2000):
+    """
+    Compare scoring a phrase with the profanity model
+    against reading its score back from the in-memory
+    cache and from a cache on disk.
+    """
+    model = load_profanity_model()
+    cached = CachedProfanityModel(model)
+    phrases = [
+        'You are a bloody idiot', 'What the hell is this',
+        'good game everyone', 'the quick brown fox'
+    ]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        disk_cache = DiskCache(os.path.join(tmp_dir, 'profanity.sqlite'))
+        for phrase in phrases:
+            cached.predict_prob([phrase])
+            disk_cache.set(phrase.lower(), model.predict_prob([phrase])[0])
+        scorers = {
+            'model': model.predict_prob,
+            'memory': cached.predict_prob,
+            'disk': lambda texts: [disk_cache.get(texts[0].lower())],
+        }
+        print(''.join(f'{name:>14}' for name in scorers))
+        timings = []
+        for scorer in scorers.values():
+            start_time = perf_counter()
+            for _ in range(repeats):
+                for phrase in phrases:
+                    scorer([phrase])
+            timings.append(
+                (perf_counter() - start_time) / (repeats * len(phrases))
+            )
+    print(''.join(f'{timing * 1e6:>12.1f}us' for timing in timings))
+
+
+def session_phrases(model, count=3000, seed=1):
+    """
+    Return phrases of two to four vocabulary terms.
+
+    Parameters
+    ----------
+    model : object
+        ProfanityModel whose terms make up the phrases.
+    count : int
+        Number of phrases.
+    seed : int
+        Random seed so every mode sees the same phrases.
+
+    Returns
+    -------
+    list
+        Phrases, most often checked first.
+    """
+    rng = random.Random(seed)
+    terms = [term for term in list(model.terms)[:5000] if term.isalpha()]
+    return [
+        ' '.join(rng.sample(terms, rng.randint(2, 4))) for _ in range(count)
+    ]
+
+
+def profanity_session(args):
+    """
+    Check one session's phrases in a fresh game process.
+
+    Parameters
+    ----------
+    args : tuple
+        Mode, shared cache path, session seed and number
+        of checks.
+
+    Returns
+    -------
+    tuple
+        Wall and CPU seconds spent checking, and shared
+        cache hits and misses.
+    """
+    mode, cache_path, seed, checks = args
+    model = load_profanity_model()
+    phrases = session_phrases(model)
+    # Players repeat a few phrases far more than the rest
+    texts = random.Random(seed).choices(
+        phrases, [1 / (rank + 1) for rank in range(len(phrases))], k=checks
+    )
+    cache = None
+    if mode == 'shared':
+        cache = DiskCache(cache_path, PROFANITY_SHARED_CACHE_SIZE)
+    cached = CachedProfanityModel(model, cache)
+    predict_prob = model.predict_prob if mode == 'model' else (
+        cached.predict_prob
+    )
+    start_time = perf_counter()
+    start_cpu = process_time()
+    for text in texts:
+        predict_prob([text])
+    elapsed = (perf_counter() - start_time, process_time() - start_cpu)
+    if cache is None:
+        return elapsed + (0, 0)
+    cache.flush()
+    return elapsed + (cache.hits, cache.misses)
+
+
+def profanity_sessions_benchmark(processes=8, waves=10, checks=50):
+    """
+    Compare profanity checks in concurrent game sessions
+    scored by the model, from each process's memory, and
+    from memory in front of the cache shared by every
+    process.
+
+    Each session is a fresh process, as each player gets
+    their own run.py. The shared cache is run twice, from
+    empty and after a restart with the file kept, with
+    new sessions the second time.
+    """
+    runs = [
+        ('model', 'model'), ('memory', 'memory'),
+        ('shared', 'shared cold'), ('shared', 'shared warm')
+    ]
+    print(
+        f'{"mode":<14}{"wall":>12}{"CPU":>12}{"shared hits":>13}'
+    )
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache_path = os.path.join(tmp_dir, 'profanity.sqlite')
+        for run, (mode, name) in enumerate(runs):
+            first_seed = processes * waves * (run == len(runs) - 1)
+            sessions = [
+                (mode, cache_path, first_seed + session, checks)
+                for session in range(processes * waves)
+            ]
+            with Pool(processes, maxtasksperchild=1) as pool:
+                results = pool.map(profanity_session, sessions, chunksize=1)
+            wall, cpu, hits, misses = (sum(column) for column in zip(*results))
+            total = len(sessions) * checks
+            print(
+                f'{name:<14}{wall / total * 1e6:>10.1f}us'
+                f'{cpu / total * 1e6:>10.1f}us'
+                f'{hits / (hits + misses) if hits else 0:>13.0%}'
+            )
+
+
+# Benchmarks that can be run by name
+BENCHMARKS = {
+    'storage': storage_benchmark,
+    'racks': racks_benchmark,
+    'stream': stream_benchmark,
+    'profanity': profanity_benchmark,
+    'profanity_sessions': profanity_sessions_benchmark,
+}
+
+
+def main():
+    """
+    Run the requested benchmarks, or all of them.
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmark the Countdown game word searches.'
+    )
+    parser.add_argument(
+        'benchmarks',
+        nargs='*',
+        default=list(BENCHMARKS),
+        help=f'any of: {", ".join(BENCHMARKS)} (default: all)'
+    )
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        words = json.loads(sys.stdin.read())
+        print(json.dumps(measure_storage(args.child, words)))
+        return
+    for name in args.benchmarks:
+        if name not in BENCHMARKS:
+            parser.error(f'unknown benchmark {name!r}')
+    for name in args.benchmarks:
+        BENCHMARKS[name]()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,261 @@
+# Imports
+# Python
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+import argparse
+from functools import partial
+import os
+from time import time
+# Internal
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from conundrum_pool import build_conundrum_pool, conundrum_pool_path
+from dictionary import (
+    DEFINITIONS_PATH,
+    WORDNET_DIR,
+    WORDNET_URL,
+    build_definitions,
+    fetch_wordnet,
+    has_wordnet,
+    read_wordnet
+)
+from disk_cache import DiskCache
+from letters_solver import (
+    PREWARM_RACKS,
+    RACK_CACHE_PATH,
+    RACK_CACHE_SIZE,
+    LetterCountEngine,
+    likely_racks,
+    prewarm_rack_cache
+)
+from lexicon import (
+    LEXICONS,
+    Lexicon,
+    StaleArtifactError,
+    build_named_lexicon,
+    lexicon_path
+)
+from numbers_table import (
+    NUMBERS_TABLE_PATH,
+    build_numbers_table,
+    load_numbers_table
+)
+from profanity_flags import (
+    ProfanityFlags,
+    build_profanity_flags,
+    load_profanity_flags,
+    profanity_flags_path
+)
+from profanity_lists import (
+    build_profanity_lists,
+    load_profanity_lists,
+    profanity_lists_path
+)
+from profanity_model import PROFANITY_MODEL_PATH, export_profanity_model
+from word_frequency import (
+    WORD_FREQUENCY_PATH,
+    build_frequency_table,
+    frequency_path,
+    read_word_counts
+)
+
+
+def export_profanity_model_artifact():
+    """
+    Export alt-profanity-check's vectoriser and model so
+    game processes can score profanity without importing
+    scikit-learn.
+    """
+    term_count = export_profanity_model()
+    print(f'Wrote {term_count} profanity terms to {PROFANITY_MODEL_PATH}')
+
+
+def build_lexicon_artifact():
+    """
+    Compile each word list into its lexicon artifact and
+    verify its checksum.
+    """
+    for name in LEXICONS:
+        word_count = build_named_lexicon(name)
+        path = lexicon_path(name)
+        lexicon = Lexicon(path)
+        if not lexicon.verify():
+            raise SystemExit(f'Checksum mismatch in {path}')
+        print(
+            f'Wrote {word_count} {name} words to {path} '
+            f'(format v{lexicon.version}, '
+            f'sha256 {lexicon.checksum.hex()[:12]})'
+        )
+
+
+def prewarm_rack_cache_artifact():
+    """
+    Solve the nine tile racks the letters round draws most
+    often into the shared rack cache for each lexicon.
+    """
+    rack_cache = DiskCache(RACK_CACHE_PATH, RACK_CACHE_SIZE)
+    racks = likely_racks(PREWARM_RACKS)
+    print(
+        f'The {len(racks)} most likely racks are drawn in '
+        f'{sum(chance for rack, chance in racks):.2%} of letters rounds'
+    )
+    racks = [rack for rack, chance in racks]
+    for name in LEXICONS:
+        count = prewarm_rack_cache(
+            racks, LetterCountEngine(Lexicon(lexicon_path(name))), rack_cache
+        )
+        print(f'Solved {count} {name} racks into {RACK_CACHE_PATH}')
+    print(f'{rack_cache.stats()["entries"]} rack cache entries')
+
+
+def build_definitions_artifact():
+    """
+    Build the local definitions store from the WordNet
+    database files in WORDNET_DIR, fetching the pinned
+    WordNet release first if they aren't there.
+
+    The game only works offline with the store, so the
+    build fails if it can't be made.
+    """
+    if not has_wordnet(WORDNET_DIR):
+        try:
+            count = fetch_wordnet(WORDNET_DIR)
+        except (OSError, ValueError) as e:
+            raise SystemExit(
+                f'Could not fetch WordNet from {WORDNET_URL}: {e}'
+            )
+        print(f'Fetched {count} WordNet files into {WORDNET_DIR}')
+    count = build_definitions(read_wordnet(WORDNET_DIR))
+    if not count:
+        raise SystemExit(f'No definitions found in {WORDNET_DIR}')
+    print(f'Wrote {count} definitions to {DEFINITIONS_PATH}')
+
+
+def build_frequency_artifact():
+    """
+    Build each lexicon's word familiarity table from the
+    word frequency list shipped with the game.
+    """
+    if not os.path.exists(WORD_FREQUENCY_PATH):
+        raise SystemExit(f'No word frequency list at {WORD_FREQUENCY_PATH}')
+    counts = read_word_counts(WORD_FREQUENCY_PATH)
+    if not counts:
+        raise SystemExit(f'No word frequencies found in {WORD_FREQUENCY_PATH}')
+    for name in LEXICONS:
+        path = frequency_path(name)
+        known = build_frequency_table(
+            Lexicon(lexicon_path(name)), counts, path
+        )
+        print(
+            f'Wrote {known} {name} word frequencies from '
+            f'{WORD_FREQUENCY_PATH} to {path}'
+        )
+
+
+def build_conundrum_artifact():
+    """
+    Build each lexicon's pool of unique answer conundrum
+    words and their scrambles.
+    """
+    for name in LEXICONS:
+        path = conundrum_pool_path(name)
+        count = build_conundrum_pool(Lexicon(lexicon_path(name)), path)
+        print(f'Wrote {count} {name} conundrums to {path}')
+
+
+def build_profanity_artifact():
+    """
+    Score every word in each lexicon with the profanity
+    model once and store the results as a bitmap, and as
+    the blocklist and allowlist used to check player input.
+    """
+    for name in LEXICONS:
+        path = profanity_flags_path(name)
+        lexicon = Lexicon(lexicon_path(name))
+        flagged = build_profanity_flags(lexicon, path)
+        print(f'Wrote {flagged} {name} profanity flags to {path}')
+        lists_path = profanity_lists_path(name)
+        blocked, allowed = build_profanity_lists(
+            lexicon, ProfanityFlags(path, lexicon), lists_path
+        )
+        print(
+            f'Wrote a {blocked} word blocklist and {allowed} word '
+            f'allowlist to {lists_path}'
+        )
+
+
+def build_numbers_table_artifact():
+    """
+    Solve every numbers round draw for every target.
+    """
+    draws = build_numbers_table()
+    print(f'Wrote {draws} solved numbers draws to {NUMBERS_TABLE_PATH}')
+
+
+def check_artifacts():
+    """
+    Check every built artifact the game maps can be used,
+    so a stale artifact left by a partial build fails the
+    build instead of the game.
+
+    Raises
+    ------
+    SystemExit
+        If any artifact is stale.
+    """
+    checks = [load_numbers_table]
+    for name in LEXICONS:
+        if os.path.exists(lexicon_path(name)):
+            lexicon = Lexicon(lexicon_path(name))
+            checks.append(partial(load_profanity_flags, lexicon, name))
+            checks.append(partial(load_profanity_lists, lexicon, name))
+    stale = []
+    for check in checks:
+        try:
+            check()
+        except StaleArtifactError as e:
+            stale.append(str(e))
+    if stale:
+        raise SystemExit('\n'.join(stale))
+
+
+# Build steps in the order they must run
+ARTIFACTS = {
+    'profanity_model': export_profanity_model_artifact,
+    'lexicon': build_lexicon_artifact,
+    'rack_cache': prewarm_rack_cache_artifact,
+    'definitions': build_definitions_artifact,
+    'frequency': build_frequency_artifact,
+    'conundrums': build_conundrum_artifact,
+    'profanity': build_profanity_artifact,
+    'numbers': build_numbers_table_artifact,
+}
+
+
+def main():
+    """
+    Build the requested data artifacts, or all of them.
+
+    Run once at deploy time by bin/post_compile so game
+    sessions only ever map prebuilt files.
+    """
+    parser = argparse.ArgumentParser(
+        description='Build the Countdown game data artifacts.'
+    )
+    parser.add_argument(
+        'artifacts',
+        nargs='*',
+        default=list(ARTIFACTS),
+        help=f'any of: {", ".join(ARTIFACTS)} (default: all)'
+    )
+    args = parser.parse_args()
+    for name in args.artifacts:
+        if name not in ARTIFACTS:
+            parser.error(f'unknown artifact {name!r}')
+    for name in args.artifacts:
+        start_time = time()
+        ARTIFACTS[name]()
+        print(f'Built {name} in {time() - start_time:.1f}s')
+    check_artifacts()
+
+
+if __name__ == '__main__':
+    main()
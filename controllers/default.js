@@ -1,6 +1,10 @@
 const Pty = require('node-pty');
 const fs = require('fs');
 
+// Word lists a session can pick with the lexicon query
+// parameter, as listed in lexicon.py LEXICONS
+const LEXICONS = ['scrabble', 'countdown', 'family'];
+
 exports.install = function () {
 
     ROUTE('/');
@@ -15,13 +19,20 @@ function socket() {
 
     this.on('open', function (client) {
 
+        // Each session gets its own copy of the environment so
+        // its word list choice doesn't leak into other sessions
+        var env = Object.assign({}, process.env);
+        if (LEXICONS.indexOf(client.query.lexicon) !== -1) {
+            env.LEXICON = client.query.lexicon;
+        }
+
         // Spawn terminal
         client.tty = Pty.spawn('python3', ['run.py'], {
             name: 'xterm-color',
             cols: 80,
             rows: 24,
             cwd: process.env.PWD,
-            env: process.env
+            env: env
         });
 
         client.tty.on('exit', function (code, signal) {
@@ -38,8 +49,18 @@ function socket() {
 
     this.on('close', function (client) {
         if (client.tty) {
-            client.tty.kill(9);
+            var tty = client.tty;
             client.tty = null;
+            // Hang up so the game can write its cache counts
+            // before exiting, and kill it if it hasn't
+            tty.kill('SIGHUP');
+            setTimeout(function () {
+                try {
+                    tty.kill('SIGKILL');
+                } catch (err) {
+                    // Already exited
+                }
+            }, 2000);
             console.log("Process killed and terminal unloaded");
         }
     });
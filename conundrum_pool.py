@@ -0,0 +1,317 @@
+# Imports
+# Python
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+import mmap
+import os
+import random
+import struct
+# Internal
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from lexicon import (
+    DATA_DIR,
+    DEFAULT_LEXICON,
+    LEXICONS,
+    read_section_table,
+    write_artifact
+)
+# Third Party
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+import numpy as np
+
+# Letters in a conundrum
+CONUNDRUM_LENGTH = 9
+# Scrambles stored for each conundrum word
+SCRAMBLES_PER_WORD = 4
+# Fixed seed so rebuilding the pool gives the same scrambles
+POOL_SEED = 9
+# word count and scrambles per word of a conundrum pool
+POOL_META = struct.Struct('<II')
+# Sections every conundrum pool must contain
+POOL_SECTIONS = ('cpmeta', 'cpsum', 'cpwords', 'cpscram')
+# Format version of conundrum pool artifacts
+POOL_VERSION = 6
+
+
+class ConundrumPool:
+    """
+    Memory-mapped table of conundrum words and scrambles.
+
+    Holds every nine letter word in a lexicon that is the
+    only word spelt with its letters, so a conundrum always
+    has exactly one answer, and for each word several
+    scrambles that aren't words themselves. Each row is a
+    fixed size so a conundrum is sampled in constant time.
+
+    Attributes
+    ----------
+    path : string
+        Path to the conundrum pool artifact.
+    word_ids : ndarray
+        uint32 lexicon word id of each conundrum word.
+    scrambles_per_word : int
+        Number of scrambles stored for each word.
+
+    Methods
+    -------
+    word(index)
+        Return the conundrum word at a pool index.
+    scramble(index, choice)
+        Return one of the stored scrambles of a word.
+    familiar_indexes(scores=None, minimum=1)
+        Return the pool indexes of familiar words.
+    sample(indexes=None, rng=random)
+        Return a random conundrum word and scramble.
+    """
+    def __init__(self, path, lexicon):
+        self.path = path
+        self.lexicon = lexicon
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        version, checksum, sections = read_section_table(
+            self._mmap, path, POOL_SECTIONS, POOL_VERSION
+        )
+        offset, length = sections['cpsum']
+        if self._mmap[offset:offset + length] != lexicon.word_checksum:
+            raise ValueError(f'{path} was built for a different lexicon')
+        count, self.scrambles_per_word = POOL_META.unpack_from(
+            self._mmap, sections['cpmeta'][0]
+        )
+        self.word_ids = np.frombuffer(
+            self._mmap, dtype=np.uint32, count=count,
+            offset=sections['cpwords'][0]
+        )
+        self._scrambles_start = sections['cpscram'][0]
+
+    def __len__(self):
+        return len(self.word_ids)
+
+    def word(self, index):
+        """
+        Return the conundrum word at a pool index.
+        """
+        return self.lexicon.word(int(self.word_ids[index]))
+
+    def scramble(self, index, choice):
+        """
+        Return one of the stored scrambles of a word.
+
+        Parameters
+        ----------
+        index : int
+            Position of the word in the pool.
+        choice : int
+            Which of the word's scrambles to return.
+
+        Returns
+        -------
+        string
+            Scrambled letters.
+        """
+        start = self._scrambles_start + CONUNDRUM_LENGTH * (
+            index * self.scrambles_per_word + choice
+        )
+        return self._mmap[start:start + CONUNDRUM_LENGTH].decode('ascii')
+
+    def familiar_indexes(self, scores=None, minimum=1):
+        """
+        Return the pool indexes of familiar words.
+
+        Words in the lexicon's curated list of common nine
+        letter words are always familiar, and so are words
+        scoring at least minimum when scores are given.
+
+        Parameters
+        ----------
+        scores : ndarray
+            Familiarity score by word id, or None to use the
+            curated list alone.
+        minimum : int
+            Lowest familiarity score kept.
+
+        Returns
+        -------
+        ndarray or None
+            Pool indexes, or None if no word is familiar
+            so the whole pool is used.
+        """
+        curated = np.asarray(
+            self.lexicon.nine_letter_words.word_ids, dtype=np.uint32
+        )
+        familiar = np.isin(self.word_ids, curated)
+        if scores is not None:
+            familiar |= scores[self.word_ids] >= minimum
+        indexes = np.flatnonzero(familiar)
+        return indexes if len(indexes) else None
+
+    def sample(self, indexes=None, rng=random):
+        """
+        Return a random conundrum word and scramble.
+
+        Parameters
+        ----------
+        indexes : sequence
+            Pool indexes to choose from, every word if None.
+        rng : object
+            Random number generator.
+
+        Returns
+        -------
+        word : string
+            Conundrum answer.
+        scrambled : string
+            Scrambled letters shown to the player.
+        """
+        if indexes is None:
+            index = rng.randrange(len(self))
+        else:
+            index = int(indexes[rng.randrange(len(indexes))])
+        choice = rng.randrange(self.scrambles_per_word)
+        return self.word(index), self.scramble(index, choice)
+
+
+def conundrum_pool_path(name=DEFAULT_LEXICON):
+    """
+    Return the conundrum pool path of a named lexicon.
+
+    Parameters
+    ----------
+    name : string
+        One of LEXICONS.
+
+    Returns
+    -------
+    string
+        Path of the artifact.
+    """
+    if name not in LEXICONS:
+        raise ValueError(f'LEXICON must be one of {", ".join(LEXICONS)}')
+    return os.path.join(DATA_DIR, f'conundrums_{name}.bin')
+
+
+def unique_answer_words(lexicon, length=CONUNDRUM_LENGTH):
+    """
+    Return the ids of the words of a length that are the
+    only word spelt with their letters.
+
+    Parameters
+    ----------
+    lexicon : object
+        Lexicon with an anagram index.
+    length : int
+        Word length.
+
+    Returns
+    -------
+    list
+        Word ids in sorted word order.
+    """
+    offsets = np.frombuffer(lexicon.section('offsets'), dtype=np.uint32)
+    lengths = np.diff(offsets.astype(np.int32))
+    return [
+        int(word_id) for word_id in np.flatnonzero(lengths == length)
+        if len(lexicon.anagrams(lexicon.word(int(word_id)))) == 1
+    ]
+
+
+def scrambles(word, lexicon, count, rng):
+    """
+    Return distinct scrambles of a word that aren't words.
+
+    Parameters
+    ----------
+    word : string
+        Word to scramble.
+    lexicon : object
+        Lexicon the scrambles must not be words in.
+    count : int
+        Number of scrambles wanted.
+    rng : object
+        Random number generator.
+
+    Returns
+    -------
+    list
+        Scrambles, repeating earlier ones if the word has
+        too few distinct arrangements.
+    """
+    found = []
+    letters = list(word)
+    for attempt in range(count * 20):
+        rng.shuffle(letters)
+        scrambled = ''.join(letters)
+        if scrambled not in found and scrambled not in lexicon:
+            found.append(scrambled)
+            if len(found) == count:
+                break
+    distinct = list(found)
+    while distinct and len(found) < count:
+        found.append(distinct[len(found) % len(distinct)])
+    return found
+
+
+def build_conundrum_pool(
+    lexicon, path, scrambles_per_word=SCRAMBLES_PER_WORD, seed=POOL_SEED
+):
+    """
+    Write every conundrum word in a lexicon and its
+    scrambles to a conundrum pool artifact.
+
+    Parameters
+    ----------
+    lexicon : object
+        Lexicon the conundrum words come from.
+    path : string
+        Destination path of the artifact.
+    scrambles_per_word : int
+        Number of scrambles stored for each word.
+    seed : int
+        Random seed for the scrambles.
+
+    Returns
+    -------
+    count : int
+        Number of conundrum words written.
+    """
+    rng = random.Random(seed)
+    word_ids = []
+    scrambled = []
+    for word_id in unique_answer_words(lexicon):
+        word_scrambles = scrambles(
+            lexicon.word(word_id), lexicon, scrambles_per_word, rng
+        )
+        # Skip words whose every arrangement is a word
+        if word_scrambles:
+            word_ids.append(word_id)
+            scrambled.extend(word_scrambles)
+    write_artifact(path, {
+        'cpmeta': POOL_META.pack(len(word_ids), scrambles_per_word),
+        'cpsum': lexicon.word_checksum,
+        'cpwords': np.array(word_ids, dtype=np.uint32).tobytes(),
+        'cpscram': ''.join(scrambled).encode('ascii'),
+    }, POOL_VERSION)
+    return len(word_ids)
+
+
+def load_conundrum_pool(lexicon, name=DEFAULT_LEXICON):
+    """
+    Map a lexicon's conundrum pool, building it first if
+    it is missing or was built for another lexicon.
+
+    Parameters
+    ----------
+    lexicon : object
+        Lexicon the conundrum words come from.
+    name : string
+        One of LEXICONS.
+
+    Returns
+    -------
+    object
+        ConundrumPool instance.
+    """
+    path = conundrum_pool_path(name)
+    try:
+        return ConundrumPool(path, lexicon)
+    except (OSError, ValueError):
+        build_conundrum_pool(lexicon, path)
+        return ConundrumPool(path, lexicon)
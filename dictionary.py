@@ -0,0 +1,536 @@
+# Imports
+# Python
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from hashlib import sha256
+import io
+import os
+import queue
+import re
+import sqlite3
+import tarfile
+import threading
+from time import monotonic
+from urllib.request import urlopen
+# Internal
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from disk_cache import MISSING, DiskCache
+from lexicon import DATA_DIR
+
+# Bundled definitions store built from WordNet
+DEFINITIONS_PATH = os.path.join(DATA_DIR, 'definitions.sqlite')
+# WordNet database files used to build the store
+WORDNET_DIR = os.environ.get('WORDNET_DIR', os.path.join(DATA_DIR, 'wordnet'))
+# Pinned WordNet 3.0 database files, fetched at build time
+# from the source release of the wn package on PyPI
+WORDNET_URL = (
+    'https://files.pythonhosted.org/packages/bc/f6/'
+    '72db36e8afc977ae1a1cbb22afc77fd9b514e9bc6927ae8f4aae36665961/'
+    'wn-0.0.23.tar.gz'
+)
+WORDNET_SHA256 = (
+    'eee5b09a346600d2e33d6e69113a530283bbb422f04f9af6b277f2ca4ad514bd'
+)
+WORDNET_ARCHIVE_DIR = 'wn-0.0.23/wn/data/wordnet-3.0/'
+# Shared cache of remote dictionary lookups
+DICTIONARY_CACHE_PATH = os.path.join(DATA_DIR, 'dictionary_cache.sqlite')
+DICTIONARY_CACHE_SIZE = 50000
+# Found meanings rarely change, but a word not found may
+# have been a network failure so is retried sooner
+DICTIONARY_CACHE_TTL = 30 * 24 * 60 * 60
+DICTIONARY_CACHE_NEGATIVE_TTL = 24 * 60 * 60
+# Seconds a remote lookup may take before the dictionary
+# is reported unavailable
+DICTIONARY_DEADLINE = float(os.environ.get('DICTIONARY_DEADLINE', 3))
+# Seconds after which a second, hedged, request is sent if
+# the first hasn't answered, unset to never hedge
+DICTIONARY_HEDGE_AFTER = os.environ.get('DICTIONARY_HEDGE_AFTER')
+# Slow lookups in a row before lookups fail fast, and the
+# seconds before the remote dictionary is tried again
+DICTIONARY_FAILURE_LIMIT = 3
+DICTIONARY_RETRY_AFTER = 60
+
+# WordNet file suffixes and the part of speech headings
+# PyDictionary returns for them, in PyDictionary's order
+WORDNET_PARTS_OF_SPEECH = {
+    'noun': 'Noun',
+    'verb': 'Verb',
+    'adj': 'Adjective',
+    'adv': 'Adverb',
+}
+# WordNet database files read_wordnet reads
+WORDNET_FILES = tuple(
+    f'{kind}.{suffix}'
+    for suffix in WORDNET_PARTS_OF_SPEECH
+    for kind in ('index', 'data')
+)
+
+
+class DictionaryUnavailable(Exception):
+    """
+    Raised when the dictionary can't answer in time.
+    """
+
+
+class DictionaryProvider:
+    """
+    Looks up word meanings for the game.
+
+    Subclasses return meanings in the shape PyDictionary
+    uses, a dict of part of speech headings mapped to
+    lists of definitions, or None if the word isn't found.
+
+    Methods
+    -------
+    meaning(word)
+        Return the meanings of word or None.
+    """
+    name = 'base'
+
+    def meaning(self, word):
+        """
+        Return the meanings of word or None.
+
+        Parameters
+        ----------
+        word : string
+            Lowercase word to look up.
+
+        Returns
+        -------
+        dict or None
+            Part of speech headings mapped to lists of
+            definitions.
+        """
+        raise NotImplementedError
+
+
+class PyDictionaryProvider(DictionaryProvider):
+    """
+    Looks up word meanings by scraping WordNet's website
+    through PyDictionary.
+    """
+    name = 'pydictionary'
+
+    def __init__(self):
+        # Only remote lookups need PyDictionary
+        from PyDictionary import PyDictionary
+        self.dictionary = PyDictionary()
+
+    def meaning(self, word):
+        try:
+            return self.dictionary.meaning(word, disable_errors=True) or None
+        except IndexError:
+            return None
+
+
+class LocalDictionaryProvider(DictionaryProvider):
+    """
+    Looks up word meanings in the bundled SQLite
+    definitions store so the game works offline.
+
+    Attributes
+    ----------
+    path : string
+        Path to the SQLite definitions store.
+    """
+    name = 'local'
+
+    def __init__(self, path=DEFINITIONS_PATH):
+        self.path = path
+        # Open read-only so a missing store raises instead
+        # of creating an empty one
+        self._db = sqlite3.connect(
+            f'file:{path}?mode=ro', uri=True, check_same_thread=False
+        )
+
+    def meaning(self, word):
+        rows = self._db.execute(
+            'SELECT part_of_speech, meaning FROM definitions '
+            'WHERE word = ? ORDER BY rowid',
+            (word.lower(),)
+        ).fetchall()
+        if not rows:
+            return None
+        meanings = {}
+        for part_of_speech, meaning in rows:
+            meanings.setdefault(part_of_speech, []).append(meaning)
+        return meanings
+
+
+class InMemoryDictionaryProvider(DictionaryProvider):
+    """
+    Looks up word meanings in a dict, for tests.
+
+    Attributes
+    ----------
+    definitions : dict
+        Lowercase words mapped to their meanings.
+    lookups : list
+        Every word looked up, in order.
+    """
+    name = 'memory'
+
+    def __init__(self, definitions=None):
+        self.definitions = definitions or {}
+        self.lookups = []
+
+    def meaning(self, word):
+        self.lookups.append(word)
+        return self.definitions.get(word.lower())
+
+
+class CachedDictionaryProvider(DictionaryProvider):
+    """
+    Looks up word meanings through another provider,
+    keeping every result, including words not found, in a
+    cache shared by all game processes.
+
+    Attributes
+    ----------
+    provider : object
+        DictionaryProvider the meanings come from.
+    cache : object
+        DiskCache the meanings are kept in.
+    negative_ttl : float
+        Seconds a word not found is cached for.
+
+    Methods
+    -------
+    stats()
+        Return the cache's hit, miss and size counts.
+    """
+    def __init__(
+        self, provider, cache, negative_ttl=DICTIONARY_CACHE_NEGATIVE_TTL
+    ):
+        self.provider = provider
+        self.cache = cache
+        self.negative_ttl = negative_ttl
+        self.name = provider.name
+
+    def meaning(self, word):
+        word = word.lower()
+        key = f'{self.provider.name}:{word}'
+        meanings = self.cache.get(key, MISSING)
+        if meanings is MISSING:
+            meanings = self.provider.meaning(word)
+            self.cache.set(
+                key, meanings, None if meanings else self.negative_ttl
+            )
+        return meanings
+
+    def stats(self):
+        """
+        Return the cache's hit, miss and size counts.
+
+        Returns
+        -------
+        dict
+            hits, misses, hit_rate and entries.
+        """
+        return self.cache.stats()
+
+
+class DeadlineDictionaryProvider(DictionaryProvider):
+    """
+    Looks up word meanings through a slow or unreliable
+    provider within a deadline.
+
+    Each lookup runs in a daemon thread so a hung request
+    can never block the game, or its exit. If hedge_after
+    is set and the first request hasn't answered by then
+    a second request is sent and the first answer used.
+    After failure_limit lookups in a row miss the deadline
+    the circuit opens and lookups fail fast until
+    retry_after seconds have passed, when one lookup is
+    let through to test the provider again.
+
+    Attributes
+    ----------
+    provider : object
+        DictionaryProvider the meanings come from.
+    deadline : float
+        Seconds a lookup may take.
+    hedge_after : float or None
+        Seconds before a hedged request is sent.
+    failure_limit : int
+        Slow lookups in a row that open the circuit.
+    retry_after : float
+        Seconds the circuit stays open.
+    failures : int
+        Slow lookups in a row so far.
+    open_until : float
+        Monotonic time the circuit closes again.
+    """
+    def __init__(
+        self,
+        provider,
+        deadline=DICTIONARY_DEADLINE,
+        hedge_after=None,
+        failure_limit=DICTIONARY_FAILURE_LIMIT,
+        retry_after=DICTIONARY_RETRY_AFTER
+    ):
+        self.provider = provider
+        self.deadline = deadline
+        self.hedge_after = hedge_after
+        self.failure_limit = failure_limit
+        self.retry_after = retry_after
+        self.name = provider.name
+        self.failures = 0
+        self.open_until = 0.0
+        self._lock = threading.Lock()
+
+    def _request(self, word, answers):
+        """
+        Start a lookup in a daemon thread that puts its
+        answer, or the exception raised, on answers.
+        """
+        def lookup():
+            try:
+                answers.put((True, self.provider.meaning(word)))
+            except Exception as e:
+                answers.put((False, e))
+        threading.Thread(target=lookup, daemon=True).start()
+
+    def _wait(self, word):
+        """
+        Return the first answer to arrive before the
+        deadline, sending a hedged request if needed.
+        """
+        answers = queue.Queue()
+        deadline = monotonic() + self.deadline
+        self._request(word, answers)
+        if self.hedge_after is not None and self.hedge_after < self.deadline:
+            try:
+                return answers.get(timeout=self.hedge_after)
+            except queue.Empty:
+                self._request(word, answers)
+        try:
+            return answers.get(timeout=max(deadline - monotonic(), 0))
+        except queue.Empty:
+            return None
+
+    def meaning(self, word):
+        with self._lock:
+            if self.failures >= self.failure_limit:
+                if monotonic() < self.open_until:
+                    raise DictionaryUnavailable(
+                        'The dictionary is unavailable right now.'
+                    )
+                # Let this lookup through to test the provider,
+                # failing fast again if it is still slow
+                self.failures = self.failure_limit - 1
+        answer = self._wait(word)
+        with self._lock:
+            if answer is None:
+                self.failures += 1
+                if self.failures >= self.failure_limit:
+                    self.open_until = monotonic() + self.retry_after
+                raise DictionaryUnavailable(
+                    "The dictionary didn't answer in time."
+                )
+            self.failures = 0
+        found, meanings = answer
+        if not found:
+            raise meanings
+        return meanings
+
+
+def has_wordnet(wordnet_dir=WORDNET_DIR):
+    """
+    Check if a directory holds the WordNet database files
+    read_wordnet needs.
+
+    Parameters
+    ----------
+    wordnet_dir : string
+        Directory to check.
+
+    Returns
+    -------
+    boolean
+        True if every index.* and data.* file is present.
+    """
+    return all(
+        os.path.exists(os.path.join(wordnet_dir, name))
+        for name in WORDNET_FILES
+    )
+
+
+def fetch_wordnet(
+    wordnet_dir=WORDNET_DIR, url=WORDNET_URL, checksum=WORDNET_SHA256
+):
+    """
+    Download the pinned WordNet release and unpack its
+    database files and licence into a directory.
+
+    Parameters
+    ----------
+    wordnet_dir : string
+        Destination directory.
+    url : string
+        Release archive to download.
+    checksum : string
+        Expected sha256 hex digest of the archive.
+
+    Returns
+    -------
+    count : int
+        Number of files unpacked.
+
+    Raises
+    ------
+    ValueError
+        If the archive doesn't match its checksum or holds
+        no WordNet files.
+    """
+    with urlopen(url, timeout=120) as response:
+        archive = response.read()
+    if sha256(archive).hexdigest() != checksum:
+        raise ValueError(f'{url} does not match its pinned checksum')
+    wanted = set(WORDNET_FILES) | {'LICENSE'}
+    os.makedirs(wordnet_dir, exist_ok=True)
+    count = 0
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        for member in tar.getmembers():
+            # Only known names are written, so no member can
+            # escape wordnet_dir
+            name = member.name[len(WORDNET_ARCHIVE_DIR):]
+            if (
+                not member.isfile()
+                or not member.name.startswith(WORDNET_ARCHIVE_DIR)
+                or name not in wanted
+            ):
+                continue
+            with open(os.path.join(wordnet_dir, name), 'wb') as f:
+                f.write(tar.extractfile(member).read())
+            count += 1
+    if not has_wordnet(wordnet_dir):
+        raise ValueError(f'{url} holds no WordNet database files')
+    return count
+
+
+def read_wordnet(wordnet_dir=WORDNET_DIR):
+    """
+    Yield every single word definition in a WordNet
+    database directory.
+
+    Definitions come out grouped by part of speech and,
+    within a word, in WordNet's most common sense first
+    order, matching WordNet's own search results.
+
+    Parameters
+    ----------
+    wordnet_dir : string
+        Directory holding WordNet's index.* and data.* files.
+
+    Yields
+    ------
+    tuple
+        (word, part_of_speech, meaning)
+    """
+    for suffix, part_of_speech in WORDNET_PARTS_OF_SPEECH.items():
+        # Map synset offsets to their definition, dropping
+        # the quoted usage examples after it
+        glosses = {}
+        with open(os.path.join(wordnet_dir, f'data.{suffix}')) as f:
+            for line in f:
+                if line.startswith(' ') or '|' not in line:
+                    continue
+                offset = line.split(' ', 1)[0]
+                gloss = line.split('|', 1)[1].strip()
+                glosses[offset] = re.split(r';\s*"', gloss)[0].strip()
+        with open(os.path.join(wordnet_dir, f'index.{suffix}')) as f:
+            for line in f:
+                if line.startswith(' '):
+                    continue
+                fields = line.split()
+                word = fields[0]
+                if not word.isalpha():
+                    # Skip phrases like 'ice_cream'
+                    continue
+                synset_count = int(fields[2])
+                for offset in fields[-synset_count:]:
+                    if offset in glosses:
+                        yield word, part_of_speech, glosses[offset]
+
+
+def build_definitions(definitions, path=DEFINITIONS_PATH):
+    """
+    Write definitions into a new SQLite definitions store.
+
+    Parameters
+    ----------
+    definitions : iterable
+        (word, part_of_speech, meaning) tuples in the order
+        they should be returned.
+    path : string
+        Destination path of the store.
+
+    Returns
+    -------
+    count : int
+        Number of definitions written.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    db = sqlite3.connect(tmp_path)
+    db.execute(
+        'CREATE TABLE definitions ('
+        'word TEXT NOT NULL, part_of_speech TEXT NOT NULL, '
+        'meaning TEXT NOT NULL)'
+    )
+    db.executemany(
+        'INSERT INTO definitions VALUES (?, ?, ?)',
+        ((word.lower(), part_of_speech, meaning)
+         for word, part_of_speech, meaning in definitions)
+    )
+    db.execute('CREATE INDEX definitions_word ON definitions (word)')
+    count = db.execute('SELECT COUNT(*) FROM definitions').fetchone()[0]
+    db.commit()
+    db.close()
+    # Move into place so game processes never open a half
+    # written store
+    os.replace(tmp_path, path)
+    return count
+
+
+def load_dictionary_provider(name=None):
+    """
+    Return the dictionary provider the game should use.
+
+    Parameters
+    ----------
+    name : string
+        'local' or 'pydictionary'. Read from the
+        DICTIONARY_PROVIDER environment variable if not
+        given, defaulting to 'local' when the definitions
+        store has been built and 'pydictionary' otherwise.
+
+    Returns
+    -------
+    object
+        DictionaryProvider instance. Remote lookups are
+        made within a deadline and wrapped in the shared
+        dictionary cache.
+    """
+    name = name or os.environ.get('DICTIONARY_PROVIDER')
+    if name is None:
+        name = 'local' if os.path.exists(DEFINITIONS_PATH) else 'pydictionary'
+    if name == 'local':
+        return LocalDictionaryProvider(DEFINITIONS_PATH)
+    elif name == 'pydictionary':
+        hedge_after = DICTIONARY_HEDGE_AFTER
+        return CachedDictionaryProvider(
+            DeadlineDictionaryProvider(
+                PyDictionaryProvider(),
+                hedge_after=float(hedge_after) if hedge_after else None
+            ),
+            DiskCache(
+                DICTIONARY_CACHE_PATH,
+                DICTIONARY_CACHE_SIZE,
+                DICTIONARY_CACHE_TTL
+            )
+        )
+    raise ValueError('DICTIONARY_PROVIDER must be local or pydictionary')
@@ -0,0 +1,310 @@
+# Imports
+# Python
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+import atexit
+import json
+import os
+import sqlite3
+from threading import Lock
+from time import time
+
+# Bump when the cache table layout changes so old cache
+# files are cleared instead of failing every query
+SCHEMA_VERSION = 3
+# Returned by get() on a miss when passed as the default,
+# to tell a miss apart from a cached None
+MISSING = object()
+# Seconds a hit can go without moving its entry up the
+# least recently used order, so most reads don't write
+TOUCH_AFTER = 60
+# Seconds between writes of this process's hit and miss
+# counts to the totals shared by all processes
+STATS_FLUSH_AFTER = 60
+# Share of max_entries a cache can grow past before set()
+# evicts, so most writes skip the eviction queries
+EVICT_SLACK = 0.01
+
+
+class DiskCache:
+    """
+    Least recently used cache shared by every game process.
+
+    Entries are JSON values stored in a local SQLite file,
+    so any process on the dyno can reuse results another
+    process computed. Entries can expire after a time to
+    live, and once the cache holds more than max_entries
+    the least recently used entries are evicted. Hit and
+    miss counts are kept both for this process and, in the
+    file, across all processes.
+
+    Reads only write to the file when an entry's last use
+    is more than touch_after seconds old, and the shared
+    counts are written at most every STATS_FLUSH_AFTER
+    seconds and when the process exits, so the hits of
+    every process don't queue on SQLite's single writer
+    lock. Evicting the least
+    recently used entries has to walk max_entries of them,
+    so each process only does it once its writes could
+    have added EVICT_SLACK of max_entries, and the cache
+    can briefly hold that many entries too many per
+    process.
+
+    A cache that can't be read or written behaves as if
+    empty so the game never fails because of it. One
+    connection is shared by the threads of a process,
+    which take turns through a lock.
+
+    Attributes
+    ----------
+    path : string
+        Path to the SQLite cache file.
+    max_entries : int
+        Number of entries kept before evicting.
+    ttl : float or None
+        Default seconds an entry lives, None for no expiry.
+    touch_after : float
+        Seconds after its last recorded use a hit moves an
+        entry up the least recently used order.
+    hits : int
+        Cache hits in this process.
+    misses : int
+        Cache misses in this process.
+
+    Methods
+    -------
+    get(key, default=None)
+        Return the cached value for key or default.
+    set(key, value, ttl=None)
+        Store value under key, evicting old entries if full.
+    flush()
+        Add this process's unwritten hit and miss counts to
+        the shared totals.
+    stats()
+        Return hit, miss and size counts across processes.
+    """
+    def __init__(
+        self, path, max_entries=10000, ttl=None, touch_after=TOUCH_AFTER
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.touch_after = touch_after
+        self.hits = 0
+        self.misses = 0
+        # Counts not yet added to the shared totals
+        self._unflushed = {'hits': 0, 'misses': 0}
+        self._flushed_at = time()
+        # Writes left before set() evicts again
+        self._evict_every = max(1, int(max_entries * EVICT_SLACK))
+        self._sets_left = 1
+        self._lock = Lock()
+        try:
+            self._db = self._connect()
+        except (OSError, sqlite3.Error):
+            self._db = None
+        else:
+            # Counts since the last write would be lost when
+            # the process ends
+            atexit.register(self.flush)
+
+    def _connect(self):
+        """
+        Open the cache file, creating its tables if needed.
+        """
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        db = sqlite3.connect(
+            self.path, timeout=5, isolation_level=None,
+            check_same_thread=False
+        )
+        # Write ahead logging lets readers and a writer in
+        # different processes work at the same time
+        db.execute('PRAGMA journal_mode=WAL')
+        # A cache can lose its last writes in a power cut, so
+        # commits don't wait for the disk
+        db.execute('PRAGMA synchronous=NORMAL')
+        db.execute('BEGIN IMMEDIATE')
+        if db.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+            db.execute('DROP TABLE IF EXISTS cache')
+            db.execute('DROP TABLE IF EXISTS stats')
+            db.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        db.execute(
+            'CREATE TABLE IF NOT EXISTS cache ('
+            'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+            'last_used REAL NOT NULL, expires REAL)'
+        )
+        db.execute(
+            'CREATE INDEX IF NOT EXISTS cache_last_used '
+            'ON cache (last_used)'
+        )
+        db.execute(
+            'CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires)'
+        )
+        db.execute(
+            'CREATE TABLE IF NOT EXISTS stats ('
+            'name TEXT PRIMARY KEY, count INTEGER NOT NULL)'
+        )
+        db.execute('COMMIT')
+        return db
+
+    def _count(self, name, now):
+        """
+        Count a hit or miss, writing the shared counts if
+        they haven't been written for STATS_FLUSH_AFTER.
+        """
+        setattr(self, name, getattr(self, name) + 1)
+        self._unflushed[name] += 1
+        if now - self._flushed_at >= STATS_FLUSH_AFTER:
+            self._flush()
+
+    def _flush(self):
+        """
+        Add the unwritten counts to the shared counts.
+        """
+        self._flushed_at = time()
+        counts = [
+            (name, count) for name, count in self._unflushed.items() if count
+        ]
+        self._unflushed = {'hits': 0, 'misses': 0}
+        if counts:
+            self._db.executemany(
+                'INSERT INTO stats VALUES (?, ?) ON CONFLICT (name) '
+                'DO UPDATE SET count = count + excluded.count',
+                counts
+            )
+
+    def flush(self):
+        """
+        Add this process's unwritten hit and miss counts to
+        the shared totals.
+        """
+        if self._db is None:
+            return
+        with self._lock:
+            try:
+                self._flush()
+            except sqlite3.Error:
+                pass
+
+    def get(self, key, default=None):
+        """
+        Return the cached value for key or default.
+
+        Parameters
+        ----------
+        key : string
+            Cache key.
+        default : object
+            Returned on a miss. Pass MISSING to tell a miss
+            apart from a cached None.
+
+        Returns
+        -------
+        object
+            Cached JSON value, default on a miss.
+        """
+        if self._db is None:
+            self.misses += 1
+            return default
+        with self._lock:
+            try:
+                now = time()
+                row = self._db.execute(
+                    'SELECT value, last_used, expires FROM cache '
+                    'WHERE key = ?', (key,)
+                ).fetchone()
+                # Expired entries are left for set() to evict
+                if row is None or (row[2] is not None and row[2] <= now):
+                    self._count('misses', now)
+                    return default
+                if now - row[1] >= self.touch_after:
+                    self._db.execute(
+                        'UPDATE cache SET last_used = ? WHERE key = ?',
+                        (now, key)
+                    )
+                self._count('hits', now)
+                return json.loads(row[0])
+            except sqlite3.Error:
+                self.misses += 1
+                return default
+
+    def set(self, key, value, ttl=None):
+        """
+        Store value under key, evicting expired and then the
+        least recently used entries if the cache is full.
+
+        Least recently used entries are evicted on the first
+        write and then once every EVICT_SLACK of max_entries
+        writes.
+
+        Parameters
+        ----------
+        key : string
+            Cache key.
+        value : object
+            JSON serialisable value.
+        ttl : float or None
+            Seconds the entry lives, the cache's ttl if None.
+        """
+        if self._db is None:
+            return
+        now = time()
+        ttl = self.ttl if ttl is None else ttl
+        expires = None if ttl is None else now + ttl
+        with self._lock:
+            try:
+                self._flush()
+                self._db.execute(
+                    'INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)',
+                    (key, json.dumps(value), now, expires)
+                )
+                self._db.execute(
+                    'DELETE FROM cache WHERE expires <= ?', (now,)
+                )
+                self._sets_left -= 1
+                if self._sets_left > 0:
+                    return
+                self._sets_left = self._evict_every
+                self._db.execute(
+                    'DELETE FROM cache WHERE key IN ('
+                    'SELECT key FROM cache ORDER BY last_used DESC '
+                    'LIMIT -1 OFFSET ?)',
+                    (self.max_entries,)
+                )
+            except sqlite3.Error:
+                pass
+
+    def stats(self):
+        """
+        Return hit, miss and size counts across processes.
+
+        Counts other processes haven't flushed yet are left
+        out.
+
+        Returns
+        -------
+        dict
+            hits, misses, hit_rate and entries.
+        """
+        counts = {}
+        entries = 0
+        if self._db is not None:
+            with self._lock:
+                try:
+                    self._flush()
+                    counts = dict(
+                        self._db.execute('SELECT name, count FROM stats')
+                    )
+                    entries = self._db.execute(
+                        'SELECT COUNT(*) FROM cache'
+                    ).fetchone()[0]
+                except sqlite3.Error:
+                    pass
+        hits = counts.get('hits', 0)
+        misses = counts.get('misses', 0)
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'entries': entries,
+        }
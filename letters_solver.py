@@ -0,0 +1,566 @@
+# Imports
+# Python
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from heapq import nlargest
+from itertools import product
+from math import comb
+import os
+# Internal
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from lexicon import DATA_DIR, letter_counts, signature
+# Third Party
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+import numpy as np
+
+# Shared cache of formable words keyed by sorted rack
+RACK_CACHE_PATH = os.path.join(DATA_DIR, 'rack_cache.sqlite')
+RACK_CACHE_SIZE = 20000
+# Most likely racks solved into the cache at deploy time
+PREWARM_RACKS = 500
+# Tiles the Letters class draws vowels and consonants from,
+# with the weighting used in Scrabble
+VOWEL_TILES = {'A': 9, 'E': 12, 'I': 9, 'O': 8, 'U': 4}
+CONSONANT_TILES = {
+    'B': 2, 'C': 2, 'D': 4, 'F': 2, 'G': 3, 'H': 2, 'J': 1, 'K': 1,
+    'L': 4, 'M': 2, 'N': 6, 'P': 2, 'Q': 1, 'R': 6, 'S': 4, 'T': 6,
+    'V': 2, 'W': 2, 'X': 1, 'Y': 2, 'Z': 1
+}
+# Vowels players usually ask for in a nine tile rack
+COMMON_VOWEL_COUNTS = (3, 4, 5)
+# Blank tiles stand for any letter
+BLANK_TILE = '?'
+MAX_BLANK_TILES = 2
+# Tiles in a letters round, from the standard nine up to the
+# fifteen of a Scrabble board row for tournament variants
+MIN_RACK_SIZE = 9
+MAX_RACK_SIZE = 15
+
+
+def rack_letters(rack):
+    """
+    Return the uppercase letters of a rack, ignoring
+    blank padding tiles.
+
+    Parameters
+    ----------
+    rack : list or string
+        Letters chosen for the round.
+
+    Returns
+    -------
+    list
+        Uppercase letters.
+    """
+    return [char.upper() for char in rack if char.isalpha()]
+
+
+def blank_count(rack):
+    """
+    Return the number of blank tiles in a rack.
+
+    Parameters
+    ----------
+    rack : list or string
+        Letters chosen for the round.
+
+    Returns
+    -------
+    int
+        Number of blank tiles.
+    """
+    return sum(1 for char in rack if char == BLANK_TILE)
+
+
+class LetterCountEngine:
+    """
+    Vectorised search for every word that can be made
+    from a rack.
+
+    Views the lexicon's (words x 26) uint8 letter count
+    matrix straight from the mapped artifact, whose rows
+    are stored longest word first, and finds
+    all formable words with one broadcast comparison
+    against the rack's letter counts. With blank tiles
+    the comparison becomes each word's letter shortfall,
+    which must be covered by the blanks, so the cost
+    doesn't grow with the number of blanks.
+
+    Attributes
+    ----------
+    lexicon : object
+        Lexicon the matrix rows belong to.
+    counts : ndarray
+        (words x 26) uint8 letter counts, longest words
+        first and alphabetical within a length.
+    row_ids : ndarray
+        Word id of each count matrix row.
+    lengths : ndarray
+        Length of each word by word id.
+
+    Methods
+    -------
+    formable_ids(rack)
+        Return the ids of every word that can be made from
+        the rack.
+    formable_words(rack)
+        Return every word that can be made from the rack
+        grouped by length.
+    iter_groups(rack, key=None, ranking=None, below=None)
+        Yield the words that can be made from the rack one
+        length at a time, longest first.
+    iter_words(rack, key=None, ranking=None)
+        Yield every word that can be made from the rack,
+        longest first.
+    longest_words(rack)
+        Return every longest word that can be made from the
+        rack and its length.
+    """
+    def __init__(self, lexicon):
+        self.lexicon = lexicon
+        self.counts = np.frombuffer(
+            lexicon.section('counts'), dtype=np.uint8
+        ).reshape(-1, 26)
+        self.row_ids = np.frombuffer(
+            lexicon.section('cntids'), dtype=np.uint32
+        )
+        offsets = np.frombuffer(lexicon.section('offsets'), dtype=np.uint32)
+        self.lengths = np.diff(offsets.astype(np.int32))
+        # Rows of each word length are one slice of the matrix,
+        # so searching a length group views the mapped rows
+        # rather than copying them
+        row_lengths = self.lengths[self.row_ids]
+        starts = np.flatnonzero(np.diff(row_lengths)) + 1
+        bounds = np.concatenate(([0], starts, [len(row_lengths)]))
+        self._length_groups = [
+            (int(row_lengths[start]), slice(int(start), int(stop)))
+            for start, stop in zip(bounds[:-1], bounds[1:])
+        ]
+
+    @staticmethod
+    def _formable(counts, rack_counts, blanks):
+        """
+        Return a mask of the count matrix rows the rack
+        can make.
+        """
+        if not blanks:
+            return (counts <= rack_counts).all(axis=1)
+        # Letters each word needs beyond the rack, taking the
+        # maximum first so the uint8 subtraction can't wrap
+        shortfall = np.maximum(counts, rack_counts) - rack_counts
+        return shortfall.sum(axis=1, dtype=np.uint16) <= blanks
+
+    def _rack_counts(self, rack):
+        """
+        Return a rack's letter counts and blank tile count.
+        """
+        rack_counts = np.frombuffer(
+            letter_counts(rack_letters(rack)), dtype=np.uint8
+        )
+        return rack_counts, blank_count(rack)
+
+    def formable_ids(self, rack):
+        """
+        Return the ids of every word that can be made from
+        the rack.
+
+        Parameters
+        ----------
+        rack : list or string
+            Letters chosen for the round.
+
+        Returns
+        -------
+        ndarray
+            Word ids in sorted word order.
+        """
+        rack_counts, blanks = self._rack_counts(rack)
+        rows = self._formable(self.counts, rack_counts, blanks)
+        return np.sort(self.row_ids[rows])
+
+    def formable_words(self, rack):
+        """
+        Return every word that can be made from the rack
+        grouped by length.
+
+        Parameters
+        ----------
+        rack : list or string
+            Letters chosen for the round.
+
+        Returns
+        -------
+        words_by_length : dict
+            Word lengths, longest first, mapped to sorted
+            lists of words.
+        """
+        rack_counts, blanks = self._rack_counts(rack)
+        rows = self._formable(self.counts, rack_counts, blanks)
+        words_by_length = {}
+        # Rows are already longest first and alphabetical
+        # within a length
+        for word_id in self.row_ids[rows]:
+            word = self.lexicon.word(int(word_id))
+            words_by_length.setdefault(len(word), []).append(word)
+        return words_by_length
+
+    def iter_groups(self, rack, key=None, ranking=None, below=None):
+        """
+        Yield the words that can be made from the rack one
+        length at a time, longest first.
+
+        Only the rows of one word length are compared at a
+        time, so the longest words come out after a small
+        slice of the matrix is searched and a caller that
+        stops early never searches the shorter words.
+
+        Parameters
+        ----------
+        rack : list or string
+            Letters chosen for the round.
+        key : function
+            Sort key ranking words of the same length,
+            alphabetical if None.
+        ranking : ndarray
+            Score by word id ranking words of the same
+            length highest first, such as a FrequencyTable's
+            scores. Used instead of key if given.
+        below : int
+            Only search words shorter than this, for resuming
+            a search that stopped part way, all lengths if
+            None.
+
+        Yields
+        ------
+        tuple
+            (word length, list of words), only for lengths
+            with words.
+        """
+        rack_counts, blanks = self._rack_counts(rack)
+        tiles = int(rack_counts.sum()) + blanks
+        if below is not None:
+            tiles = min(tiles, below - 1)
+        for length, rows in self._length_groups:
+            if length > tiles:
+                continue
+            found = self.row_ids[rows][
+                self._formable(self.counts[rows], rack_counts, blanks)
+            ]
+            if not len(found):
+                continue
+            if ranking is not None:
+                # Widen before negating so unsigned scores can't wrap
+                scores = ranking[found].astype(np.int32)
+                found = found[np.argsort(-scores, kind='stable')]
+            words = [self.lexicon.word(int(word_id)) for word_id in found]
+            if key is not None and ranking is None:
+                words.sort(key=key)
+            yield length, words
+
+    def iter_words(self, rack, key=None, ranking=None):
+        """
+        Yield every word that can be made from the rack,
+        longest first.
+
+        Parameters
+        ----------
+        rack : list or string
+            Letters chosen for the round.
+        key : function
+            Sort key ranking words of the same length,
+            alphabetical if None.
+        ranking : ndarray
+            Score by word id ranking words of the same
+            length highest first. Used instead of key if
+            given.
+
+        Yields
+        ------
+        string
+            Words, longest first.
+        """
+        for _, words in self.iter_groups(rack, key, ranking):
+            yield from words
+
+    def longest_words(self, rack):
+        """
+        Return every longest word that can be made from the
+        rack and its length.
+
+        Parameters
+        ----------
+        rack : list or string
+            Letters chosen for the round.
+
+        Returns
+        -------
+        words : list
+            Sorted longest words, empty if none found.
+        word_len : int
+            Length of the longest words, 0 if none found.
+        """
+        word_ids = self.formable_ids(rack)
+        if len(word_ids) == 0:
+            return [], 0
+        word_lengths = self.lengths[word_ids]
+        word_len = int(word_lengths.max())
+        words = [
+            self.lexicon.word(int(word_id))
+            for word_id in word_ids[word_lengths == word_len]
+        ]
+        return words, word_len
+
+
+def tile_draws(tiles, size):
+    """
+    Yield every distinct set of tiles that can be drawn
+    from a bag and the number of ways to draw it.
+
+    Parameters
+    ----------
+    tiles : dict
+        Letters mapped to how many tiles of each are in
+        the bag.
+    size : int
+        Tiles drawn.
+
+    Yields
+    ------
+    tuple
+        (letters in alphabetical order, ways)
+    """
+    letters = sorted(tiles)
+
+    def draws(start, size):
+        if size == 0:
+            yield '', 1
+            return
+        if start == len(letters):
+            return
+        letter = letters[start]
+        for count in range(min(tiles[letter], size), -1, -1):
+            for rest, ways in draws(start + 1, size - count):
+                yield letter * count + rest, ways * comb(tiles[letter], count)
+    yield from draws(0, size)
+
+
+def likely_racks(
+    count, rack_size=MIN_RACK_SIZE, vowel_counts=COMMON_VOWEL_COUNTS
+):
+    """
+    Return the racks the letters round draws most often.
+
+    The Letters class draws the vowels and consonants
+    without replacement from separate bags, so each set of
+    letters has a chance given by the ways to draw it over
+    the ways to draw any set of that size. Each number of
+    vowels players ask for is taken as equally likely.
+
+    Parameters
+    ----------
+    count : int
+        Number of racks.
+    rack_size : int
+        Tiles in each rack.
+    vowel_counts : tuple
+        Numbers of vowels players ask for.
+
+    Returns
+    -------
+    list
+        (rack, chance) tuples, racks as letters in
+        alphabetical order, most likely first.
+    """
+    vowel_total = sum(VOWEL_TILES.values())
+    consonant_total = sum(CONSONANT_TILES.values())
+    racks = []
+    for vowels in vowel_counts:
+        consonants = rack_size - vowels
+        scale = len(vowel_counts) * comb(vowel_total, vowels) * comb(
+            consonant_total, consonants
+        )
+        # Only the most likely halves can make the most
+        # likely racks
+        vowel_draws = nlargest(
+            count, tile_draws(VOWEL_TILES, vowels), key=lambda draw: draw[1]
+        )
+        consonant_draws = nlargest(
+            count, tile_draws(CONSONANT_TILES, consonants),
+            key=lambda draw: draw[1]
+        )
+        for vowel_draw, consonant_draw in product(
+            vowel_draws, consonant_draws
+        ):
+            racks.append((
+                signature(vowel_draw[0] + consonant_draw[0]),
+                vowel_draw[1] * consonant_draw[1] / scale
+            ))
+    return nlargest(count, racks, key=lambda rack: rack[1])
+
+
+def rack_cache_key(rack, engine):
+    """
+    Return the shared rack cache key of a rack.
+
+    Keys are the rack's letters in alphabetical order and
+    its blank tiles, prefixed with the lexicon's word checksum so
+    results from an older word list are never served.
+
+    Parameters
+    ----------
+    rack : list or string
+        Letters chosen for the round.
+    engine : object
+        LetterCountEngine the rack is solved with.
+
+    Returns
+    -------
+    string
+        Cache key.
+    """
+    return (
+        f'{engine.lexicon.word_checksum.hex()[:12]}:'
+        + signature(rack_letters(rack))
+        + BLANK_TILE * blank_count(rack)
+    )
+
+
+def _cached_rack(cache, key_name):
+    """
+    Return a rack cache entry's words by length and the
+    length its search stopped at, (None, None) if absent.
+    """
+    cached = cache.get(key_name)
+    if cached is None:
+        return None, None
+    # JSON object keys come back as strings
+    words_by_length = {
+        int(length): words for length, words in cached['words'].items()
+    }
+    return words_by_length, cached['searched']
+
+
+def _store_rack(cache, key_name, words_by_length, searched):
+    """
+    Store the words found for a rack so far.
+
+    searched is the shortest word length fully searched,
+    0 once every length has been.
+    """
+    cache.set(key_name, {
+        'words': {
+            length: sorted(words)
+            for length, words in words_by_length.items()
+        },
+        'searched': searched
+    })
+
+
+def cached_formable_words(rack, engine, cache):
+    """
+    Return every word that can be made from the rack
+    grouped by length, reusing results any game process
+    already found for the same letters.
+
+    Parameters
+    ----------
+    rack : list or string
+        Letters chosen for the round.
+    engine : object
+        LetterCountEngine to solve cache misses with.
+    cache : object
+        DiskCache keyed by sorted rack letters.
+
+    Returns
+    -------
+    words_by_length : dict
+        Word lengths, longest first, mapped to sorted
+        lists of words.
+    """
+    key_name = rack_cache_key(rack, engine)
+    words_by_length, searched = _cached_rack(cache, key_name)
+    if words_by_length is not None and not searched:
+        return dict(sorted(words_by_length.items(), reverse=True))
+    words_by_length = engine.formable_words(rack)
+    _store_rack(cache, key_name, words_by_length, 0)
+    return words_by_length
+
+
+def stream_formable_words(rack, engine, cache, key=None, ranking=None):
+    """
+    Yield every word that can be made from the rack,
+    longest first, from the shared rack cache as far as
+    any game process has solved the rack and from the
+    engine after that.
+
+    Each word length is stored in the cache as soon as it
+    has been searched, so a caller that only takes the
+    first few words still leaves them for the next game
+    with the same letters, which carries on from there if
+    it needs more.
+
+    Parameters
+    ----------
+    rack : list or string
+        Letters chosen for the round.
+    engine : object
+        LetterCountEngine to solve cache misses with.
+    cache : object
+        DiskCache keyed by sorted rack letters.
+    key : function
+        Sort key ranking words of the same length,
+        alphabetical if None.
+    ranking : ndarray
+        Score by word id ranking words of the same length
+        highest first. Used instead of key if given.
+
+    Yields
+    ------
+    string
+        Words, longest first.
+    """
+    key_name = rack_cache_key(rack, engine)
+    words_by_length, searched = _cached_rack(cache, key_name)
+    below = None
+    if words_by_length is not None:
+        cached_key = key
+        if ranking is not None:
+            def cached_key(word):
+                return -int(ranking[engine.lexicon.word_id(word)])
+        for length in sorted(words_by_length, reverse=True):
+            yield from sorted(words_by_length[length], key=cached_key)
+        if not searched:
+            return
+        below = searched
+    else:
+        words_by_length = {}
+    for length, words in engine.iter_groups(rack, key, ranking, below):
+        words_by_length[length] = words
+        _store_rack(cache, key_name, words_by_length, length)
+        yield from words
+    _store_rack(cache, key_name, words_by_length, 0)
+
+
+def prewarm_rack_cache(racks, engine, cache):
+    """
+    Solve a list of racks into the shared cache.
+
+    Parameters
+    ----------
+    racks : iterable
+        Racks as strings of letters.
+    engine : object
+        LetterCountEngine to solve racks with.
+    cache : object
+        DiskCache keyed by sorted rack letters.
+
+    Returns
+    -------
+    count : int
+        Number of racks solved.
+    """
+    count = 0
+    for rack in racks:
+        if rack_letters(rack):
+            cached_formable_words(rack, engine, cache)
+            count += 1
+    return count
@@ -0,0 +1,666 @@
+# Imports
+# Python
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from array import array
+from bisect import bisect_left
+from collections.abc import Sequence
+from hashlib import sha256
+import mmap
+import os
+import struct
+
+# Location of the compiled lexicon artifact
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+LEXICON_PATH = os.path.join(DATA_DIR, 'lexicon.bin')
+
+# Word lists a game session can be played with, selectable
+# with the LEXICON environment variable. The default keeps
+# the original artifact paths
+LEXICONS = ('scrabble', 'countdown', 'family')
+DEFAULT_LEXICON = 'scrabble'
+# Longest word a Countdown rack of nine tiles can make
+COUNTDOWN_MAX_LENGTH = 9
+# Profanity probability at which a word is left out of the
+# family lexicon, the same limit validate_user_word uses
+FAMILY_PROFANITY_LIMIT = 0.9
+
+# Artifact layout constants. Each artifact type has its own
+# format version, bumped whenever the layout of one of its
+# sections changes so only its stale artifacts are rebuilt
+MAGIC = b'CDLEXBIN'
+LEXICON_VERSION = 7
+# magic, format version, section count, sha256 of section data
+HEADER = struct.Struct('<8sII32s')
+# section name, absolute offset, length in bytes
+SECTION = struct.Struct('<8sQQ')
+# Sections are padded so uint32 arrays stay aligned
+ALIGNMENT = 8
+# Sections every lexicon artifact must contain
+REQUIRED_SECTIONS = (
+    'words', 'offsets', 'wordsum', 'nine', 'sigs', 'sigoffs', 'sigstart',
+    'sigwords', 'counts', 'cntids'
+)
+
+
+class StaleArtifactError(ValueError):
+    """
+    Raised when a game process finds a data artifact it
+    can't use as built, such as one from an older format
+    version or another lexicon, or a required artifact
+    missing, which build_data.py must build.
+    """
+
+
+def read_section_table(buffer, path, required_sections, expected_version):
+    """
+    Check an artifact's header and read its section table.
+
+    Parameters
+    ----------
+    buffer : object
+        mmap or bytes holding the whole artifact.
+    path : string
+        Path the artifact was read from, for error messages.
+    required_sections : tuple
+        Section names the artifact must contain.
+    expected_version : int
+        Format version of the artifact type.
+
+    Returns
+    -------
+    version : int
+        Format version from the header.
+    checksum : bytes
+        sha256 digest of the section data.
+    sections : dict
+        Section names mapped to (offset, length) tuples.
+    """
+    if len(buffer) < HEADER.size:
+        raise ValueError(f'{path} is too small to be a lexicon')
+    magic, version, section_count, checksum = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ValueError(f'{path} is not a lexicon artifact')
+    if version != expected_version:
+        raise ValueError(
+            f'{path} is format version {version}, '
+            f'expected {expected_version}'
+        )
+    # Read the section table that follows the header
+    sections = {}
+    for ind in range(section_count):
+        name, offset, length = SECTION.unpack_from(
+            buffer, HEADER.size + ind * SECTION.size
+        )
+        sections[name.rstrip(b'\0').decode('ascii')] = (offset, length)
+    for name in required_sections:
+        if name not in sections:
+            raise ValueError(f'{path} has no {name} section')
+    return version, checksum, sections
+
+
+class StringTable:
+    """
+    Sorted table of ASCII strings stored as one blob plus
+    a uint32 offsets array, searched by binary search.
+
+    Attributes
+    ----------
+    blob : object
+        mmap holding the concatenated strings.
+    start : int
+        Absolute offset of the strings in the mmap.
+    offsets : memoryview
+        uint32 end offset of each string, after a leading 0.
+
+    Methods
+    -------
+    find(key)
+        Return the index of key or None if not in the table.
+    """
+    def __init__(self, blob, start, offsets):
+        self.blob = blob
+        self.start = start
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        return self.blob[
+            self.start + self.offsets[index]:
+            self.start + self.offsets[index + 1]
+        ]
+
+    def find(self, key):
+        """
+        Return the index of key or None if not in the table.
+
+        Parameters
+        ----------
+        key : bytes
+            String to look up.
+
+        Returns
+        -------
+        int or None
+            Position of key in sorted order.
+        """
+        count = len(self)
+        ind = bisect_left(range(count), key, key=self.__getitem__)
+        if ind < count and self[ind] == key:
+            return ind
+        return None
+
+
+class WordList(Sequence):
+    """
+    Read-only sequence of words from the lexicon selected
+    by word id.
+
+    Supports len(), indexing and random.sample() without
+    copying the words into a Python list.
+
+    Attributes
+    ----------
+    lexicon : object
+        Lexicon the word ids refer to.
+    word_ids : memoryview
+        uint32 word ids into the lexicon.
+    """
+    def __init__(self, lexicon, word_ids):
+        self.lexicon = lexicon
+        self.word_ids = word_ids
+
+    def __len__(self):
+        return len(self.word_ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return self.lexicon.word(self.word_ids[index])
+
+
+class Lexicon:
+    """
+    Memory-mapped, read-only word lexicon.
+
+    Answers word membership by binary search over the
+    sorted words in the compiled artifact instead of
+    building a Python set, so opening a lexicon costs the
+    same however many words it holds and the pages are
+    shared by every game process through the OS page cache.
+    Also holds an anagram index mapping each sorted-letter
+    signature to the ids of the words spelt with exactly
+    those letters and a (words x 26) letter count matrix
+    with the rows of each word length side by side for
+    vectorised rack searches.
+
+    Attributes
+    ----------
+    path : string
+        Path to the compiled lexicon artifact.
+    version : int
+        Format version read from the artifact header.
+    checksum : bytes
+        sha256 digest of the artifact's section data.
+    word_checksum : bytes
+        sha256 digest of the sorted words alone. Artifacts
+        built from the lexicon's word ids are keyed by it,
+        so they stay valid when other sections change.
+    nine_letter_words : object
+        WordList of the curated nine letter conundrum words.
+
+    Methods
+    -------
+    word_id(word)
+        Return the id of word or None if not in the lexicon.
+    word(word_id)
+        Return the word stored at word_id.
+    anagrams(letters)
+        Return every word spelt with exactly the given letters.
+    section(name)
+        Return a memoryview of a named artifact section.
+    verify()
+        Check the artifact's section data against its checksum.
+    """
+    def __init__(self, path=LEXICON_PATH):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.version, self.checksum, self._sections = read_section_table(
+            self._mmap, path, REQUIRED_SECTIONS, LEXICON_VERSION
+        )
+        self._words = StringTable(
+            self._mmap,
+            self._sections['words'][0],
+            self.section('offsets').cast('I')
+        )
+        self._count = len(self._words)
+        self.word_checksum = bytes(self.section('wordsum'))
+        # Anagram index: sorted signatures and, for each one,
+        # a slice of sigwords holding its word ids
+        self._signatures = StringTable(
+            self._mmap,
+            self._sections['sigs'][0],
+            self.section('sigoffs').cast('I')
+        )
+        self._signature_start = self.section('sigstart').cast('I')
+        self._signature_words = self.section('sigwords').cast('I')
+        self.nine_letter_words = WordList(
+            self, self.section('nine').cast('I')
+        )
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, word):
+        return self.word_id(word) is not None
+
+    def __iter__(self):
+        for word_id in range(self._count):
+            yield self.word(word_id)
+
+    def section(self, name):
+        """
+        Return a memoryview of a named artifact section.
+
+        Parameters
+        ----------
+        name : string
+            Section name written by build_lexicon.
+
+        Returns
+        -------
+        memoryview
+            Zero-copy view of the section bytes.
+        """
+        if name not in self._sections:
+            raise ValueError(f'{self.path} has no {name} section')
+        offset, length = self._sections[name]
+        return memoryview(self._mmap)[offset:offset + length]
+
+    def word(self, word_id):
+        """
+        Return the word stored at word_id.
+
+        Parameters
+        ----------
+        word_id : int
+            Position of the word in sorted order.
+
+        Returns
+        -------
+        string
+            Uppercase word.
+        """
+        return self._words[word_id].decode('ascii')
+
+    def word_id(self, word):
+        """
+        Return the id of word or None if not in the lexicon.
+
+        Parameters
+        ----------
+        word : string
+            Word to look up in any letter case.
+
+        Returns
+        -------
+        int or None
+            Position of the word in sorted order.
+        """
+        try:
+            key = word.upper().encode('ascii')
+        except (AttributeError, UnicodeEncodeError):
+            return None
+        return self._words.find(key)
+
+    def anagrams(self, letters):
+        """
+        Return every word spelt with exactly the given letters.
+
+        Parameters
+        ----------
+        letters : string or list
+            Letters in any order and letter case.
+
+        Returns
+        -------
+        list
+            Uppercase words using all of the letters.
+        """
+        try:
+            key = signature(letters).encode('ascii')
+        except (AttributeError, UnicodeEncodeError):
+            return []
+        ind = self._signatures.find(key)
+        if ind is None:
+            return []
+        word_ids = self._signature_words[
+            self._signature_start[ind]:self._signature_start[ind + 1]
+        ]
+        return [self.word(word_id) for word_id in word_ids]
+
+    def verify(self):
+        """
+        Check the artifact's section data against its checksum.
+
+        Reads every page of the artifact so is only used by
+        the build step, not when a game session starts.
+
+        Returns
+        -------
+        boolean
+            True if the checksum matches and False if not.
+        """
+        data_start = HEADER.size + len(self._sections) * SECTION.size
+        return sha256(self._mmap[data_start:]).digest() == self.checksum
+
+
+def signature(letters):
+    """
+    Return the sorted-letter signature shared by all
+    anagrams of letters.
+
+    Parameters
+    ----------
+    letters : string or list
+        Letters in any order and letter case.
+
+    Returns
+    -------
+    string
+        Uppercase letters in alphabetical order.
+    """
+    return ''.join(sorted(''.join(letters).upper()))
+
+
+def _string_table(strings):
+    """
+    Pack sorted strings into a blob and offsets array.
+    """
+    offsets = array('I', [0])
+    blob = bytearray()
+    for string in strings:
+        blob += string.encode('ascii')
+        offsets.append(len(blob))
+    return bytes(blob), offsets.tobytes()
+
+
+def letter_counts(word):
+    """
+    Return the A to Z letter counts of an uppercase word.
+
+    Parameters
+    ----------
+    word : string
+        Uppercase word.
+
+    Returns
+    -------
+    bytearray
+        26 counts, one per letter.
+    """
+    counts = bytearray(26)
+    for char in word:
+        counts[ord(char) - ord('A')] += 1
+    return counts
+
+
+def _pad(blob):
+    """
+    Pad bytes with zeros to the section alignment.
+    """
+    return blob + b'\0' * (-len(blob) % ALIGNMENT)
+
+
+def write_artifact(path, sections, version):
+    """
+    Write named sections to a versioned, checksummed artifact.
+
+    The file is written to a temporary path and then moved
+    into place so game processes never map a half written
+    artifact.
+
+    Parameters
+    ----------
+    path : string
+        Destination path of the artifact.
+    sections : dict
+        Section names mapped to their bytes.
+    version : int
+        Format version of the artifact type.
+    """
+    data_start = HEADER.size + len(sections) * SECTION.size
+    table = b''
+    body = b''
+    for name, blob in sections.items():
+        table += SECTION.pack(
+            name.encode('ascii'), data_start + len(body), len(blob)
+        )
+        body += _pad(blob)
+    header = HEADER.pack(
+        MAGIC, version, len(sections), sha256(body).digest()
+    )
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(header + table + body)
+    os.replace(tmp_path, path)
+
+
+def build_lexicon(words, nine_letter_words, path=LEXICON_PATH):
+    """
+    Compile word lists into a lexicon artifact.
+
+    Parameters
+    ----------
+    words : iterable
+        Every valid word.
+    nine_letter_words : iterable
+        Curated nine letter words used for conundrums.
+        Words missing from words are skipped.
+    path : string
+        Destination path of the artifact.
+
+    Returns
+    -------
+    word_count : int
+        Number of words written to the artifact.
+    """
+    sorted_words = sorted({word.upper() for word in words})
+    word_ids = {word: ind for ind, word in enumerate(sorted_words)}
+    words_blob, word_offsets = _string_table(sorted_words)
+    word_checksum = sha256(words_blob + word_offsets).digest()
+
+    nine_ids = array('I', sorted({
+        word_ids[word.upper()] for word in nine_letter_words
+        if word.upper() in word_ids
+    }))
+
+    # Group word ids by signature for the anagram index
+    anagram_groups = {}
+    for word_id, word in enumerate(sorted_words):
+        anagram_groups.setdefault(signature(word), []).append(word_id)
+    signatures = sorted(anagram_groups)
+    signatures_blob, signature_offsets = _string_table(signatures)
+    signature_start = array('I', [0])
+    signature_words = array('I')
+    for sig in signatures:
+        signature_words.extend(anagram_groups[sig])
+        signature_start.append(len(signature_words))
+
+    # One row of 26 uint8 letter counts per word, longest
+    # words first and alphabetical within a length, so the
+    # rows of each word length are one slice of the matrix
+    count_ids = array('I', sorted(
+        range(len(sorted_words)),
+        key=lambda word_id: -len(sorted_words[word_id])
+    ))
+    counts = bytearray()
+    for word_id in count_ids:
+        counts += letter_counts(sorted_words[word_id])
+
+    write_artifact(path, {
+        'words': words_blob,
+        'offsets': word_offsets,
+        'wordsum': word_checksum,
+        'nine': nine_ids.tobytes(),
+        'sigs': signatures_blob,
+        'sigoffs': signature_offsets,
+        'sigstart': signature_start.tobytes(),
+        'sigwords': signature_words.tobytes(),
+        'counts': bytes(counts),
+        'cntids': count_ids.tobytes(),
+    }, LEXICON_VERSION)
+    return len(sorted_words)
+
+
+def lexicon_path(name=DEFAULT_LEXICON):
+    """
+    Return the artifact path of a named lexicon.
+
+    Parameters
+    ----------
+    name : string
+        One of LEXICONS.
+
+    Returns
+    -------
+    string
+        Path of the artifact.
+    """
+    if name not in LEXICONS:
+        raise ValueError(f'LEXICON must be one of {", ".join(LEXICONS)}')
+    if name == DEFAULT_LEXICON:
+        return LEXICON_PATH
+    return os.path.join(DATA_DIR, f'lexicon_{name}.bin')
+
+
+def lexicon_words(name=DEFAULT_LEXICON):
+    """
+    Return the words and conundrum words of a named lexicon.
+
+    'scrabble' is word_set.py as is, 'countdown' keeps the
+    words a nine tile rack can make and 'family' drops the
+    words the profanity filter would reject.
+
+    Parameters
+    ----------
+    name : string
+        One of LEXICONS.
+
+    Returns
+    -------
+    words : list
+        Words in the lexicon.
+    nine_letter_words : list
+        Conundrum words in the lexicon.
+    """
+    # Only the build step pays for parsing the large
+    # word_set literal
+    from word_set import word_set
+    from nine_letter_word_list import nine_letter_word_list
+    words = sorted(word.upper() for word in word_set)
+    nine_letter_words = [word.upper() for word in nine_letter_word_list]
+    if name == 'countdown':
+        words = [word for word in words if len(word) <= COUNTDOWN_MAX_LENGTH]
+    elif name == 'family':
+        from profanity_model import load_profanity_model
+        predict_prob = load_profanity_model().predict_prob
+        words = [
+            word for word, probability in zip(words, predict_prob(words))
+            if probability < FAMILY_PROFANITY_LIMIT
+        ]
+    elif name != DEFAULT_LEXICON:
+        raise ValueError(f'LEXICON must be one of {", ".join(LEXICONS)}')
+    kept = set(words)
+    return words, [word for word in nine_letter_words if word in kept]
+
+
+def build_named_lexicon(name=DEFAULT_LEXICON, path=None):
+    """
+    Compile a named lexicon into its artifact.
+
+    Parameters
+    ----------
+    name : string
+        One of LEXICONS.
+    path : string
+        Destination path, the lexicon's own path if None.
+
+    Returns
+    -------
+    word_count : int
+        Number of words written to the artifact.
+    """
+    words, nine_letter_words = lexicon_words(name)
+    return build_lexicon(
+        words, nine_letter_words, path or lexicon_path(name)
+    )
+
+
+def load_lexicon(path=LEXICON_PATH):
+    """
+    Map the lexicon artifact built by build_data.py.
+
+    Game processes never build the lexicon themselves, so
+    concurrent sessions can't race to write it and don't
+    import word_set.py. bin/post_compile builds it on
+    deploy.
+
+    Parameters
+    ----------
+    path : string
+        Path of the artifact.
+
+    Returns
+    -------
+    object
+        Lexicon instance.
+
+    Raises
+    ------
+    StaleArtifactError
+        If the artifact is missing or can't be used as
+        built.
+    """
+    try:
+        return Lexicon(path)
+    except FileNotFoundError as e:
+        raise StaleArtifactError(
+            f'{path} is missing, run python build_data.py lexicon'
+        ) from e
+    except ValueError as e:
+        raise StaleArtifactError(
+            f'{e}, run python build_data.py lexicon'
+        ) from e
+
+
+# Lexicons this process has mapped, by name
+_open_lexicons = {}
+
+
+def get_lexicon(name=None):
+    """
+    Return a named lexicon, mapping it on first use.
+
+    Lexicons are only mapped when a session asks for them
+    so unused lexicons cost nothing, and the mapped pages
+    are shared read-only by every game process.
+
+    Parameters
+    ----------
+    name : string
+        One of LEXICONS. Read from the LEXICON environment
+        variable if not given, defaulting to 'scrabble'.
+
+    Returns
+    -------
+    object
+        Lexicon instance.
+    """
+    name = name or os.environ.get('LEXICON', DEFAULT_LEXICON)
+    if name not in _open_lexicons:
+        _open_lexicons[name] = load_lexicon(lexicon_path(name))
+    return _open_lexicons[name]
@@ -0,0 +1,303 @@
+# Imports
+# Python
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from itertools import combinations
+
+# Most solutions listed for a numbers round
+MAX_SOLUTIONS = 10
+# Binding strength of each operator, for parentheses
+PRECEDENCE = {'+': 1, '-': 1, '*': 2, '/': 2}
+
+
+class NumbersSolution:
+    """
+    Result of solving a numbers round.
+
+    Attributes
+    ----------
+    target : int
+        Target number.
+    numbers : list
+        Numbers chosen for the round.
+    closest : int
+        Reachable value nearest the target, the target
+        itself if it can be reached.
+    difference : int
+        Distance between closest and the target.
+    solutions : list
+        Expressions reaching closest, fewest numbers
+        first, at most MAX_SOLUTIONS.
+    shortest : string
+        Expression reaching closest with the fewest
+        numbers.
+    numbers_used : int
+        How many numbers shortest uses.
+    exact : boolean
+        True if the target can be reached.
+    """
+    def __init__(self, target, numbers, closest, solutions, numbers_used):
+        self.target = target
+        self.numbers = numbers
+        self.closest = closest
+        self.difference = abs(target - closest)
+        self.solutions = solutions
+        self.shortest = solutions[0]
+        self.numbers_used = numbers_used
+
+    @property
+    def exact(self):
+        return self.difference == 0
+
+
+def combine(left, right, left_tiles, right_tiles, values):
+    """
+    Add every value reachable by one operation between a
+    value of left and a value of right to values.
+
+    Countdown rules allow only positive whole numbers at
+    every step, so subtraction must leave a positive
+    result and division must be exact. Multiplying or
+    dividing by 1 and results equal to an operand are
+    skipped as fewer numbers already reach them.
+
+    Parameters
+    ----------
+    left : dict
+        Values reachable with left_tiles.
+    right : dict
+        Values reachable with right_tiles.
+    left_tiles : tuple
+        Sorted numbers used by the left values.
+    right_tiles : tuple
+        Sorted numbers used by the right values.
+    values : dict
+        Values mapped to how they were first reached, as
+        (operator, left tiles, left value, right tiles,
+        right value). Updated in place.
+    """
+    for a in left:
+        for b in right:
+            if a < b:
+                big, big_tiles, small, small_tiles = (
+                    b, right_tiles, a, left_tiles
+                )
+            else:
+                big, big_tiles, small, small_tiles = (
+                    a, left_tiles, b, right_tiles
+                )
+            step = (big_tiles, big, small_tiles, small)
+            if (big + small) not in values:
+                values[big + small] = ('+',) + step
+            if big != small and big - small != small:
+                if (big - small) not in values:
+                    values[big - small] = ('-',) + step
+            if small != 1:
+                if (big * small) not in values:
+                    values[big * small] = ('*',) + step
+                if big % small == 0 and big // small != small:
+                    if (big // small) not in values:
+                        values[big // small] = ('/',) + step
+
+
+def reachable(tiles, memo):
+    """
+    Return every value reachable using all of the tiles.
+
+    Values are found by splitting the tiles every way
+    into two groups, solved in turn and memoised by their
+    sorted numbers, and combining a value of each group.
+    Groups are enumerated as bitmasks, the lowest tile
+    always in the first group so each split is tried once.
+
+    Parameters
+    ----------
+    tiles : tuple
+        Sorted numbers.
+    memo : dict
+        Sorted numbers mapped to their reachable values,
+        shared between calls.
+
+    Returns
+    -------
+    dict
+        Values mapped to how they were first reached,
+        None for a single tile.
+    """
+    if tiles in memo:
+        return memo[tiles]
+    if len(tiles) == 1:
+        values = {tiles[0]: None}
+    else:
+        values = {}
+        count = len(tiles)
+        full = (1 << count) - 1
+        tried = set()
+        # Masks with the lowest bit set, except the full mask
+        for mask in range(1, full, 2):
+            left_tiles = tuple(
+                tiles[ind] for ind in range(count) if mask >> ind & 1
+            )
+            # Repeated numbers give the same split more than once
+            if left_tiles in tried:
+                continue
+            tried.add(left_tiles)
+            right_tiles = tuple(
+                tiles[ind] for ind in range(count) if not mask >> ind & 1
+            )
+            combine(
+                reachable(left_tiles, memo), reachable(right_tiles, memo),
+                left_tiles, right_tiles, values
+            )
+    memo[tiles] = values
+    return values
+
+
+def postfix(tiles, value, memo):
+    """
+    Return how a value is reached with the tiles as a
+    postfix program.
+
+    Parameters
+    ----------
+    tiles : tuple
+        Sorted numbers the value was reached with.
+    value : int
+        Reached value.
+    memo : dict
+        Memo filled by reachable.
+
+    Returns
+    -------
+    list
+        Numbers and operators, each operator applying to
+        the two results before it.
+    """
+    step = memo[tiles][value]
+    if step is None:
+        return [value]
+    operator, big_tiles, big, small_tiles, small = step
+    return (
+        postfix(big_tiles, big, memo)
+        + postfix(small_tiles, small, memo)
+        + [operator]
+    )
+
+
+def infix(program):
+    """
+    Write out a postfix program as an expression.
+
+    Parameters
+    ----------
+    program : list
+        Numbers and operators from postfix.
+
+    Returns
+    -------
+    string
+        Expression using * and / as the player types them,
+        with only the parentheses it needs.
+    """
+    # Each entry is an expression and its binding strength
+    stack = []
+    for token in program:
+        if token not in PRECEDENCE:
+            stack.append((str(token), 3))
+            continue
+        right, right_strength = stack.pop()
+        left, left_strength = stack.pop()
+        strength = PRECEDENCE[token]
+        if left_strength < strength:
+            left = f'({left})'
+        # The right operand of - and / needs parentheses at
+        # the same strength
+        if right_strength < strength or (
+            right_strength == strength and token in '-/'
+        ):
+            right = f'({right})'
+        stack.append((f'{left} {token} {right}', strength))
+    return stack[0][0]
+
+
+def expression(tiles, value, memo):
+    """
+    Write out how a value is reached with the tiles.
+
+    Parameters
+    ----------
+    tiles : tuple
+        Sorted numbers the value was reached with.
+    value : int
+        Reached value.
+    memo : dict
+        Memo filled by reachable.
+
+    Returns
+    -------
+    string
+        Expression using * and / as the player types them.
+    """
+    return infix(postfix(tiles, value, memo))
+
+
+def solve(numbers, target, max_solutions=MAX_SOLUTIONS, memo=None):
+    """
+    Solve a numbers round.
+
+    Every value reachable with every selection of the
+    numbers is found with dynamic programming over the
+    selections, so the exact solutions, closest value and
+    shortest expression all come from one pass.
+
+    Parameters
+    ----------
+    numbers : list
+        Numbers chosen for the round.
+    target : int
+        Target number.
+    max_solutions : int
+        Most expressions to return.
+    memo : dict
+        Reachable values of sorted numbers, to share work
+        between solves. A new memo is used if None.
+
+    Returns
+    -------
+    object
+        NumbersSolution instance.
+    """
+    memo = {} if memo is None else memo
+    tiles = tuple(sorted(numbers))
+    closest = None
+    found = []
+    for size in range(1, len(tiles) + 1):
+        for selection in sorted(set(combinations(tiles, size))):
+            values = reachable(selection, memo)
+            if target in values:
+                if closest != target:
+                    closest = target
+                    found = []
+                found.append(selection)
+            elif closest != target:
+                # Nearest value either side, the lower on a tie
+                nearest = min(
+                    values, key=lambda value: (abs(value - target), value)
+                )
+                if closest is None or (
+                    (abs(nearest - target), nearest)
+                    < (abs(closest - target), closest)
+                ):
+                    closest = nearest
+                    found = [selection]
+                elif nearest == closest:
+                    found.append(selection)
+    solutions = []
+    for selection in found:
+        text = expression(selection, closest, memo)
+        if text not in solutions:
+            solutions.append(text)
+        if len(solutions) == max_solutions:
+            break
+    return NumbersSolution(
+        target, list(numbers), closest, solutions, len(found[0])
+    )
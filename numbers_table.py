@@ -0,0 +1,337 @@
+# Imports
+# Python
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from bisect import bisect_left
+from collections import ChainMap
+from itertools import combinations
+import mmap
+import os
+import struct
+# Internal
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from lexicon import (
+    DATA_DIR,
+    StaleArtifactError,
+    read_section_table,
+    write_artifact
+)
+from numbers_solver import NumbersSolution, infix, postfix, reachable
+# Third Party
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+import numpy as np
+
+NUMBERS_TABLE_PATH = os.path.join(DATA_DIR, 'numbers_table.bin')
+# Numbers.big and Numbers.small, each drawn at most once
+DRAW_TILES = (1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 25, 50, 75, 100)
+# Numbers in a draw
+DRAW_SIZE = 6
+# Numbers.random_target range
+MIN_TARGET = 100
+MAX_TARGET = 999
+# Draw size, lowest and highest target of a table
+TABLE_META = struct.Struct('<III')
+# Sections every numbers table must contain
+TABLE_SECTIONS = ('ntmeta', 'nttiles', 'ntcells')
+# Format version of numbers table artifacts
+TABLE_VERSION = 4
+# Witness programs are up to 11 four bit tokens, the draw
+# index of a number or an operator, padded with EMPTY
+OPERATORS = ('+', '-', '*', '/')
+TOKEN_BITS = 4
+EMPTY = 0xF
+PROGRAM_BITS = 44
+# Memoised values of groups up to this size are kept for
+# every draw, larger groups only for the draw being solved
+SHARED_GROUP_SIZE = 4
+
+
+def encode_program(program, draw):
+    """
+    Pack a postfix program into an integer.
+
+    Parameters
+    ----------
+    program : list
+        Numbers and operators from numbers_solver.postfix.
+    draw : tuple
+        Sorted numbers of the draw.
+
+    Returns
+    -------
+    int
+        Four bits per token, first token lowest.
+    """
+    code = 0
+    for ind in range(PROGRAM_BITS // TOKEN_BITS):
+        if ind < len(program):
+            token = program[ind]
+            if token in OPERATORS:
+                token = DRAW_SIZE + OPERATORS.index(token)
+            else:
+                token = draw.index(token)
+        else:
+            token = EMPTY
+        code |= token << (ind * TOKEN_BITS)
+    return code
+
+
+def decode_program(code, draw):
+    """
+    Unpack a postfix program packed by encode_program.
+
+    Parameters
+    ----------
+    code : int
+        Packed program.
+    draw : tuple
+        Sorted numbers of the draw.
+
+    Returns
+    -------
+    list
+        Numbers and operators.
+    """
+    program = []
+    for ind in range(PROGRAM_BITS // TOKEN_BITS):
+        token = code >> (ind * TOKEN_BITS) & EMPTY
+        if token == EMPTY:
+            break
+        elif token >= DRAW_SIZE:
+            program.append(OPERATORS[token - DRAW_SIZE])
+        else:
+            program.append(draw[token])
+    return program
+
+
+def draw_cells(draw, memo, targets):
+    """
+    Solve every target for one draw.
+
+    Parameters
+    ----------
+    draw : tuple
+        Sorted numbers of the draw.
+    memo : dict
+        Memo for numbers_solver.reachable.
+    targets : range
+        Targets to solve.
+
+    Returns
+    -------
+    ndarray
+        uint64 cell for each target, the closest value in
+        the high bits and a shortest witness in the low
+        PROGRAM_BITS.
+    """
+    # First, so fewest numbers, selection reaching each value
+    shortest = {}
+    for size in range(1, len(draw) + 1):
+        for selection in combinations(draw, size):
+            for value in reachable(selection, memo):
+                if value not in shortest:
+                    shortest[value] = selection
+    values = sorted(shortest)
+    cells = np.zeros(len(targets), dtype=np.uint64)
+    for ind, target in enumerate(targets):
+        closest = target
+        if target not in shortest:
+            # Nearest value either side, the lower on a tie
+            position = bisect_left(values, target)
+            candidates = values[max(position - 1, 0):position + 1]
+            closest = min(
+                candidates, key=lambda value: (abs(value - target), value)
+            )
+        program = postfix(shortest[closest], closest, memo)
+        cells[ind] = (closest << PROGRAM_BITS) | encode_program(
+            program, draw
+        )
+    return cells
+
+
+def build_numbers_table(
+    path=NUMBERS_TABLE_PATH, tiles=DRAW_TILES, draw_size=DRAW_SIZE,
+    min_target=MIN_TARGET, max_target=MAX_TARGET
+):
+    """
+    Solve every draw and target into a numbers table.
+
+    Parameters
+    ----------
+    path : string
+        Destination path of the artifact.
+    tiles : tuple
+        Numbers a draw is taken from, each at most once.
+    draw_size : int
+        Numbers in a draw.
+    min_target : int
+        Lowest target.
+    max_target : int
+        Highest target.
+
+    Returns
+    -------
+    draws : int
+        Number of draws solved.
+    """
+    tiles = tuple(sorted(tiles))
+    targets = range(min_target, max_target + 1)
+    shared = {}
+    for size in range(1, SHARED_GROUP_SIZE + 1):
+        for group in combinations(tiles, size):
+            reachable(group, shared)
+    cells = [
+        draw_cells(draw, ChainMap({}, shared), targets)
+        for draw in combinations(tiles, draw_size)
+    ]
+    write_artifact(path, {
+        'ntmeta': TABLE_META.pack(draw_size, min_target, max_target),
+        'nttiles': np.array(tiles, dtype=np.uint16).tobytes(),
+        'ntcells': np.concatenate(cells).tobytes(),
+    }, TABLE_VERSION)
+    return len(cells)
+
+
+class NumbersTable:
+    """
+    Memory-mapped answer for every numbers round.
+
+    Draws are numbered in the order itertools.combinations
+    lists them, and each has one eight byte cell per
+    target holding the closest reachable value and a
+    postfix witness using the fewest numbers, so any draw
+    and target is answered by one array read.
+
+    Attributes
+    ----------
+    path : string
+        Path to the numbers table artifact.
+    tiles : tuple
+        Numbers a draw is taken from.
+    min_target : int
+        Lowest target in the table.
+    max_target : int
+        Highest target in the table.
+
+    Methods
+    -------
+    lookup(numbers, target)
+        Return the closest value and witness of a round.
+    solution(numbers, target)
+        Return a round's answer as a NumbersSolution.
+    """
+    def __init__(self, path=NUMBERS_TABLE_PATH):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        version, checksum, sections = read_section_table(
+            self._mmap, path, TABLE_SECTIONS, TABLE_VERSION
+        )
+        draw_size, self.min_target, self.max_target = TABLE_META.unpack_from(
+            self._mmap, sections['ntmeta'][0]
+        )
+        offset, length = sections['nttiles']
+        self.tiles = tuple(
+            int(tile) for tile in np.frombuffer(
+                self._mmap, dtype=np.uint16, count=length // 2, offset=offset
+            )
+        )
+        # Draw numbers by their sorted numbers
+        self._draws = {
+            draw: ind
+            for ind, draw in enumerate(combinations(self.tiles, draw_size))
+        }
+        self._targets = self.max_target - self.min_target + 1
+        offset, length = sections['ntcells']
+        if length != len(self._draws) * self._targets * 8:
+            raise ValueError(f'{path} has the wrong number of cells')
+        self._cells = np.frombuffer(
+            self._mmap, dtype=np.uint64, count=length // 8, offset=offset
+        )
+
+    def lookup(self, numbers, target):
+        """
+        Return the closest value and witness of a round.
+
+        Parameters
+        ----------
+        numbers : list
+            Numbers chosen for the round.
+        target : int
+            Target number.
+
+        Returns
+        -------
+        closest : int
+            Reachable value nearest the target.
+        program : list
+            Postfix witness reaching closest with the
+            fewest numbers.
+
+        Raises
+        ------
+        KeyError
+            If the draw or target isn't in the table.
+        """
+        draw = tuple(sorted(numbers))
+        if not self.min_target <= target <= self.max_target:
+            raise KeyError(target)
+        cell = int(self._cells[
+            self._draws[draw] * self._targets + target - self.min_target
+        ])
+        closest = cell >> PROGRAM_BITS
+        program = decode_program(cell & ((1 << PROGRAM_BITS) - 1), draw)
+        return closest, program
+
+    def solution(self, numbers, target):
+        """
+        Return a round's answer as a NumbersSolution.
+
+        Parameters
+        ----------
+        numbers : list
+            Numbers chosen for the round.
+        target : int
+            Target number.
+
+        Returns
+        -------
+        object
+            NumbersSolution with the witness as its only
+            solution.
+        """
+        closest, program = self.lookup(numbers, target)
+        numbers_used = sum(token not in OPERATORS for token in program)
+        return NumbersSolution(
+            target, list(numbers), closest, [infix(program)], numbers_used
+        )
+
+
+def load_numbers_table(path=NUMBERS_TABLE_PATH):
+    """
+    Map the numbers table.
+
+    Parameters
+    ----------
+    path : string
+        Path of the artifact.
+
+    Returns
+    -------
+    object or None
+        NumbersTable, or None if it hasn't been built.
+
+    Raises
+    ------
+    StaleArtifactError
+        If the table was built but can't be used, so a
+        stale table doesn't quietly fall back to solving
+        every round.
+    """
+    try:
+        return NumbersTable(path)
+    except FileNotFoundError:
+        return None
+    except ValueError as e:
+        raise StaleArtifactError(
+            f'{e}, run python build_data.py numbers'
+        ) from e
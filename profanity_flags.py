@@ -0,0 +1,219 @@
+# Imports
+# Python
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+import mmap
+import os
+# Internal
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from lexicon import (
+    DATA_DIR,
+    DEFAULT_LEXICON,
+    LEXICONS,
+    StaleArtifactError,
+    read_section_table,
+    write_artifact
+)
+# Third Party
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+import numpy as np
+
+# Words the profanity model scores at or above this are flagged
+PROFANITY_LIMIT = 0.9
+# Words scored by the profanity model in each call
+PROFANITY_BATCH_SIZE = 10000
+# Sections every profanity bitmap must contain
+PROFANITY_SECTIONS = ('pfsum', 'pfbits')
+# Format version of profanity flags artifacts
+PROFANITY_FLAGS_VERSION = 4
+
+
+class ProfanityFlags:
+    """
+    Memory-mapped, read-only profanity flag for each word
+    in a lexicon.
+
+    One bit per word in word id order, set when the
+    profanity model rejects the word, so filtering
+    generated words is a bit test instead of a model call.
+    The conundrum words are lexicon words so their flags
+    are in the same bitmap.
+
+    Attributes
+    ----------
+    path : string
+        Path to the profanity bitmap artifact.
+    bits : ndarray
+        uint8 packed flags, word id 0 in the lowest bit
+        of the first byte.
+
+    Methods
+    -------
+    flagged(word_id)
+        Check if the profanity model rejects a word id.
+    word_flagged(word)
+        Check if the profanity model rejects a word.
+    """
+    def __init__(self, path, lexicon):
+        self.path = path
+        self.lexicon = lexicon
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        version, checksum, sections = read_section_table(
+            self._mmap, path, PROFANITY_SECTIONS, PROFANITY_FLAGS_VERSION
+        )
+        offset, length = sections['pfsum']
+        if self._mmap[offset:offset + length] != lexicon.word_checksum:
+            raise ValueError(f'{path} was built for a different lexicon')
+        offset, length = sections['pfbits']
+        if length != (len(lexicon) + 7) // 8:
+            raise ValueError(f'{path} has the wrong number of words')
+        self.bits = np.frombuffer(
+            self._mmap, dtype=np.uint8, count=length, offset=offset
+        )
+
+    def flagged(self, word_id):
+        """
+        Check if the profanity model rejects a word id.
+
+        Parameters
+        ----------
+        word_id : int
+            Position of the word in sorted order.
+
+        Returns
+        -------
+        boolean
+            True if the word is profane.
+        """
+        return bool(self.bits[word_id >> 3] >> (word_id & 7) & 1)
+
+    def word_flagged(self, word):
+        """
+        Check if the profanity model rejects a word.
+
+        Parameters
+        ----------
+        word : string
+            Word in any letter case.
+
+        Returns
+        -------
+        boolean or None
+            True if the word is profane, None if it isn't
+            in the lexicon.
+        """
+        word_id = self.lexicon.word_id(word)
+        return None if word_id is None else self.flagged(word_id)
+
+
+def profanity_flags_path(name=DEFAULT_LEXICON):
+    """
+    Return the profanity bitmap path of a named lexicon.
+
+    Parameters
+    ----------
+    name : string
+        One of LEXICONS.
+
+    Returns
+    -------
+    string
+        Path of the artifact.
+    """
+    if name not in LEXICONS:
+        raise ValueError(f'LEXICON must be one of {", ".join(LEXICONS)}')
+    return os.path.join(DATA_DIR, f'profanity_{name}.bin')
+
+
+def profanity_bits(lexicon, predict, limit=PROFANITY_LIMIT):
+    """
+    Score every word in a lexicon and pack the results
+    into one bit per word id.
+
+    Parameters
+    ----------
+    lexicon : object
+        Lexicon the flags are aligned with.
+    predict : function
+        Takes a list of strings and returns the
+        probability each contains profanity.
+    limit : float
+        Probability at or above which a word is flagged.
+
+    Returns
+    -------
+    ndarray
+        uint8 packed flags.
+    """
+    flags = np.zeros(len(lexicon), dtype=bool)
+    for start in range(0, len(lexicon), PROFANITY_BATCH_SIZE):
+        stop = min(start + PROFANITY_BATCH_SIZE, len(lexicon))
+        words = [lexicon.word(word_id) for word_id in range(start, stop)]
+        flags[start:stop] = np.asarray(predict(words)) >= limit
+    return np.packbits(flags, bitorder='little')
+
+
+def build_profanity_flags(lexicon, path, predict=None):
+    """
+    Write a lexicon's profanity flags to a bitmap artifact.
+
+    Parameters
+    ----------
+    lexicon : object
+        Lexicon the flags are aligned with.
+    path : string
+        Destination path of the artifact.
+    predict : function
+        Profanity model, the exported alt-profanity-check
+        model if None.
+
+    Returns
+    -------
+    flagged : int
+        Number of profane words.
+    """
+    if predict is None:
+        # Only the build step needs the profanity model
+        from profanity_model import load_profanity_model
+        predict = load_profanity_model().predict_prob
+    bits = profanity_bits(lexicon, predict)
+    write_artifact(path, {
+        'pfsum': lexicon.word_checksum,
+        'pfbits': bits.tobytes(),
+    }, PROFANITY_FLAGS_VERSION)
+    return int(np.unpackbits(bits).sum())
+
+
+def load_profanity_flags(lexicon, name=DEFAULT_LEXICON, path=None):
+    """
+    Map a lexicon's profanity bitmap.
+
+    Parameters
+    ----------
+    lexicon : object
+        Lexicon the flags are aligned with.
+    name : string
+        One of LEXICONS.
+    path : string
+        Path of the artifact, the named lexicon's if None.
+
+    Returns
+    -------
+    object or None
+        ProfanityFlags, or None if not built.
+
+    Raises
+    ------
+    StaleArtifactError
+        If the artifact was built but can't be used, so a
+        stale artifact doesn't quietly send every check to
+        the profanity model.
+    """
+    try:
+        return ProfanityFlags(path or profanity_flags_path(name), lexicon)
+    except FileNotFoundError:
+        return None
+    except ValueError as e:
+        raise StaleArtifactError(
+            f'{e}, run python build_data.py profanity'
+        ) from e
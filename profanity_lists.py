@@ -0,0 +1,237 @@
+# Imports
+# Python
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from hashlib import blake2b
+import mmap
+import os
+# Internal
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from lexicon import (
+    DATA_DIR,
+    DEFAULT_LEXICON,
+    LEXICONS,
+    StaleArtifactError,
+    read_section_table,
+    write_artifact
+)
+# Third Party
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+import numpy as np
+
+# Sections every profanity lists artifact must contain
+LISTS_SECTIONS = ('plsum', 'plblock', 'plallow')
+# Format version of profanity lists artifacts
+LISTS_VERSION = 4
+
+
+def text_hash(text):
+    """
+    Return the 64 bit hash of a text, ignoring letter case.
+
+    Python's own string hash changes between processes, so
+    a hash stored in a file needs a stable one.
+
+    Parameters
+    ----------
+    text : string
+        Text to hash.
+
+    Returns
+    -------
+    int
+        Non-zero 64 bit hash, 0 marks an empty slot.
+    """
+    digest = blake2b(text.upper().encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') or 1
+
+
+def hash_table(texts):
+    """
+    Build an open addressing table of text hashes.
+
+    Parameters
+    ----------
+    texts : iterable
+        Texts in the set.
+
+    Returns
+    -------
+    ndarray
+        uint64 hashes, at most half full, with a power of
+        two size so a slot is found with a bit mask.
+    """
+    hashes = {text_hash(text) for text in texts}
+    size = 1
+    while size < 2 * len(hashes):
+        size *= 2
+    table = np.zeros(size, dtype=np.uint64)
+    mask = size - 1
+    for value in hashes:
+        ind = value & mask
+        while table[ind]:
+            ind = (ind + 1) & mask
+        table[ind] = value
+    return table
+
+
+class HashedSet:
+    """
+    Read-only set of texts stored as an open addressing
+    table of 64 bit hashes.
+
+    Membership is a hash and, almost always, a single slot
+    read, and the table can be memory mapped and shared by
+    every game process.
+
+    Attributes
+    ----------
+    table : ndarray
+        uint64 hashes, 0 for empty slots.
+    """
+    def __init__(self, table):
+        self.table = table
+        self._mask = len(table) - 1
+
+    def __contains__(self, text):
+        value = text_hash(text)
+        ind = value & self._mask
+        while True:
+            slot = int(self.table[ind])
+            if slot == value:
+                return True
+            elif not slot:
+                return False
+            ind = (ind + 1) & self._mask
+
+    def __len__(self):
+        return int(np.count_nonzero(self.table))
+
+
+class ProfanityLists:
+    """
+    Memory-mapped blocklist and allowlist of a lexicon.
+
+    The blocklist holds every lexicon word the profanity
+    model rejects and the allowlist every other lexicon
+    word, so checking a known word needs no model call.
+
+    Attributes
+    ----------
+    path : string
+        Path to the profanity lists artifact.
+    blocklist : object
+        HashedSet of profane words.
+    allowlist : object
+        HashedSet of clean words.
+    """
+    def __init__(self, path, lexicon):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        version, checksum, sections = read_section_table(
+            self._mmap, path, LISTS_SECTIONS, LISTS_VERSION
+        )
+        offset, length = sections['plsum']
+        if self._mmap[offset:offset + length] != lexicon.word_checksum:
+            raise ValueError(f'{path} was built for a different lexicon')
+        self.blocklist = self._hashed_set(sections, 'plblock')
+        self.allowlist = self._hashed_set(sections, 'plallow')
+
+    def _hashed_set(self, sections, name):
+        """
+        Return a hash table section as a HashedSet.
+        """
+        offset, length = sections[name]
+        return HashedSet(np.frombuffer(
+            self._mmap, dtype=np.uint64, count=length // 8, offset=offset
+        ))
+
+
+def profanity_lists_path(name=DEFAULT_LEXICON):
+    """
+    Return the profanity lists path of a named lexicon.
+
+    Parameters
+    ----------
+    name : string
+        One of LEXICONS.
+
+    Returns
+    -------
+    string
+        Path of the artifact.
+    """
+    if name not in LEXICONS:
+        raise ValueError(f'LEXICON must be one of {", ".join(LEXICONS)}')
+    return os.path.join(DATA_DIR, f'profanity_lists_{name}.bin')
+
+
+def build_profanity_lists(lexicon, flags, path):
+    """
+    Write a lexicon's blocklist and allowlist to a
+    profanity lists artifact.
+
+    Parameters
+    ----------
+    lexicon : object
+        Lexicon the lists are built from.
+    flags : object
+        ProfanityFlags of the lexicon.
+    path : string
+        Destination path of the artifact.
+
+    Returns
+    -------
+    blocked : int
+        Number of words in the blocklist.
+    allowed : int
+        Number of words in the allowlist.
+    """
+    blocked = []
+    allowed = []
+    for word_id in range(len(lexicon)):
+        if flags.flagged(word_id):
+            blocked.append(lexicon.word(word_id))
+        else:
+            allowed.append(lexicon.word(word_id))
+    write_artifact(path, {
+        'plsum': lexicon.word_checksum,
+        'plblock': hash_table(blocked).tobytes(),
+        'plallow': hash_table(allowed).tobytes(),
+    }, LISTS_VERSION)
+    return len(blocked), len(allowed)
+
+
+def load_profanity_lists(lexicon, name=DEFAULT_LEXICON, path=None):
+    """
+    Map a lexicon's profanity lists.
+
+    Parameters
+    ----------
+    lexicon : object
+        Lexicon the lists were built from.
+    name : string
+        One of LEXICONS.
+    path : string
+        Path of the artifact, the named lexicon's if None.
+
+    Returns
+    -------
+    object or None
+        ProfanityLists, or None if not built.
+
+    Raises
+    ------
+    StaleArtifactError
+        If the artifact was built but can't be used, so a
+        stale artifact doesn't quietly send every check to
+        the profanity model.
+    """
+    try:
+        return ProfanityLists(path or profanity_lists_path(name), lexicon)
+    except FileNotFoundError:
+        return None
+    except ValueError as e:
+        raise StaleArtifactError(
+            f'{e}, run python build_data.py profanity'
+        ) from e
@@ -0,0 +1,389 @@
+# Imports
+# Python
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from collections import Counter
+from functools import lru_cache
+import mmap
+import os
+import re
+import struct
+# Internal
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from disk_cache import MISSING
+from lexicon import DATA_DIR, read_section_table, write_artifact
+# Third Party
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+import numpy as np
+
+# Profanity model exported from alt-profanity-check
+PROFANITY_MODEL_PATH = os.path.join(DATA_DIR, 'profanity_model.bin')
+# Profanity scores of repeated texts kept by each process
+PROFANITY_CACHE_SIZE = 4096
+# Profanity scores of phrases shared by game processes
+PROFANITY_CACHE_PATH = os.path.join(DATA_DIR, 'profanity_cache.sqlite')
+PROFANITY_SHARED_CACHE_SIZE = 20000
+# term and calibrated classifier counts of an exported model
+MODEL_META = struct.Struct('<II')
+# Sections every exported profanity model must contain
+MODEL_SECTIONS = (
+    'pmmeta', 'pmtoken', 'pmterms', 'pmidf', 'pmcoef', 'pmbias', 'pmcal'
+)
+# Format version of profanity model artifacts
+MODEL_VERSION = 5
+# Vectoriser settings the NumPy scoring reproduces
+VECTORIZER_PARAMS = {
+    'analyzer': 'word',
+    'binary': False,
+    'lowercase': True,
+    'ngram_range': (1, 1),
+    'norm': 'l2',
+    'preprocessor': None,
+    'strip_accents': None,
+    'sublinear_tf': False,
+    'tokenizer': None,
+    'use_idf': True,
+}
+
+
+class ProfanityModel:
+    """
+    Memory-mapped copy of alt-profanity-check's model
+    scored with NumPy alone.
+
+    alt-profanity-check is a TF-IDF vectoriser feeding
+    linear SVMs whose decisions are calibrated with
+    sigmoids and averaged. The vocabulary, IDF weights,
+    SVM weights and sigmoid parameters are all the model
+    needs to score text, so game processes map them here
+    instead of importing scikit-learn.
+
+    Attributes
+    ----------
+    path : string
+        Path to the profanity model artifact.
+    checksum : bytes
+        sha256 digest of the model, identifying it in
+        caches.
+    terms : dict
+        Vocabulary terms mapped to their column.
+    idf : ndarray
+        float64 inverse document frequency by column.
+    coef : ndarray
+        float64 SVM weights, one row per column and one
+        column per calibrated classifier.
+    bias : ndarray
+        float64 SVM intercept of each classifier.
+    calibration : ndarray
+        float64 sigmoid slope and offset of each
+        classifier.
+
+    Methods
+    -------
+    term_counts(text)
+        Count the vocabulary terms in a text.
+    score(counts)
+        Return the probability a text is profane from its
+        term counts.
+    predict_prob(texts)
+        Return the probability each text is profane.
+    """
+    def __init__(self, path=PROFANITY_MODEL_PATH):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        version, self.checksum, sections = read_section_table(
+            self._mmap, path, MODEL_SECTIONS, MODEL_VERSION
+        )
+        term_count, classifier_count = MODEL_META.unpack_from(
+            self._mmap, sections['pmmeta'][0]
+        )
+        self._token_pattern = re.compile(self._section(sections, 'pmtoken'))
+        terms = self._section(sections, 'pmterms').split('\n')
+        if len(terms) != term_count:
+            raise ValueError(f'{path} has the wrong number of terms')
+        self.terms = {term: column for column, term in enumerate(terms)}
+        self.idf = self._array(sections, 'pmidf', term_count)
+        self.coef = self._array(
+            sections, 'pmcoef', term_count * classifier_count
+        ).reshape(term_count, classifier_count)
+        self.bias = self._array(sections, 'pmbias', classifier_count)
+        self.calibration = self._array(
+            sections, 'pmcal', 2 * classifier_count
+        ).reshape(classifier_count, 2)
+        # A text with one known term normalises to that term's
+        # weights alone, so single words and texts without a
+        # known term are scored ahead of time
+        self._empty_probability = self._probability(self.bias)
+        self._term_probabilities = self._probability(self.bias + self.coef)
+
+    def _section(self, sections, name):
+        """
+        Return a text section.
+        """
+        offset, length = sections[name]
+        return self._mmap[offset:offset + length].decode('utf-8')
+
+    def _array(self, sections, name, count):
+        """
+        Return a float64 section as an array.
+        """
+        return np.frombuffer(
+            self._mmap, dtype=np.float64, count=count,
+            offset=sections[name][0]
+        )
+
+    def _probability(self, decisions):
+        """
+        Average the calibrated probability of each classifier
+        over the last axis of decisions.
+        """
+        slope, offset = self.calibration.T
+        return np.mean(1 / (1 + np.exp(slope * decisions + offset)), axis=-1)
+
+    def term_counts(self, text):
+        """
+        Count the vocabulary terms in a text.
+
+        Parameters
+        ----------
+        text : string
+            Text to score.
+
+        Returns
+        -------
+        counts : Counter
+            Columns of the known terms mapped to how often
+            they appear. Stop words and rare words aren't
+            in the vocabulary.
+        """
+        return Counter(
+            self.terms[token]
+            for token in self._token_pattern.findall(text.lower())
+            if token in self.terms
+        )
+
+    def score(self, counts):
+        """
+        Return the probability a text is profane from its
+        term counts.
+
+        Parameters
+        ----------
+        counts : Counter
+            Term counts from term_counts.
+
+        Returns
+        -------
+        float
+            Probability the text is profane.
+        """
+        if not counts:
+            return float(self._empty_probability)
+        elif len(counts) == 1:
+            return float(self._term_probabilities[next(iter(counts))])
+        columns = np.fromiter(counts, dtype=np.intp)
+        weights = np.fromiter(
+            counts.values(), dtype=np.float64
+        ) * self.idf[columns]
+        return float(self._probability(
+            self.bias
+            + weights @ self.coef[columns] / np.sqrt(weights @ weights)
+        ))
+
+    def predict_prob(self, texts):
+        """
+        Return the probability each text is profane.
+
+        Matches profanity_check.predict_prob.
+
+        Parameters
+        ----------
+        texts : list
+            Strings to score.
+
+        Returns
+        -------
+        ndarray
+            float64 probability of each text.
+        """
+        return np.array(
+            [self.score(self.term_counts(text)) for text in texts],
+            dtype=np.float64
+        )
+
+
+class CachedProfanityModel:
+    """
+    Scores profanity through a ProfanityModel, keeping the
+    scores of recently checked texts in memory and, when
+    given a cache, the scores of phrases in a cache shared
+    by every game process and kept between runs.
+
+    Texts with one or no known term are scored from the
+    model's precomputed table faster than a cache lookup,
+    so only phrases the model has to compute are shared.
+
+    Attributes
+    ----------
+    model : object
+        ProfanityModel the scores come from.
+    cache : object
+        DiskCache the phrase scores are shared through,
+        None to keep scores in memory only.
+
+    Methods
+    -------
+    predict_prob(texts)
+        Return the probability each text is profane.
+    stats()
+        Return the caches' hit, miss and size counts.
+    """
+    def __init__(self, model, cache=None, size=PROFANITY_CACHE_SIZE):
+        self.model = model
+        self.cache = cache
+        # Scores from another model mustn't be reused
+        self._prefix = model.checksum.hex()[:12]
+        # Scoring ignores case, so lowered texts share a score
+        self._probability = lru_cache(maxsize=size)(self._score)
+
+    def _score(self, text):
+        """
+        Return the probability a lowered text is profane from
+        the shared cache or the model.
+        """
+        counts = self.model.term_counts(text)
+        if self.cache is None or len(counts) <= 1:
+            return self.model.score(counts)
+        key = f'{self._prefix}:{text}'
+        probability = self.cache.get(key, MISSING)
+        if probability is MISSING:
+            probability = self.model.score(counts)
+            self.cache.set(key, probability)
+        return probability
+
+    def predict_prob(self, texts):
+        """
+        Return the probability each text is profane.
+
+        Parameters
+        ----------
+        texts : list
+            Strings to score.
+
+        Returns
+        -------
+        ndarray
+            float64 probability of each text.
+        """
+        return np.array(
+            [self._probability(text.lower()) for text in texts],
+            dtype=np.float64
+        )
+
+    def stats(self):
+        """
+        Return the caches' hit, miss and size counts.
+
+        Returns
+        -------
+        dict
+            hits, misses, hit_rate and entries of the
+            in-memory cache, and shared with the same counts
+            of the shared cache across processes, or None.
+        """
+        info = self._probability.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            'hits': info.hits,
+            'misses': info.misses,
+            'hit_rate': info.hits / lookups if lookups else 0.0,
+            'entries': info.currsize,
+            'shared': None if self.cache is None else self.cache.stats(),
+        }
+
+
+def export_profanity_model(
+    path=PROFANITY_MODEL_PATH, vectorizer=None, model=None
+):
+    """
+    Write alt-profanity-check's vectoriser and model to a
+    profanity model artifact.
+
+    Parameters
+    ----------
+    path : string
+        Destination path of the artifact.
+    vectorizer : object
+        Fitted TfidfVectorizer, alt-profanity-check's if
+        None.
+    model : object
+        Fitted CalibratedClassifierCV of linear models,
+        alt-profanity-check's if None.
+
+    Returns
+    -------
+    term_count : int
+        Number of vocabulary terms written.
+    """
+    if vectorizer is None or model is None:
+        # Only exporting needs scikit-learn
+        from profanity_check import profanity_check
+        if vectorizer is None:
+            vectorizer = profanity_check.vectorizer
+        if model is None:
+            model = profanity_check.model
+    params = vectorizer.get_params()
+    for name, value in VECTORIZER_PARAMS.items():
+        if params[name] != value:
+            raise ValueError(
+                f'Vectoriser {name}={params[name]!r} is not supported, '
+                f'expected {value!r}'
+            )
+    if list(model.classes_) != [0, 1]:
+        raise ValueError('Only clean or profane models are supported')
+    terms = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+    coef = []
+    bias = []
+    calibration = []
+    for classifier in model.calibrated_classifiers_:
+        if classifier.method != 'sigmoid':
+            raise ValueError(
+                f'{classifier.method} calibration is not supported'
+            )
+        coef.append(classifier.estimator.coef_[0])
+        bias.append(classifier.estimator.intercept_[0])
+        calibration.append(
+            (classifier.calibrators[0].a_, classifier.calibrators[0].b_)
+        )
+    write_artifact(path, {
+        'pmmeta': MODEL_META.pack(len(terms), len(coef)),
+        'pmtoken': params['token_pattern'].encode('utf-8'),
+        'pmterms': '\n'.join(terms).encode('utf-8'),
+        'pmidf': np.asarray(vectorizer.idf_, dtype=np.float64).tobytes(),
+        'pmcoef': np.array(coef, dtype=np.float64).T.tobytes(),
+        'pmbias': np.array(bias, dtype=np.float64).tobytes(),
+        'pmcal': np.array(calibration, dtype=np.float64).tobytes(),
+    }, MODEL_VERSION)
+    return len(terms)
+
+
+def load_profanity_model(path=PROFANITY_MODEL_PATH):
+    """
+    Map the exported profanity model, exporting it first
+    if it is missing.
+
+    Parameters
+    ----------
+    path : string
+        Path of the artifact.
+
+    Returns
+    -------
+    object
+        ProfanityModel instance.
+    """
+    try:
+        return ProfanityModel(path)
+    except (OSError, ValueError):
+        export_profanity_model(path)
+        return ProfanityModel(path)
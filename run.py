@@ -2,8 +2,12 @@
 # Python
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 from time import time, sleep
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 from re import sub
+import os
 import random
+import signal
 import termios
 import sys
 import tty
@@ -14,16 +18,34 @@ from validation import (
     validate_menu_value,
     validate_vowels,
     check_profanity,
-    check_dictionary,
+    prefetch_meanings,
     print_word_meaning,
     validate_user_word,
     validate_numbers,
     validate_user_numbers,
     validate_user_solution,
-    validate_user_conundrum
+    validate_user_conundrum,
+    check_conundrum_answer
 )
-from word_set import word_set
-from nine_letter_word_list import nine_letter_word_list
+from lexicon import DEFAULT_LEXICON, get_lexicon
+from letters_solver import (
+    BLANK_TILE,
+    CONSONANT_TILES,
+    MAX_BLANK_TILES,
+    MAX_RACK_SIZE,
+    MIN_RACK_SIZE,
+    RACK_CACHE_PATH,
+    RACK_CACHE_SIZE,
+    VOWEL_TILES,
+    LetterCountEngine,
+    stream_formable_words
+)
+from disk_cache import DiskCache
+from word_frequency import load_frequency_table
+from conundrum_pool import load_conundrum_pool
+from profanity_flags import load_profanity_flags
+from numbers_solver import solve
+from numbers_table import load_numbers_table
 # Third Party
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 from inputimeout import inputimeout, TimeoutOccurred
@@ -33,8 +55,6 @@ from colorama.ansi import clear_screen
 from art import text2art
 from num2words import num2words
 import pager
-from anagram_solver.anagram_solver import find_possible, return_words
-import countdown_numbers_solver
 import gspread
 from google.oauth2.service_account import Credentials
 from prettytable import PrettyTable
@@ -54,6 +74,61 @@ SHEET = GSPREAD_CLIENT.open('countdown_game')
 # Initialise colorama
 init()
 
+# Map the compiled word lexicon shared by all game processes.
+# Each terminal session runs its own game process, and the
+# web terminal sets its LEXICON environment variable from the
+# page's lexicon query parameter, falling back to the server's
+lexicon_name = os.environ.get('LEXICON', DEFAULT_LEXICON)
+lexicon = get_lexicon(lexicon_name)
+letters_engine = LetterCountEngine(lexicon)
+# Words are scored by membership of the mapped lexicon the
+# solvers already use, so no second copy of the words is
+# kept in memory
+word_set = lexicon
+# Familiarity of each word, None if no frequency source was
+# available at build time
+word_frequency = load_frequency_table(lexicon, lexicon_name)
+# Profanity flag of each word, None if not built, in which
+# case generated words are checked by the profanity model
+profanity_flags = load_profanity_flags(lexicon, lexicon_name)
+# Conundrum words outside the curated nine letter word list
+# must be at least this familiar, about 5 uses per million
+# words
+CONUNDRUM_MIN_FAMILIARITY = 40
+# Every nine letter word with exactly one answer, and its
+# prepared scrambles
+conundrum_pool = load_conundrum_pool(lexicon, lexicon_name)
+# Conundrums are drawn from the curated words and, when word
+# frequencies are known, other familiar words
+conundrum_choices = conundrum_pool.familiar_indexes(
+    word_frequency.scores if word_frequency else None,
+    CONUNDRUM_MIN_FAMILIARITY
+)
+# Blank tiles in each letters round, the BLANK_TILES
+# environment variable turns on the blank tiles variant
+blank_tiles = min(
+    max(int(os.environ.get('BLANK_TILES', 0)), 0), MAX_BLANK_TILES
+)
+# Tiles in each letters round, the RACK_SIZE environment
+# variable sets 10 to 15 tiles for tournament variants
+rack_size = min(
+    max(int(os.environ.get('RACK_SIZE', MIN_RACK_SIZE)), MIN_RACK_SIZE),
+    MAX_RACK_SIZE
+)
+# Most words the dictionary corner shows each round
+DICTIONARY_CORNER_WORDS = 12
+# Racks solved by any game process, keyed by sorted letters
+rack_cache = DiskCache(RACK_CACHE_PATH, RACK_CACHE_SIZE)
+# Chooses the next conundrum while earlier rounds are played
+conundrum_worker = ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix='conundrum'
+)
+# Answer for every numbers round draw and target, None if
+# not built, in which case each round is solved as played.
+# A stale table stops the game starting rather than
+# quietly solving every round
+numbers_table = load_numbers_table()
+
 # Classes
 
 
@@ -627,7 +702,7 @@ class Screen:
                 ' '
             ]
         # Reset letter tiles
-        self.letter_tiles = sub(r'[a-zA-Z0-9]', '*', self.letter_tiles)
+        self.letter_tiles = sub(r'[a-zA-Z0-9?]', '*', self.letter_tiles)
         if Screen.round_number != 4:
             # Check if this is conundrum round and whether
             # to show target or scrambled conundrum
@@ -638,6 +713,9 @@ class Screen:
                 letters_object = list(new_conundrum.target)
             else:
                 letters_object = new_player.chosen_letters
+            # Larger racks need their own, narrower, tiles
+            if len(letters_object) != 9:
+                self.letter_tiles = build_letter_tiles(len(letters_object))
 
             for char in letters_object:
                 # Loop through player chosen letters and use
@@ -806,7 +884,7 @@ class Screen:
         elif self.screen_data_param == 'letters_round':
             print(
                 Style.BRIGHT + Fore.LIGHTGREEN_EX +
-                f'Choose 9 letters in total from '
+                f'Choose {rack_size} letters in total from '
                 'a selection of Vowels and Consonants\n'
                 '(Once you choose a number of vowels, the '
                 'remaining letters will be \n'
@@ -818,9 +896,9 @@ class Screen:
                 user_prompt = input(
                     Fore.WHITE +
                     'How many vowels would you like for your word?\n'
-                    '(Enter a value between 3 and 9)\n'
+                    f'(Enter a value between 3 and {rack_size})\n'
                 ).strip()
-                if validate_vowels(user_prompt):
+                if validate_vowels(user_prompt, rack_size):
                     # Empty player chosen letters then
                     # pick vowels and store in Player attribute
                     new_player.chosen_letters = []
@@ -831,12 +909,21 @@ class Screen:
                     )
                     # Select remaining letters as random consonants
                     # and store in Player attribute
-                    max_consonants = 9 - int(user_prompt)
+                    max_consonants = rack_size - int(user_prompt)
                     new_player.chosen_letters.extend(
                         new_letters.random_letters(
                             'consonants', max_consonants
                             )
                         )
+                    # Swap the last letters for blank tiles in
+                    # the blank tiles variant
+                    if blank_tiles:
+                        new_player.chosen_letters = (
+                            new_player.chosen_letters[
+                                :rack_size - blank_tiles
+                            ]
+                            + [BLANK_TILE] * blank_tiles
+                        )
                     # return flag to move to show letters
                     user_prompt = 'show_letters'
                     break
@@ -852,6 +939,12 @@ class Screen:
                 'You can only use the letters as often as they are '
                 'shown above!\n'
             )
+            if blank_tiles:
+                print(
+                    Fore.LIGHTGREEN_EX +
+                    f'The {BLANK_TILE} tiles are blanks, each can stand '
+                    'for any letter you like!\n'
+                )
             # Pause execution and wait for keypress
             wait_for_keypress(
                 Fore.YELLOW +
@@ -885,6 +978,24 @@ class Screen:
                 user_word = new_player.guessed_words[-1]
             else:
                 user_word = ''
+            # Find the dictionary corner's words now and start
+            # looking up their meanings, and the player's word's,
+            # while the player reads their own feedback
+            best_words = {}
+            for word in new_letters.stream_words(
+                new_player.chosen_letters, DICTIONARY_CORNER_WORDS
+            ):
+                best_words.setdefault(len(word), []).append(word)
+            word_lengths = list(best_words)
+            # The last length listed may have more words than
+            # the dictionary corner had room for
+            capped = sum(
+                len(words) for words in best_words.values()
+            ) == DICTIONARY_CORNER_WORDS
+            meaning_words = best_words[word_lengths[0]] if word_lengths else []
+            if user_word in word_set:
+                meaning_words = [user_word] + meaning_words
+            meanings = prefetch_meanings(meaning_words)
             if user_word == '' or user_word == ' ':
                 print(
                     Fore.WHITE +
@@ -892,13 +1003,13 @@ class Screen:
                     f"within the time limit. Better luck next round!\n"
                 )
             else:
-                # Check if word in pydictionary
+                # Score the word if it's in the lexicon, the
+                # same words the dictionary corner suggests
                 print(
                     Style.BRIGHT + Fore.WHITE +
                     f'Checking your word in the dictionary...\n'
                     )
-                valid_word = check_dictionary(user_word)
-                if valid_word:
+                if user_word in word_set:
                     round_score = new_player.update_score()
                     print(
                         f"{user_word.lower().capitalize()}, that's a "
@@ -907,7 +1018,14 @@ class Screen:
                         f"{new_player.name}, you scored {round_score} points "
                         f"for round {Screen.round_number}!"
                     )
-                elif valid_word is None:
+                    # Show the word's meaning if the dictionary
+                    # has one
+                    word_meaning = meanings[user_word.lower()].result()
+                    if word_meaning:
+                        print_word_meaning(
+                            user_word, new_player, word_meaning
+                        )
+                else:
                     print(
                         f"It appears '{user_word}' is NOT a word "
                         "found in our dictionary.\n"
@@ -920,18 +1038,22 @@ class Screen:
                 'found...'
                 + Fore.RESET
             )
-            # Print longest word if anagram solver can find one
+            # Print the best words the letter count engine finds
             print(
                 Fore.LIGHTGREEN_EX +
-                f"\nChecking what our 'limited' dictionary corner found...\n"
-                f"This might take 5 to 10 seconds...\n"
+                f"\nChecking what our dictionary corner found...\n"
                 + Fore.RESET
             )
-            longest_words, word_len = new_letters.longest_word(
-                new_player.chosen_letters
-            )
-            if longest_words:
-                if len(longest_words) == 1:
+            if word_lengths:
+                word_len = word_lengths[0]
+                longest_words = best_words[word_len]
+                if capped and len(word_lengths) == 1:
+                    print(
+                        Fore.WHITE +
+                        f"\nHere are {len(longest_words)} of the {word_len} "
+                        f"letter words that our dictionary corner found!\n"
+                    )
+                elif len(longest_words) == 1:
                     print(
                         Fore.WHITE +
                         f"\nHere's a {word_len} letter word that our "
@@ -940,19 +1062,44 @@ class Screen:
                 else:
                     print(
                         Fore.WHITE +
-                        f"\nHere are some {word_len} letter words that our "
-                        f"dictionary corner found!\n"
+                        f"\nHere are the {len(longest_words)} {word_len} "
+                        f"letter words that our dictionary corner found!\n"
                     )
-                for item in set(longest_words):
-                    # Running through in set form prevents duplicates
+                dictionary_available = True
+                for item in longest_words:
                     print(
                         Fore.YELLOW +
                         f'{item}'
                         + Fore.RESET
                     )
+                    # Stop looking up meanings once the
+                    # dictionary stops answering
+                    if not dictionary_available:
+                        continue
+                    word_meaning = meanings[item.lower()].result()
                     # Don't print meaning message if none found
-                    if check_dictionary(item):
-                        print_word_meaning(item, new_player)
+                    if word_meaning:
+                        print_word_meaning(item, new_player, word_meaning)
+                    elif word_meaning is False:
+                        dictionary_available = False
+                        print(
+                            Fore.WHITE +
+                            "Our dictionary isn't answering right now, "
+                            "so we can't show meanings this round."
+                        )
+                # List the next best words without meanings
+                if len(word_lengths) > 1:
+                    next_len = word_lengths[1]
+                    some = ''
+                    if capped and len(word_lengths) == 2:
+                        some = 'some of '
+                    print(
+                        Fore.WHITE +
+                        f"\nAnd {some}the {next_len} letter words it found:\n"
+                        + Fore.YELLOW +
+                        ', '.join(best_words[next_len])
+                        + Fore.RESET
+                    )
             else:
                 print(
                     Style.BRIGHT + Fore.WHITE +
@@ -1163,15 +1310,20 @@ class Screen:
                 user_word = new_player.guessed_conundrum[0]
             else:
                 user_word = ''
+            # Check if word matches target, or is another
+            # word spelt with the conundrum's letters
+            answer = check_conundrum_answer(user_word, new_conundrum, lexicon)
+            # Start looking up an alternative's meaning while
+            # its score is shown
+            if answer == 'valid alternative':
+                meanings = prefetch_meanings([user_word])
             if user_word == '':
                 print(
                     Fore.WHITE +
                     f"\n{new_player.name}, you didn't guess a word "
                     f"within the time limit. Better luck next time!\n"
                 )
-            # Check if word matches target
-            # Convert to upper to avoid case mismatch
-            elif user_word.upper() == new_conundrum.target.upper():
+            elif answer == 'target':
                 round_score = new_player.update_score()
                 print(
                     Style.BRIGHT + Fore.WHITE +
@@ -1182,31 +1334,31 @@ class Screen:
                     f"\n{new_player.name}, you scored {round_score} points "
                     f"for round {Screen.round_number}!\n"
                 )
+            elif answer == 'valid alternative':
+                round_score = new_player.update_score()
+                print(
+                    Style.BRIGHT + Fore.WHITE +
+                    f"{user_word.lower().capitalize()} isn't our target "
+                    f"word above, but it's a valid alternative "
+                    f"{len(user_word)} letter word!\n"
+                    f"You got it with {new_player.round_time} "
+                    f"seconds remaining. \n"
+                    f"{new_player.name}, you scored {round_score} points "
+                    f"for round {Screen.round_number}!\n"
+                )
+                # Show the word's meaning if the dictionary
+                # has one
+                word_meaning = meanings[user_word.lower()].result()
+                if word_meaning:
+                    print_word_meaning(user_word, new_player, word_meaning)
             else:
-                # Check if word in pydictionary
                 print(
                     Style.BRIGHT + Fore.WHITE +
-                    f"That isn't our target word, but let's "
-                    f'check your word in the dictionary...\n'
-                    )
-                valid_word = check_dictionary(user_word)
-                if valid_word:
-                    round_score = new_player.update_score()
-                    print(
-                        f"{user_word.lower().capitalize()}, that's wasn't "
-                        f"our target word above, but it's still a valid "
-                        f"{len(user_word)} letter word!\n"
-                        f"You got it with {new_player.round_time} "
-                        f"seconds remaining. \n"
-                        f"{new_player.name}, you scored {round_score} points "
-                        f"for round {Screen.round_number}!\n"
-                    )
-                elif valid_word is None:
-                    print(
-                        f"It appears '{user_word.lower().capitalize()}' is "
-                        f"NOT a word found in our dictionary.\n"
-                        f"Better luck next time!"
-                    )
+                    f"That isn't our target word, and "
+                    f"'{user_word.lower().capitalize()}' is "
+                    f"NOT a word found in our dictionary.\n"
+                    f"Better luck next time!"
+                )
             # Check player score against
             # leaderboard and insert if in
             # top 10. Doing before game over
@@ -1278,8 +1430,9 @@ class Letters:
     random_letters(type, count)
         Return the requested count of letters from the
         requested type of letters.
-    longest_word(anagram)
-        Return the longest anagaram solution we can find.
+    stream_words(anagram, limit=None, key=None)
+        Yield the words made from the letters, longest
+        first.
     """
 
     def __init__(self):
@@ -1301,15 +1454,8 @@ class Letters:
             player.
         """
         vowels = []
-        vowel_counts = {
-            'A': 9,
-            'E': 12,
-            'I': 9,
-            'O': 8,
-            'U': 4
-        }
         # Populate vowels  with letters from dictionary
-        for vowel, count in vowel_counts.items():
+        for vowel, count in VOWEL_TILES.items():
             vowels.extend([vowel] * count)
         # Shuffle letters in new list
         random.shuffle(vowels)
@@ -1330,31 +1476,8 @@ class Letters:
             player.
         """
         consonants = []
-        consonant_counts = {
-            'B': 2,
-            'C': 2,
-            'D': 4,
-            'F': 2,
-            'G': 3,
-            'H': 2,
-            'J': 1,
-            'K': 1,
-            'L': 4,
-            'M': 2,
-            'N': 6,
-            'P': 2,
-            'Q': 1,
-            'R': 6,
-            'S': 4,
-            'T': 6,
-            'V': 2,
-            'W': 2,
-            'X': 1,
-            'Y': 2,
-            'Z': 1
-        }
         # Populate consonants with letters from dictionary
-        for consonant, count in consonant_counts.items():
+        for consonant, count in CONSONANT_TILES.items():
             consonants.extend([consonant] * count)
         # Shuffle letters in new list
         random.shuffle(consonants)
@@ -1381,84 +1504,43 @@ class Letters:
         letter_set = self.vowels if type == 'vowels' else self.consonants
         return random.sample(letter_set, count)
 
-    def longest_word(self, anagram):
+    def stream_words(self, anagram, limit=None, key=None):
         """
-        Return the longest anagaram solution we can find.
-
-        Create some random variations of the letter
-        list and loop through the anagram solver.
-        Less time consuming than creating all
-        permutations of a set of 9 letters, but
-        also not highly effective at finding words.
-        Code adapted from
-        https://github.com/patrickleweryharris/anagram-solver
+        Yield the words made from the letters, longest
+        first, as soon as each word length is searched,
+        leaving out profane words when their flags are
+        built.
 
         Parameters
         ----------
         anagram : list
-            List of letters representing the anagram in the
-            conundrum round.
-
-        Returns
-        -------
-        actual_words : list
-            List of words generated from the anagram.
-
-        len_word : int
-            Length of words generated from the anagram.
-
+            List of letters chosen for the letters round.
+        limit : int
+            Most words to yield, all if None.
+        key : function
+            Sort key ranking words of the same length,
+            most familiar first if word frequencies are
+            known and alphabetical if not.
+
+        Yields
+        ------
+        string
+            Words, longest first.
         """
-        anagram_lst = []
-        anagram_variations = []
-        # Create list of characters
-        for char in anagram:
-            anagram_lst.append(char)
-
-        # Add initial list to variations list
-        anagram_variations.append(list(anagram_lst))
-        # Generate 2 additional mixed lists of anagrams
-        # and add to a list
-        for ind in range(1, 2):
-            random.shuffle(anagram_lst)
-            shuffled_lst = list(anagram_lst)
-            # Check the shuffled list hasn't already been
-            # generated before adding
-            if not any(lst == shuffled_lst for lst in anagram_variations):
-                anagram_variations.append(shuffled_lst)
-
-        # Loop through variations until some words are found
-        for ind in range(len(anagram_variations)):
-            words = find_possible(anagram_variations[ind])
-            # Importing custom scrabble word_set from file
-            # instead of importing word_set from
-            # the anagram_solver module
-            actual_words = return_words(words, word_set)
-
-            # Break out of the check if words are found
-            if len(actual_words) > 0:
-                actual_words = list(set(actual_words))
-                return actual_words, len(actual_words[0])
-
-            # Recurse the function by popping one letter off
-            # to see if we can quickly find a 4 letter words
-            # or longer without creating all permutations
-            if len(actual_words) == 0 and len(anagram) >= 4:
-                anagram_variations[ind].pop(-1)
-                smaller_anagram = ''.join(anagram_variations[ind])
-                new_actual_words, len_word = self.longest_word(smaller_anagram)
-                actual_words = new_actual_words
-
-                # Break out of the check if words are found
-                if len(actual_words) > 0:
-                    actual_words = list(set(actual_words))
-                    return actual_words, len(actual_words[0])
-
-            else:
-                len_word = len(anagram)
-        # Remove any duplicates by creating a set and then
-        # convert back to a list
-        actual_words = list(set(actual_words))
-        return actual_words, len_word
+        # Rank words of the same length most familiar first
+        # when word frequencies are known
+        ranking = word_frequency.scores if word_frequency else None
+        words = stream_formable_words(
+            anagram, letters_engine, rack_cache, key, ranking
+        )
+        # Leave out profane words when their flags are built,
+        # a bit test per word
+        if profanity_flags is not None:
+            words = (
+                word for word in words
+                if not profanity_flags.word_flagged(word)
+            )
+        yield from islice(words, limit)
 
 
 class Numbers:
@@ -1539,42 +1621,82 @@ class Conundrum:
     Attributes
     ----------
     target : list
-        Randomly sampled word from nine letter
-        word list.
+        Randomly sampled word from the conundrum
+        pool.
     scrambled : string
         Scambled version of the chosen conundrum
         word.
 
     Methods
     -------
+    prepare_conundrum()
+        Starts choosing the conundrum in the background.
     populate_conundrum()
         Generates conundrum word and scrambled word.
     """
     def __init__(self, target=[], scrambled=[]):
         self.target = target
         self.scrambled = scrambled
+        self.prepared = None
 
-    def populate_conundrum(self):
+    @staticmethod
+    def choose_conundrum():
         """
-        Generates conundrum word and scrambled word.
+        Chooses a word and one of its prepared scrambles
+        from the conundrum pool, leaving out obscure words
+        when word frequencies are known. Every pool word is
+        the only word its letters spell and no scramble is
+        a word.
 
-        Chooses a word from the 9 letter word list
-        and scrambles the word. Stores the target and
-        scrambled words in Conundrum attributes.
+        Returns
+        -------
+        random_conundrum : string
+            Conundrum word.
+        scrambled_conundrum : string
+            Scrambled conundrum word.
         """
         while True:
-            random_conundrum = random.sample(
-                nine_letter_word_list, 1
-            )[0].upper()
+            random_conundrum, scrambled_conundrum = conundrum_pool.sample(
+                conundrum_choices
+            )
             # Make sure word isn't on profanity list
             # to avoid validated user conundrum not
             # matching generated conundrum
             # stop looping if valid word found
-            if check_profanity(random_conundrum) < 0.9:
-                break
-        scrambled_conundrum = ''.join(
-            random.sample(random_conundrum, len(random_conundrum))
-        )
+            if not is_profane_word(random_conundrum):
+                return random_conundrum, scrambled_conundrum
+
+    def prepare_conundrum(self):
+        """
+        Starts choosing the conundrum in the background.
+
+        Called at the start of the game so the profanity
+        checks run while the player is in the earlier
+        rounds, leaving nothing to compute when the
+        conundrum round starts.
+        """
+        self.prepared = conundrum_worker.submit(self.choose_conundrum)
+
+    def populate_conundrum(self):
+        """
+        Generates conundrum word and scrambled word.
+
+        Uses the conundrum prepared in the background if
+        there is one, choosing it now if not or if
+        preparing it failed. Stores the target and
+        scrambled words in Conundrum attributes.
+        """
+        conundrum = None
+        if self.prepared is not None:
+            try:
+                conundrum = self.prepared.result()
+            except Exception:
+                # Choose again below rather than end the game
+                pass
+            self.prepared = None
+        if conundrum is None:
+            conundrum = self.choose_conundrum()
+        random_conundrum, scrambled_conundrum = conundrum
         self.target = random_conundrum
         self.scrambled = scrambled_conundrum
 
@@ -1582,6 +1704,31 @@ class Conundrum:
 # Helper Functions
 
 
+def is_profane_word(word):
+    """
+    Check if a generated word is profane.
+
+    Uses the precomputed profanity flags when they are
+    built for the lexicon, falling back to the profanity
+    model for words without a flag.
+
+    Parameters
+    ----------
+    word : string
+        Word to check.
+
+    Returns
+    -------
+    boolean
+        True if the word is profane.
+    """
+    if profanity_flags is not None:
+        flagged = profanity_flags.word_flagged(word)
+        if flagged is not None:
+            return flagged
+    return check_profanity(word) >= 0.9
+
+
 def print_centered(text):
     """
     Print text centered in terminal.
@@ -1596,6 +1743,30 @@ def print_centered(text):
     print(centered_text)
 
 
+def build_letter_tiles(tile_count):
+    """
+    Return an ASCII row of empty letter tiles, matching
+    Screen.letter_tiles for 9 tiles and narrowing the
+    tiles for larger racks so they fit the terminal.
+
+    Parameters
+    ----------
+    tile_count : int
+        Number of tiles in the row.
+
+    Returns
+    -------
+    letter_tiles : string
+        Tiles with a * placeholder in each.
+    """
+    terminal_width = 80
+    padding = 2 if tile_count <= 9 else 1
+    edge = '+' + ('-' * (padding * 2 + 1) + '+') * tile_count
+    tiles = '|' + (' ' * padding + '*' + ' ' * padding + '|') * tile_count
+    indent = ' ' * ((terminal_width - len(edge)) // 2)
+    return f'\n{indent}{edge}\n{indent}{tiles}\n{indent}{edge}\n    '
+
+
 def print_rainbow(text, alignment=None):
     """
     Print text characters in range of
@@ -1674,19 +1845,47 @@ def solve_numbers_round(new_player):
     """
     Solve for the target in the numbers round
 
-    Provide the user with solutions to reach
-    the target number using the chosen numbers.
-    Uses pypi.org/project/countdown-numbers-solver/
+    Provide the user with the shortest solution
+    to reach the target number using the chosen
+    numbers, or the closest value that can be
+    reached. Looks the round up in the precomputed
+    numbers table if built, solving it now if not,
+    and shows the same answer either way.
 
     Parameters
     ----------
     new_player : object
         Current Player Object
     """
-    countdown_numbers_solver.solve(
-        new_player.chosen_numbers,
-        new_player.target_number
-    )
+    solution = None
+    if numbers_table is not None:
+        try:
+            solution = numbers_table.solution(
+                new_player.chosen_numbers, new_player.target_number
+            )
+        except KeyError:
+            # Draw or target outside the table
+            pass
+    if solution is None:
+        # The table holds one witness per round, so only
+        # the shortest solution is needed
+        solution = solve(
+            new_player.chosen_numbers, new_player.target_number, 1
+        )
+    if solution.exact:
+        print(f'{solution.shortest} = {solution.target}')
+        plural = 's' if solution.numbers_used != 1 else ''
+        print(
+            f'\nThe shortest solution uses '
+            f'{solution.numbers_used} number{plural}.'
+        )
+    else:
+        print(
+            f"There's no way to reach {solution.target} exactly!\n"
+            f"The closest we found is {solution.closest}, "
+            f"{solution.difference} away:\n"
+        )
+        print(f'{solution.shortest} = {solution.closest}')
 
 
 def print_high_scores():
@@ -1956,7 +2155,8 @@ def round_handler(new_player, new_letters, new_numbers, new_conundrum):
         # Conundrum round
         elif user_response == 'show_conundrum':
             Screen.round_number += 1
-            # Generate target conundrum
+            # Collect the target conundrum prepared while
+            # the earlier rounds were played
             new_conundrum.populate_conundrum()
             user_response = show_conundrum.render(
                 new_player,
@@ -2010,6 +2210,8 @@ def main(existing_name='', existing_high_score=0):
     new_letters = Letters()
     new_numbers = Numbers()
     new_conundrum = Conundrum()
+    # Choose the conundrum while rounds 1 to 4 are played
+    new_conundrum.prepare_conundrum()
     # Retrieve existing player name and high score
     if existing_name:
         new_player.name = existing_name
@@ -2020,6 +2222,11 @@ def main(existing_name='', existing_high_score=0):
 
 # Call main game function
 if __name__ == "__main__":
+    # The web terminal hangs up when the player closes the
+    # page, so end the game through sys.exit to let the
+    # shared caches write their counts at exit
+    signal.signal(signal.SIGHUP, lambda signum, frame: sys.exit())
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit())
     main()
 
 # End of code...phew...thanks for reading!
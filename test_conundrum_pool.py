@@ -0,0 +1,131 @@
+# Imports
+# Python
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+import os
+import random
+import tempfile
+import unittest
+# Internal
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from lexicon import Lexicon, build_lexicon
+from conundrum_pool import (
+    ConundrumPool,
+    build_conundrum_pool,
+    unique_answer_words
+)
+# Third Party
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+import numpy as np
+
+TEST_WORDS = {
+    'ALGORITHM', 'LOGARITHM', 'COUNTDOWN', 'TRIANGLES', 'RELATINGS',
+    'ALERTINGS', 'FRAMEWORK', 'CAT', 'DOG'
+}
+
+
+class TestConundrumPool(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.lexicon_path = os.path.join(self.tmp_dir.name, 'lexicon.bin')
+        build_lexicon(TEST_WORDS, [], self.lexicon_path)
+        self.lexicon = Lexicon(self.lexicon_path)
+        self.path = os.path.join(self.tmp_dir.name, 'conundrums.bin')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_unique_answer_words(self):
+        '''
+        Tests if only nine letter words that are the sole
+        anagram of their letters are kept.
+        '''
+        self.assertEqual(
+            [self.lexicon.word(i) for i in unique_answer_words(self.lexicon)],
+            ['COUNTDOWN', 'FRAMEWORK']
+        )
+
+    def test_curated_words_with_alternatives(self):
+        '''
+        Tests if curated nine letter words are left out of
+        the pool when another word shares their letters.
+        '''
+        curated_path = os.path.join(self.tmp_dir.name, 'curated.bin')
+        build_lexicon(TEST_WORDS, ['ALGORITHM'], curated_path)
+        lexicon = Lexicon(curated_path)
+        build_conundrum_pool(lexicon, self.path, 3)
+        pool = ConundrumPool(self.path, lexicon)
+        self.assertEqual(
+            [pool.word(index) for index in range(len(pool))],
+            ['COUNTDOWN', 'FRAMEWORK']
+        )
+
+    def test_pool(self):
+        '''
+        Tests if every stored scramble is an arrangement of
+        its word that isn't a word, and if sampling returns
+        a word and one of its scrambles.
+        '''
+        self.assertEqual(
+            build_conundrum_pool(self.lexicon, self.path, 3), 2
+        )
+        pool = ConundrumPool(self.path, self.lexicon)
+        self.assertEqual(len(pool), 2)
+        self.assertEqual(pool.scrambles_per_word, 3)
+        for index in range(len(pool)):
+            word = pool.word(index)
+            for choice in range(3):
+                scrambled = pool.scramble(index, choice)
+                self.assertEqual(sorted(scrambled), sorted(word))
+                self.assertNotIn(scrambled, self.lexicon)
+        rng = random.Random(1)
+        for ind in range(20):
+            word, scrambled = pool.sample(rng=rng)
+            self.assertIn(word, ('COUNTDOWN', 'FRAMEWORK'))
+            self.assertEqual(sorted(scrambled), sorted(word))
+        self.assertEqual(pool.sample([1], rng)[0], 'FRAMEWORK')
+
+    def test_familiar_indexes(self):
+        '''
+        Tests if only familiar enough words are chosen, and
+        if the whole pool is used when none are.
+        '''
+        build_conundrum_pool(self.lexicon, self.path)
+        pool = ConundrumPool(self.path, self.lexicon)
+        scores = np.zeros(len(self.lexicon), dtype=np.uint8)
+        scores[self.lexicon.word_id('FRAMEWORK')] = 10
+        self.assertEqual(list(pool.familiar_indexes(scores, 1)), [1])
+        self.assertIsNone(pool.familiar_indexes(scores, 11))
+        self.assertIsNone(pool.familiar_indexes())
+
+    def test_curated_words(self):
+        '''
+        Tests if words in the curated nine letter word list
+        are familiar with or without scores.
+        '''
+        curated_path = os.path.join(self.tmp_dir.name, 'curated.bin')
+        build_lexicon(TEST_WORDS, ['COUNTDOWN'], curated_path)
+        lexicon = Lexicon(curated_path)
+        build_conundrum_pool(lexicon, self.path)
+        pool = ConundrumPool(self.path, lexicon)
+        self.assertEqual(list(pool.familiar_indexes()), [0])
+        scores = np.zeros(len(lexicon), dtype=np.uint8)
+        scores[lexicon.word_id('FRAMEWORK')] = 10
+        self.assertEqual(list(pool.familiar_indexes(scores, 1)), [0, 1])
+        self.assertEqual(list(pool.familiar_indexes(scores, 11)), [0])
+
+    def test_other_lexicon(self):
+        '''
+        Tests if a pool built for another lexicon is
+        rejected.
+        '''
+        build_conundrum_pool(self.lexicon, self.path)
+        other_path = os.path.join(self.tmp_dir.name, 'other.bin')
+        build_lexicon({'COUNTDOWN'}, [], other_path)
+        self.assertRaises(
+            ValueError, ConundrumPool, self.path, Lexicon(other_path)
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
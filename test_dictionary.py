@@ -0,0 +1,268 @@
+# Imports
+# Python
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from hashlib import sha256
+import io
+import os
+import sqlite3
+import tarfile
+import tempfile
+import unittest
+from time import perf_counter, sleep
+# Internal
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from disk_cache import DiskCache
+from dictionary import (
+    WORDNET_ARCHIVE_DIR,
+    CachedDictionaryProvider,
+    DeadlineDictionaryProvider,
+    DictionaryUnavailable,
+    InMemoryDictionaryProvider,
+    LocalDictionaryProvider,
+    build_definitions,
+    fetch_wordnet,
+    has_wordnet,
+    read_wordnet
+)
+
+
+class SlowDictionaryProvider(InMemoryDictionaryProvider):
+    """
+    Looks up word meanings in a dict after a delay, taking
+    each delay in turn from delays, for tests.
+    """
+    name = 'slow'
+
+    def __init__(self, definitions, delays):
+        super().__init__(definitions)
+        self.delays = list(delays)
+
+    def meaning(self, word):
+        delay = self.delays.pop(0) if self.delays else 0
+        sleep(delay)
+        return super().meaning(word)
+
+
+# Minimal WordNet database files in the real format
+WORDNET_FILES = {
+    'index.noun': (
+        '  1 This software and database is being provided\n'
+        'jig n 2 1 @ 2 0 00000200 00000100\n'
+        'ice_cream n 1 1 @ 1 0 00000300\n'
+    ),
+    'data.noun': (
+        '  1 This software and database is being provided\n'
+        '00000100 04 n 01 jig 0 000 | a device that holds a piece of '
+        'work; "a drilling jig"\n'
+        '00000200 04 n 01 jig 0 000 | music in three-four time for '
+        'dancing a jig\n'
+        '00000300 13 n 01 ice_cream 0 000 | frozen dessert\n'
+    ),
+    'index.verb': 'jig v 1 1 @ 1 0 00000400\n',
+    'data.verb': (
+        '00000400 38 v 01 jig 0 000 | dance a quick jig; '
+        '"He jigged about"\n'
+    ),
+    'index.adj': '',
+    'data.adj': '',
+    'index.adv': '',
+    'data.adv': '',
+}
+
+
+class TestDictionary(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        for name, text in WORDNET_FILES.items():
+            with open(os.path.join(self.tmp_dir.name, name), 'w') as f:
+                f.write(text)
+        self.path = os.path.join(self.tmp_dir.name, 'definitions.sqlite')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_read_wordnet(self):
+        '''
+        Tests if WordNet definitions are read in sense order
+        without usage examples or multi word phrases.
+        '''
+        self.assertEqual(
+            list(read_wordnet(self.tmp_dir.name)),
+            [
+                ('jig', 'Noun', 'music in three-four time for dancing a jig'),
+                ('jig', 'Noun', 'a device that holds a piece of work'),
+                ('jig', 'Verb', 'dance a quick jig'),
+            ]
+        )
+
+    def test_fetch_wordnet(self):
+        '''
+        Tests if the WordNet database files are unpacked
+        from a release archive that matches its checksum and
+        if any other archive is refused.
+        '''
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode='w:gz') as tar:
+            for name, text in list(WORDNET_FILES.items()) + [
+                ('README', 'not needed'), ('../escape', 'not needed')
+            ]:
+                data = text.encode('utf-8')
+                member = tarfile.TarInfo(WORDNET_ARCHIVE_DIR + name)
+                member.size = len(data)
+                tar.addfile(member, io.BytesIO(data))
+        archive_path = os.path.join(self.tmp_dir.name, 'wordnet.tar.gz')
+        with open(archive_path, 'wb') as f:
+            f.write(buffer.getvalue())
+        url = f'file://{archive_path}'
+        checksum = sha256(buffer.getvalue()).hexdigest()
+        wordnet_dir = os.path.join(self.tmp_dir.name, 'fetched')
+        self.assertFalse(has_wordnet(wordnet_dir))
+        self.assertEqual(
+            fetch_wordnet(wordnet_dir, url, checksum), len(WORDNET_FILES)
+        )
+        self.assertTrue(has_wordnet(wordnet_dir))
+        self.assertEqual(
+            sorted(os.listdir(wordnet_dir)), sorted(WORDNET_FILES)
+        )
+        self.assertEqual(
+            list(read_wordnet(wordnet_dir)),
+            list(read_wordnet(self.tmp_dir.name))
+        )
+        self.assertRaises(
+            ValueError, fetch_wordnet, wordnet_dir, url, '0' * 64
+        )
+
+    def test_local_provider(self):
+        '''
+        Tests if the local definitions store returns
+        meanings in PyDictionary's shape, returns None for
+        unknown words and answers in well under a
+        millisecond.
+        '''
+        self.assertEqual(
+            build_definitions(read_wordnet(self.tmp_dir.name), self.path), 3
+        )
+        provider = LocalDictionaryProvider(self.path)
+        self.assertEqual(
+            provider.meaning('JIG'),
+            {
+                'Noun': [
+                    'music in three-four time for dancing a jig',
+                    'a device that holds a piece of work',
+                ],
+                'Verb': ['dance a quick jig'],
+            }
+        )
+        self.assertIsNone(provider.meaning('snozzberry'))
+        start_time = perf_counter()
+        for ind in range(1000):
+            provider.meaning('jig')
+        self.assertLess((perf_counter() - start_time) / 1000, 0.001)
+
+    def test_local_provider_missing(self):
+        '''
+        Tests if opening a store that hasn't been built
+        raises instead of creating an empty store.
+        '''
+        self.assertRaises(
+            sqlite3.OperationalError,
+            LocalDictionaryProvider,
+            os.path.join(self.tmp_dir.name, 'missing.sqlite')
+        )
+
+    def test_in_memory_provider(self):
+        '''
+        Tests if the in-memory provider returns its
+        definitions and records lookups.
+        '''
+        provider = InMemoryDictionaryProvider({'jig': {'Noun': ['a dance']}})
+        self.assertEqual(provider.meaning('Jig'), {'Noun': ['a dance']})
+        self.assertIsNone(provider.meaning('snozzberry'))
+        self.assertEqual(provider.lookups, ['Jig', 'snozzberry'])
+
+    def test_cached_provider(self):
+        '''
+        Tests if found and not found words are each looked
+        up once across processes sharing the cache, and if
+        words not found expire after the negative TTL.
+        '''
+        cache_path = os.path.join(self.tmp_dir.name, 'cache.sqlite')
+        remote = InMemoryDictionaryProvider({'jig': {'Noun': ['a dance']}})
+        provider = CachedDictionaryProvider(remote, DiskCache(cache_path))
+        other_process = CachedDictionaryProvider(
+            remote, DiskCache(cache_path)
+        )
+        self.assertEqual(provider.meaning('Jig'), {'Noun': ['a dance']})
+        self.assertEqual(other_process.meaning('jig'), {'Noun': ['a dance']})
+        self.assertIsNone(provider.meaning('snozzberry'))
+        self.assertIsNone(other_process.meaning('snozzberry'))
+        self.assertEqual(remote.lookups, ['jig', 'snozzberry'])
+        other_process.cache.flush()
+        self.assertEqual(provider.stats()['hit_rate'], 0.5)
+        expiring = CachedDictionaryProvider(
+            remote, DiskCache(cache_path), negative_ttl=0
+        )
+        expiring.meaning('wibble')
+        expiring.meaning('wibble')
+        self.assertEqual(remote.lookups[-2:], ['wibble', 'wibble'])
+
+    def test_deadline(self):
+        '''
+        Tests if a hung lookup raises DictionaryUnavailable
+        at the deadline, and if repeated slow lookups open
+        the circuit so later lookups fail fast until the
+        retry time has passed.
+        '''
+        remote = SlowDictionaryProvider(
+            {'jig': {'Noun': ['a dance']}}, [5, 5]
+        )
+        provider = DeadlineDictionaryProvider(
+            remote, deadline=0.05, failure_limit=2, retry_after=0.2
+        )
+        for ind in range(2):
+            start_time = perf_counter()
+            self.assertRaises(DictionaryUnavailable, provider.meaning, 'jig')
+            self.assertLess(perf_counter() - start_time, 0.5)
+        # The circuit is open so the provider isn't asked
+        start_time = perf_counter()
+        self.assertRaises(DictionaryUnavailable, provider.meaning, 'jig')
+        self.assertLess(perf_counter() - start_time, 0.01)
+        self.assertEqual(remote.lookups, [])
+        sleep(0.2)
+        self.assertEqual(provider.meaning('jig'), {'Noun': ['a dance']})
+        self.assertEqual(provider.failures, 0)
+
+    def test_hedged_request(self):
+        '''
+        Tests if a hedged second request answers when the
+        first request is slow.
+        '''
+        remote = SlowDictionaryProvider(
+            {'jig': {'Noun': ['a dance']}}, [5, 0]
+        )
+        provider = DeadlineDictionaryProvider(
+            remote, deadline=1, hedge_after=0.05
+        )
+        start_time = perf_counter()
+        self.assertEqual(provider.meaning('jig'), {'Noun': ['a dance']})
+        self.assertLess(perf_counter() - start_time, 0.5)
+
+    def test_unavailable_not_cached(self):
+        '''
+        Tests if a lookup that misses its deadline isn't
+        cached as a word not found.
+        '''
+        remote = SlowDictionaryProvider(
+            {'jig': {'Noun': ['a dance']}}, [5]
+        )
+        provider = CachedDictionaryProvider(
+            DeadlineDictionaryProvider(remote, deadline=0.05),
+            DiskCache(os.path.join(self.tmp_dir.name, 'cache.sqlite'))
+        )
+        self.assertRaises(DictionaryUnavailable, provider.meaning, 'jig')
+        self.assertEqual(provider.meaning('jig'), {'Noun': ['a dance']})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+# Imports
+# Python
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from concurrent.futures import ThreadPoolExecutor
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import unittest
+# Internal
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from disk_cache import MISSING, DiskCache
+
+
+class TestDiskCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'cache.sqlite')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_get_set(self):
+        '''
+        Tests if values round trip through the cache and
+        are visible to a second cache on the same file, as
+        another game process would open it.
+        '''
+        cache = DiskCache(self.path)
+        self.assertIsNone(cache.get('ACT'))
+        cache.set('ACT', {'3': ['ACT', 'CAT']})
+        self.assertEqual(cache.get('ACT'), {'3': ['ACT', 'CAT']})
+        other_process = DiskCache(self.path)
+        self.assertEqual(other_process.get('ACT'), {'3': ['ACT', 'CAT']})
+        cache.set('ACT', [])
+        self.assertEqual(other_process.get('ACT'), [])
+
+    def test_eviction(self):
+        '''
+        Tests if the least recently used entries are
+        evicted once the cache is full.
+        '''
+        cache = DiskCache(self.path, max_entries=3, touch_after=0)
+        for key in ['A', 'B', 'C']:
+            cache.set(key, key)
+        # Reading A makes B the least recently used
+        cache.get('A')
+        cache.set('D', 'D')
+        self.assertEqual(cache.stats()['entries'], 3)
+        self.assertIsNone(cache.get('B'))
+        self.assertEqual(cache.get('A'), 'A')
+        self.assertEqual(cache.get('D'), 'D')
+
+    def test_eviction_batches(self):
+        '''
+        Tests if a large cache only evicts once every
+        EVICT_SLACK of max_entries writes.
+        '''
+        cache = DiskCache(self.path, max_entries=300)
+        for key in range(303):
+            cache.set(str(key), key)
+        # Evicted on the 301st write, two written since
+        self.assertEqual(cache.stats()['entries'], 302)
+        self.assertIsNone(cache.get('0'))
+        cache.set('303', 303)
+        self.assertEqual(cache.stats()['entries'], 300)
+        self.assertIsNone(cache.get('3'))
+        self.assertEqual(cache.get('4'), 4)
+
+    def test_hits_touch_stale_entries(self):
+        '''
+        Tests if a hit only records its use once the entry's
+        last recorded use is touch_after seconds old.
+        '''
+        cache = DiskCache(self.path)
+        cache.set('A', 1)
+        db = sqlite3.connect(self.path)
+        query = "SELECT last_used FROM cache WHERE key = 'A'"
+        last_used = db.execute(query).fetchone()[0]
+        cache.get('A')
+        self.assertEqual(db.execute(query).fetchone()[0], last_used)
+        cache.touch_after = 0
+        cache.get('A')
+        self.assertGreater(db.execute(query).fetchone()[0], last_used)
+        db.close()
+
+    def test_ttl(self):
+        '''
+        Tests if entries expire after their time to live and
+        if a cached None can be told apart from a miss.
+        '''
+        cache = DiskCache(self.path, ttl=60)
+        cache.set('A', None)
+        cache.set('B', 'B', ttl=0)
+        self.assertIsNone(cache.get('A', MISSING))
+        self.assertIs(cache.get('B', MISSING), MISSING)
+        self.assertEqual(cache.stats()['entries'], 1)
+
+    def test_stats(self):
+        '''
+        Tests if hits and misses are counted for this
+        process and, once flushed, across processes.
+        '''
+        cache = DiskCache(self.path)
+        other_process = DiskCache(self.path)
+        cache.set('A', 1)
+        cache.get('A')
+        cache.get('B')
+        other_process.get('A')
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual((other_process.hits, other_process.misses), (1, 0))
+        self.assertEqual(
+            cache.stats(),
+            {'hits': 1, 'misses': 1, 'hit_rate': 1 / 2, 'entries': 1}
+        )
+        other_process.flush()
+        self.assertEqual(
+            cache.stats(),
+            {'hits': 2, 'misses': 1, 'hit_rate': 2 / 3, 'entries': 1}
+        )
+
+    def test_flush_at_exit(self):
+        '''
+        Tests if a process's unwritten counts are added to
+        the shared totals when it exits.
+        '''
+        DiskCache(self.path).set('A', 1)
+        subprocess.run(
+            [
+                sys.executable, '-c',
+                'import sys; from disk_cache import DiskCache; '
+                'cache = DiskCache(sys.argv[1]); '
+                'cache.get("A"); cache.get("B")',
+                self.path
+            ],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            check=True
+        )
+        stats = DiskCache(self.path).stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_unavailable(self):
+        '''
+        Tests if a cache file that can't be created behaves
+        as an empty cache instead of raising.
+        '''
+        blocker = os.path.join(self.tmp_dir.name, 'file')
+        with open(blocker, 'w') as f:
+            f.write('not a directory')
+        cache = DiskCache(os.path.join(blocker, 'cache.sqlite'))
+        cache.set('A', 1)
+        self.assertIsNone(cache.get('A'))
+        self.assertEqual(cache.stats()['entries'], 0)
+
+    def test_threads(self):
+        '''
+        Tests if a cache created in one thread can be read
+        and written from others.
+        '''
+        cache = DiskCache(self.path)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(lambda ind: cache.set(str(ind), ind), range(20)))
+            values = list(pool.map(cache.get, [str(ind) for ind in range(20)]))
+        self.assertEqual(values, list(range(20)))
+        self.assertEqual(cache.stats()['entries'], 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,388 @@
+# Imports
+# Python
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from math import comb
+import os
+import random
+import tempfile
+import unittest
+from time import perf_counter
+# Internal
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from lexicon import (
+    COUNTDOWN_MAX_LENGTH,
+    LEXICON_PATH,
+    LEXICON_VERSION,
+    Lexicon,
+    StaleArtifactError,
+    build_lexicon,
+    build_named_lexicon,
+    get_lexicon,
+    letter_counts,
+    lexicon_path,
+    load_lexicon,
+    read_section_table,
+    write_artifact
+)
+from letters_solver import (
+    CONSONANT_TILES,
+    VOWEL_TILES,
+    LetterCountEngine,
+    cached_formable_words,
+    likely_racks,
+    rack_cache_key,
+    stream_formable_words
+)
+from disk_cache import DiskCache
+# Third Party
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+import numpy as np
+
+TEST_WORDS = {
+    'CAT', 'ACT', 'TACO', 'COAT', 'COAST', 'ASCOT', 'COATS',
+    'TACOS', 'AT', 'TA', 'CATS', 'SCAT', 'ACTS', 'DOG',
+    'ANIMATORS', 'AMORTISES', 'ALGORITHM', 'LOGARITHM'
+}
+TEST_NINE_LETTER_WORDS = ['Algorithm', 'Animators', 'Unlisted']
+
+
+class TestLexicon(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'lexicon.bin')
+        build_lexicon(TEST_WORDS, TEST_NINE_LETTER_WORDS, self.path)
+        self.lexicon = Lexicon(self.path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_membership(self):
+        '''
+        Tests if the lexicon answers membership for every
+        word it was built from in any letter case and
+        rejects words it wasn't built from.
+        '''
+        self.assertEqual(len(self.lexicon), len(TEST_WORDS))
+        for word in TEST_WORDS:
+            self.assertIn(word, self.lexicon)
+        self.assertIn('cat', self.lexicon)
+        self.assertIn('Coast', self.lexicon)
+        self.assertNotIn('CA', self.lexicon)
+        self.assertNotIn('DOGS', self.lexicon)
+        self.assertNotIn('', self.lexicon)
+        self.assertNotIn('Café', self.lexicon)
+        self.assertNotIn(None, self.lexicon)
+
+    def test_word_ids(self):
+        '''
+        Tests if word ids follow sorted word order and
+        round trip through word().
+        '''
+        self.assertEqual(list(self.lexicon), sorted(TEST_WORDS))
+        for word in TEST_WORDS:
+            self.assertEqual(
+                self.lexicon.word(self.lexicon.word_id(word)), word
+            )
+        self.assertIsNone(self.lexicon.word_id('ZZZ'))
+
+    def test_nine_letter_words(self):
+        '''
+        Tests if the curated nine letter words are stored in
+        uppercase, skip words not in the lexicon and can be
+        sampled.
+        '''
+        nine_letter_words = self.lexicon.nine_letter_words
+        self.assertEqual(list(nine_letter_words), ['ALGORITHM', 'ANIMATORS'])
+        self.assertIn(random.sample(nine_letter_words, 1)[0], TEST_WORDS)
+
+    def test_checksum(self):
+        '''
+        Tests if verify() detects a corrupted artifact and
+        loading rejects files that aren't lexicons.
+        '''
+        self.assertEqual(self.lexicon.verify(), True)
+        with open(self.path, 'r+b') as f:
+            f.seek(-1, os.SEEK_END)
+            f.write(b'X')
+        self.assertEqual(Lexicon(self.path).verify(), False)
+        bad_path = os.path.join(self.tmp_dir.name, 'bad.bin')
+        with open(bad_path, 'wb') as f:
+            f.write(b'not a lexicon' * 10)
+        self.assertRaises(ValueError, Lexicon, bad_path)
+        write_artifact(bad_path, {}, LEXICON_VERSION)
+        self.assertRaises(ValueError, Lexicon, bad_path)
+        # Each artifact type checks its own format version
+        with open(bad_path, 'rb') as f:
+            blob = f.read()
+        self.assertEqual(
+            read_section_table(blob, bad_path, (), LEXICON_VERSION)[0],
+            LEXICON_VERSION
+        )
+        self.assertRaisesRegex(
+            ValueError, 'format version', read_section_table,
+            blob, bad_path, (), LEXICON_VERSION + 1
+        )
+        # Artifacts keyed by word checksum survive changes to
+        # the other sections
+        other_path = os.path.join(self.tmp_dir.name, 'other.bin')
+        build_lexicon(TEST_WORDS, [], other_path)
+        other = Lexicon(other_path)
+        self.assertNotEqual(other.checksum, self.lexicon.checksum)
+        self.assertEqual(other.word_checksum, self.lexicon.word_checksum)
+
+    def test_load_lexicon(self):
+        '''
+        Tests if a missing or stale lexicon stops the game
+        with a message to run build_data.py instead of
+        being built in the game process.
+        '''
+        self.assertEqual(list(load_lexicon(self.path)), list(self.lexicon))
+        missing_path = os.path.join(self.tmp_dir.name, 'missing.bin')
+        self.assertRaisesRegex(
+            StaleArtifactError, 'missing, run python build_data.py lexicon',
+            load_lexicon, missing_path
+        )
+        self.assertFalse(os.path.exists(missing_path))
+        stale_path = os.path.join(self.tmp_dir.name, 'stale.bin')
+        write_artifact(stale_path, {}, LEXICON_VERSION - 1)
+        self.assertRaisesRegex(
+            StaleArtifactError, 'run python build_data.py lexicon',
+            load_lexicon, stale_path
+        )
+
+    def test_anagrams(self):
+        '''
+        Tests if the anagram index returns every word spelt
+        with exactly the given letters in any order or case.
+        '''
+        self.assertEqual(self.lexicon.anagrams('TCA'), ['ACT', 'CAT'])
+        self.assertEqual(self.lexicon.anagrams(['t', 'a']), ['AT', 'TA'])
+        self.assertEqual(
+            self.lexicon.anagrams('gorithmal'), ['ALGORITHM', 'LOGARITHM']
+        )
+        self.assertEqual(
+            self.lexicon.anagrams('STOCA'),
+            ['ASCOT', 'COAST', 'COATS', 'TACOS']
+        )
+        self.assertEqual(self.lexicon.anagrams('XYZ'), [])
+        self.assertEqual(self.lexicon.anagrams(''), [])
+
+    def test_named_lexicons(self):
+        '''
+        Tests if each named lexicon has its own artifact
+        path, if the countdown lexicon keeps only words a
+        nine tile rack can make and if a lexicon is only
+        mapped once per process.
+        '''
+        self.assertEqual(lexicon_path('scrabble'), LEXICON_PATH)
+        self.assertEqual(
+            len({lexicon_path(name) for name in ['scrabble', 'family']}), 2
+        )
+        self.assertRaises(ValueError, lexicon_path, 'klingon')
+        self.assertRaises(ValueError, get_lexicon, 'klingon')
+        path = os.path.join(self.tmp_dir.name, 'countdown.bin')
+        build_named_lexicon('countdown', path)
+        countdown = Lexicon(path)
+        self.assertIn('ALGORITHM', countdown)
+        self.assertNotIn('ALGORITHMIC', countdown)
+        self.assertEqual(
+            max(len(word) for word in countdown), COUNTDOWN_MAX_LENGTH
+        )
+        self.assertGreater(len(countdown.nine_letter_words), 0)
+        self.assertIs(get_lexicon('scrabble'), get_lexicon('scrabble'))
+
+
+class TestLettersSolver(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'lexicon.bin')
+        build_lexicon(TEST_WORDS, TEST_NINE_LETTER_WORDS, self.path)
+        self.lexicon = Lexicon(self.path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_longest_words(self):
+        '''
+        Tests if longest_words returns every longest word
+        that can be made from the rack and its length.
+        '''
+        longest_words = LetterCountEngine(self.lexicon).longest_words
+        self.assertEqual(
+            longest_words(['C', 'O', 'A', 'S', 'T', 'X']),
+            (['ASCOT', 'COAST', 'COATS', 'TACOS'], 5)
+        )
+        self.assertEqual(
+            longest_words(list('MHTIROGLA')),
+            (['ALGORITHM', 'LOGARITHM'], 9)
+        )
+        self.assertEqual(
+            longest_words(['c', 'a', 't', 'z']),
+            (['ACT', 'CAT'], 3)
+        )
+        self.assertEqual(
+            longest_words([' ', 'D', 'O', 'G', ' ']),
+            (['DOG'], 3)
+        )
+        self.assertEqual(longest_words(list('XYZ')), ([], 0))
+
+    def test_letter_count_engine(self):
+        '''
+        Tests if the letter count engine finds every word
+        that can be made from the rack grouped by length,
+        longest first.
+        '''
+        engine = LetterCountEngine(self.lexicon)
+        self.assertEqual(
+            engine.formable_words(['C', 'O', 'A', 'T', 'S']),
+            {
+                5: ['ASCOT', 'COAST', 'COATS', 'TACOS'],
+                4: ['ACTS', 'CATS', 'COAT', 'SCAT', 'TACO'],
+                3: ['ACT', 'CAT'],
+                2: ['AT', 'TA'],
+            }
+        )
+        self.assertEqual(engine.formable_words(['X', 'Y']), {})
+
+    def test_length_groups(self):
+        '''
+        Tests if the count matrix rows of each word length
+        are one slice viewing the mapped artifact rather
+        than a copy, and map back to the right word ids.
+        '''
+        engine = LetterCountEngine(self.lexicon)
+        lengths = [length for length, rows in engine._length_groups]
+        self.assertEqual(lengths, sorted(set(lengths), reverse=True))
+        for length, rows in engine._length_groups:
+            group = engine.counts[rows]
+            self.assertTrue(np.shares_memory(group, engine.counts))
+            for row, word_id in zip(group, engine.row_ids[rows]):
+                word = self.lexicon.word(int(word_id))
+                self.assertEqual(len(word), length)
+                self.assertEqual(bytes(row), bytes(letter_counts(word)))
+
+    def test_cached_formable_words(self):
+        '''
+        Tests if cached results are reused for the same
+        letters in any order and match a fresh search.
+        '''
+        engine = LetterCountEngine(self.lexicon)
+        cache = DiskCache(os.path.join(self.tmp_dir.name, 'racks.sqlite'))
+        expected = engine.formable_words(list('COATS'))
+        self.assertEqual(
+            cached_formable_words(list('COATS'), engine, cache), expected
+        )
+        self.assertEqual(
+            cached_formable_words(list('staoc'), engine, cache), expected
+        )
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        # Blank tiles are part of the key
+        cached_formable_words(list('COATS?'), engine, cache)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_likely_racks(self):
+        '''
+        Tests if racks come out most likely first with the
+        chance of drawing their letters from the vowel and
+        consonant bags.
+        '''
+        racks = likely_racks(50)
+        self.assertEqual(len(racks), 50)
+        self.assertEqual(len({rack for rack, chance in racks}), 50)
+        chances = [chance for rack, chance in racks]
+        self.assertEqual(chances, sorted(chances, reverse=True))
+        rack, chance = racks[0]
+        vowels = [letter for letter in rack if letter in VOWEL_TILES]
+        consonants = [letter for letter in rack if letter in CONSONANT_TILES]
+        self.assertEqual(len(rack), 9)
+        self.assertIn(len(vowels), [3, 4, 5])
+        # Ways to draw the rack over ways to draw any rack
+        # with as many vowels, for one of three vowel counts
+        ways = 1
+        for letter in set(rack):
+            tiles = VOWEL_TILES.get(letter) or CONSONANT_TILES[letter]
+            ways *= comb(tiles, rack.count(letter))
+        self.assertAlmostEqual(
+            chance,
+            ways / 3 / comb(sum(VOWEL_TILES.values()), len(vowels))
+            / comb(sum(CONSONANT_TILES.values()), len(consonants))
+        )
+
+    def test_iter_words(self):
+        '''
+        Tests if words stream out longest first in the
+        same order formable_words groups them, ranked by
+        a key within a length if one is given.
+        '''
+        engine = LetterCountEngine(self.lexicon)
+        for rack in ['COATS', 'MHTIROGLA', 'COA?', 'XYZ']:
+            self.assertEqual(
+                list(engine.iter_words(list(rack))),
+                [
+                    word
+                    for words in engine.formable_words(list(rack)).values()
+                    for word in words
+                ]
+            )
+        words = engine.iter_words(list('COATS'), key=lambda word: word[::-1])
+        self.assertEqual(
+            [next(words) for ind in range(4)],
+            ['TACOS', 'COATS', 'ASCOT', 'COAST']
+        )
+
+    def test_stream_formable_words(self):
+        '''
+        Tests if each word length is cached as soon as it
+        is searched, a later stream carries on from the
+        cached lengths in the same order and a finished
+        search is marked complete.
+        '''
+        engine = LetterCountEngine(self.lexicon)
+        cache = DiskCache(os.path.join(self.tmp_dir.name, 'racks.sqlite'))
+        key_name = rack_cache_key(list('COATS'), engine)
+        expected = list(engine.iter_words(list('COATS')))
+        words = stream_formable_words(list('COATS'), engine, cache)
+        self.assertEqual(next(words), 'ASCOT')
+        words.close()
+        self.assertEqual(cache.get(key_name), {
+            'words': {'5': ['ASCOT', 'COAST', 'COATS', 'TACOS']},
+            'searched': 5
+        })
+        self.assertEqual(
+            list(stream_formable_words(list('STACO'), engine, cache)),
+            expected
+        )
+        self.assertEqual(cache.get(key_name)['searched'], 0)
+        self.assertEqual(
+            list(stream_formable_words(list('COATS'), engine, cache)),
+            expected
+        )
+        self.assertEqual((cache.hits, cache.misses), (4, 1))
+
+    def test_blank_tiles(self):
+        '''
+        Tests if the letter count engine lets blank tiles
+        stand for any letter and answers a real 9 tile rack
+        with two blanks interactively.
+        '''
+        engine = LetterCountEngine(self.lexicon)
+        self.assertEqual(
+            engine.longest_words(list('MHTIROG??')),
+            (['ALGORITHM', 'LOGARITHM'], 9)
+        )
+        self.assertEqual(
+            engine.formable_words(list('T?'))[2], ['AT', 'TA']
+        )
+        self.assertNotIn(3, engine.formable_words(list('DO')))
+        lexicon = load_lexicon()
+        engine = LetterCountEngine(lexicon)
+        start_time = perf_counter()
+        words, word_len = engine.longest_words(list('QZXVAEI??'))
+        self.assertLess(perf_counter() - start_time, 0.5)
+        self.assertEqual(word_len, len(words[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+# Imports
+# Python
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from itertools import combinations
+import unittest
+# Internal
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from numbers_solver import reachable, solve
+# Third Party
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+import numexpr as ne
+
+
+def brute_force(numbers):
+    """
+    Return every value reachable from the numbers by
+    combining two at a time, for tests.
+    """
+    seen = set()
+    found = set()
+
+    def search(state):
+        key = tuple(sorted(state))
+        if key in seen:
+            return
+        seen.add(key)
+        found.update(state)
+        for i, j in combinations(range(len(state)), 2):
+            big, small = max(state[i], state[j]), min(state[i], state[j])
+            rest = [
+                state[ind] for ind in range(len(state)) if ind not in (i, j)
+            ]
+            results = [big + small, big * small]
+            if big > small:
+                results.append(big - small)
+            if big % small == 0:
+                results.append(big // small)
+            for result in results:
+                search(rest + [result])
+    search(list(numbers))
+    return found
+
+
+class TestNumbersSolver(unittest.TestCase):
+
+    def test_solve(self):
+        '''
+        Tests if an exact solution is found, every solution
+        evaluates to the target and the fewest numbers are
+        listed first.
+        '''
+        solution = solve([100, 25, 8, 3, 1, 1], 984)
+        self.assertTrue(solution.exact)
+        self.assertEqual(solution.closest, 984)
+        self.assertEqual(solution.numbers_used, 5)
+        self.assertEqual(solution.shortest, solution.solutions[0])
+        for expression in solution.solutions:
+            self.assertEqual(int(ne.evaluate(expression)), 984)
+        solution = solve([100, 75, 50, 25, 6, 3], 175)
+        self.assertEqual(solution.numbers_used, 2)
+        self.assertEqual(solution.shortest, '100 + 75')
+
+    def test_closest(self):
+        '''
+        Tests if the closest value is returned when the
+        target can't be reached.
+        '''
+        solution = solve([1, 1, 2, 2, 3, 3], 999)
+        self.assertFalse(solution.exact)
+        self.assertEqual(solution.closest, 81)
+        self.assertEqual(solution.difference, 918)
+        self.assertEqual(int(ne.evaluate(solution.shortest)), 81)
+
+    def test_max_solutions(self):
+        '''
+        Tests if no more than max_solutions expressions
+        are returned.
+        '''
+        solution = solve([100, 75, 50, 25, 6, 3], 100, max_solutions=3)
+        self.assertEqual(len(solution.solutions), 3)
+        self.assertEqual(solution.shortest, '100')
+
+    def test_reachable(self):
+        '''
+        Tests if the values reachable with every selection
+        of the numbers match a brute force search.
+        '''
+        for numbers in ([75, 50, 2, 3, 8, 7], [6, 6, 9, 5, 2, 100]):
+            memo = {}
+            tiles = tuple(sorted(numbers))
+            values = set()
+            for size in range(1, len(tiles) + 1):
+                for selection in combinations(tiles, size):
+                    values.update(reachable(selection, memo))
+            self.assertEqual(values, brute_force(numbers))
+            self.assertTrue(all(value > 0 for value in values))
+
+
+if __name__ == '__main__':
+    unittest.main()
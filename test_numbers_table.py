@@ -0,0 +1,121 @@
+# Imports
+# Python
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from itertools import combinations
+import os
+import tempfile
+import unittest
+# Internal
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from lexicon import StaleArtifactError, write_artifact
+from numbers_solver import solve
+from numbers_table import (
+    TABLE_VERSION,
+    NumbersTable,
+    build_numbers_table,
+    decode_program,
+    encode_program,
+    load_numbers_table
+)
+# Third Party
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+import numexpr as ne
+
+# A smaller game so the table builds quickly
+TEST_TILES = (1, 2, 3, 5, 10, 25)
+TEST_DRAW_SIZE = 4
+
+
+class TestNumbersTable(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmp_dir.name, 'numbers.bin')
+        cls.draws = build_numbers_table(
+            cls.path, TEST_TILES, TEST_DRAW_SIZE, 100, 400
+        )
+        cls.table = NumbersTable(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def test_program_encoding(self):
+        '''
+        Tests if a postfix program with every number of a
+        six number draw round trips through its packed form.
+        '''
+        draw = (1, 5, 8, 25, 75, 100)
+        program = [100, 25, '+', 1, '-', 8, '*', 5, 75, '/', '-']
+        self.assertEqual(
+            decode_program(encode_program(program, draw), draw), program
+        )
+
+    def test_table(self):
+        '''
+        Tests if every draw and target in the table matches
+        the solver, and if the witness reaches the closest
+        value with the fewest numbers.
+        '''
+        self.assertEqual(self.draws, 15)
+        for draw in combinations(TEST_TILES, TEST_DRAW_SIZE):
+            for target in range(100, 401, 7):
+                expected = solve(draw, target)
+                solution = self.table.solution(list(draw)[::-1], target)
+                self.assertEqual(solution.closest, expected.closest)
+                self.assertEqual(solution.exact, expected.exact)
+                self.assertEqual(
+                    solution.numbers_used, expected.numbers_used
+                )
+                self.assertEqual(
+                    int(ne.evaluate(solution.shortest)), solution.closest
+                )
+
+    def test_single_solution(self):
+        '''
+        Tests if solving a round for one solution gives the
+        same kind of answer as the table, a single shortest
+        expression reaching the closest value.
+        '''
+        for draw in combinations(TEST_TILES, TEST_DRAW_SIZE):
+            for target in range(100, 401, 37):
+                solved = solve(draw, target, 1)
+                solution = self.table.solution(list(draw), target)
+                self.assertEqual(len(solved.solutions), 1)
+                self.assertEqual(len(solution.solutions), 1)
+                self.assertEqual(
+                    solved.numbers_used, solution.numbers_used
+                )
+                self.assertEqual(
+                    int(ne.evaluate(solved.shortest)), solution.closest
+                )
+
+    def test_load_numbers_table(self):
+        '''
+        Tests if a missing table loads as None so rounds
+        are solved as played, and a stale one raises
+        instead of being skipped.
+        '''
+        self.assertIsInstance(load_numbers_table(self.path), NumbersTable)
+        missing_path = os.path.join(self.tmp_dir.name, 'missing.bin')
+        self.assertIsNone(load_numbers_table(missing_path))
+        stale_path = os.path.join(self.tmp_dir.name, 'stale.bin')
+        write_artifact(stale_path, {}, TABLE_VERSION - 1)
+        self.assertRaisesRegex(
+            StaleArtifactError, 'build_data.py numbers',
+            load_numbers_table, stale_path
+        )
+
+    def test_outside_table(self):
+        '''
+        Tests if draws and targets outside the table raise
+        KeyError.
+        '''
+        self.assertRaises(KeyError, self.table.lookup, [1, 2, 3, 5], 401)
+        self.assertRaises(KeyError, self.table.lookup, [1, 2, 3, 4], 200)
+        self.assertRaises(KeyError, self.table.lookup, [1, 1, 2, 3], 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+# Imports
+# Python
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+import os
+import tempfile
+import unittest
+# Internal
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from lexicon import Lexicon, StaleArtifactError, build_lexicon
+from profanity_flags import (
+    ProfanityFlags,
+    build_profanity_flags,
+    load_profanity_flags
+)
+
+TEST_WORDS = {'CAT', 'DOG', 'DARN', 'HECK', 'TACO'}
+
+
+def predict_rude(words):
+    """
+    Score DARN and HECK as profane, for tests.
+    """
+    return [0.95 if word in ('DARN', 'HECK') else 0.1 for word in words]
+
+
+class TestProfanityFlags(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.lexicon_path = os.path.join(self.tmp_dir.name, 'lexicon.bin')
+        build_lexicon(TEST_WORDS, [], self.lexicon_path)
+        self.lexicon = Lexicon(self.lexicon_path)
+        self.path = os.path.join(self.tmp_dir.name, 'profanity.bin')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_profanity_flags(self):
+        '''
+        Tests if the words the model rejects are flagged by
+        word id and by word, and if words outside the
+        lexicon have no flag.
+        '''
+        self.assertEqual(
+            build_profanity_flags(self.lexicon, self.path, predict_rude), 2
+        )
+        flags = ProfanityFlags(self.path, self.lexicon)
+        for word in TEST_WORDS:
+            profane = word in ('DARN', 'HECK')
+            self.assertEqual(
+                flags.flagged(self.lexicon.word_id(word)), profane
+            )
+            self.assertEqual(flags.word_flagged(word.lower()), profane)
+        self.assertIsNone(flags.word_flagged('snozzberry'))
+
+    def test_other_lexicon(self):
+        '''
+        Tests if flags built for another lexicon are
+        rejected.
+        '''
+        build_profanity_flags(self.lexicon, self.path, predict_rude)
+        other_path = os.path.join(self.tmp_dir.name, 'other.bin')
+        build_lexicon({'DOG'}, [], other_path)
+        self.assertRaises(
+            ValueError, ProfanityFlags, self.path, Lexicon(other_path)
+        )
+
+    def test_load_profanity_flags(self):
+        '''
+        Tests if missing flags load as None and flags built
+        for another lexicon raise instead of being skipped.
+        '''
+        self.assertIsNone(
+            load_profanity_flags(self.lexicon, path=self.path)
+        )
+        build_profanity_flags(self.lexicon, self.path, predict_rude)
+        self.assertIsInstance(
+            load_profanity_flags(self.lexicon, path=self.path),
+            ProfanityFlags
+        )
+        other_path = os.path.join(self.tmp_dir.name, 'other.bin')
+        build_lexicon({'DOG'}, [], other_path)
+        self.assertRaisesRegex(
+            StaleArtifactError, 'build_data.py profanity',
+            load_profanity_flags, Lexicon(other_path), path=self.path
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
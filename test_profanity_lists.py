@@ -0,0 +1,86 @@
+# Imports
+# Python
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+import os
+import tempfile
+import unittest
+# Internal
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from lexicon import Lexicon, StaleArtifactError, build_lexicon
+from profanity_flags import ProfanityFlags, build_profanity_flags
+from profanity_lists import (
+    HashedSet,
+    ProfanityLists,
+    build_profanity_lists,
+    hash_table,
+    load_profanity_lists
+)
+from test_profanity_flags import TEST_WORDS, predict_rude
+
+
+class TestProfanityLists(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.lexicon_path = os.path.join(self.tmp_dir.name, 'lexicon.bin')
+        build_lexicon(TEST_WORDS, [], self.lexicon_path)
+        self.lexicon = Lexicon(self.lexicon_path)
+        self.path = os.path.join(self.tmp_dir.name, 'lists.bin')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_hashed_set(self):
+        '''
+        Tests if every text added is found in any letter
+        case, other texts aren't, and an empty set holds
+        nothing.
+        '''
+        words = [f'WORD{ind}' for ind in range(1000)]
+        hashed = HashedSet(hash_table(words))
+        self.assertEqual(len(hashed), 1000)
+        self.assertTrue(all(word.lower() in hashed for word in words))
+        self.assertFalse(any(f'OTHER{ind}' in hashed for ind in range(1000)))
+        self.assertNotIn('WORD', HashedSet(hash_table([])))
+
+    def test_profanity_lists(self):
+        '''
+        Tests if flagged words go to the blocklist and the
+        rest of the lexicon to the allowlist, and if lists
+        built for another lexicon are rejected.
+        '''
+        flags_path = os.path.join(self.tmp_dir.name, 'flags.bin')
+        build_profanity_flags(self.lexicon, flags_path, predict_rude)
+        self.assertEqual(
+            build_profanity_lists(
+                self.lexicon, ProfanityFlags(flags_path, self.lexicon),
+                self.path
+            ),
+            (2, 3)
+        )
+        lists = ProfanityLists(self.path, self.lexicon)
+        self.assertIn('darn', lists.blocklist)
+        self.assertNotIn('darn', lists.allowlist)
+        self.assertIn('Taco', lists.allowlist)
+        self.assertNotIn('Taco', lists.blocklist)
+        self.assertNotIn('snozzberry', lists.blocklist)
+        self.assertNotIn('snozzberry', lists.allowlist)
+        other_path = os.path.join(self.tmp_dir.name, 'other.bin')
+        build_lexicon({'DOG'}, [], other_path)
+        self.assertRaises(
+            ValueError, ProfanityLists, self.path, Lexicon(other_path)
+        )
+        # Loading for the game raises rather than dropping the
+        # tier, and only missing lists load as None
+        self.assertRaisesRegex(
+            StaleArtifactError, 'build_data.py profanity',
+            load_profanity_lists, Lexicon(other_path), path=self.path
+        )
+        missing_path = os.path.join(self.tmp_dir.name, 'missing.bin')
+        self.assertIsNone(
+            load_profanity_lists(self.lexicon, path=missing_path)
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
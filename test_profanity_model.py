@@ -0,0 +1,138 @@
+# Imports
+# Python
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+import os
+import tempfile
+import unittest
+# Internal
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from disk_cache import DiskCache
+from lexicon import get_lexicon
+from profanity_model import (
+    CachedProfanityModel,
+    ProfanityModel,
+    export_profanity_model
+)
+# Third Party
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from profanity_check import predict_prob
+import numpy as np
+
+# Texts with several terms, repeated terms, stop words,
+# punctuation and no known terms at all
+TEST_TEXTS = [
+    'You are a bloody idiot',
+    'hello there, friend',
+    'cat cat dog',
+    'What the hell is this?!',
+    'the and of',
+    '',
+    '!!!',
+    'Ünïcode wörds',
+    'Shepherd',
+]
+
+
+class TestProfanityModel(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmp_dir.name, 'profanity_model.bin')
+        export_profanity_model(cls.path)
+        cls.model = ProfanityModel(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def test_parity(self):
+        '''
+        Tests if the NumPy model scores every lexicon word
+        and a set of phrases the same as alt-profanity-check,
+        and flags the same words as profane.
+        '''
+        lexicon = get_lexicon('scrabble')
+        texts = [lexicon.word(word_id) for word_id in range(len(lexicon))]
+        texts += TEST_TEXTS
+        expected = predict_prob(texts)
+        scores = self.model.predict_prob(texts)
+        np.testing.assert_allclose(scores, expected, rtol=0, atol=1e-9)
+        np.testing.assert_array_equal(scores >= 0.9, expected >= 0.9)
+
+    def test_cached_model(self):
+        '''
+        Tests if repeated texts are scored once in any
+        letter case, match the model and the least recently
+        used scores are evicted once the cache is full.
+        '''
+        model = CachedProfanityModel(self.model, size=len(TEST_TEXTS))
+        expected = self.model.predict_prob(TEST_TEXTS)
+        np.testing.assert_array_equal(model.predict_prob(TEST_TEXTS), expected)
+        np.testing.assert_array_equal(
+            model.predict_prob([text.upper() for text in TEST_TEXTS]),
+            expected
+        )
+        self.assertEqual(
+            model.stats(),
+            {
+                'hits': len(TEST_TEXTS), 'misses': len(TEST_TEXTS),
+                'hit_rate': 0.5, 'entries': len(TEST_TEXTS),
+                'shared': None
+            }
+        )
+        model.predict_prob(['a new phrase'])
+        model.predict_prob(TEST_TEXTS[:1])
+        self.assertEqual(model.stats()['misses'], len(TEST_TEXTS) + 2)
+        self.assertEqual(model.stats()['entries'], len(TEST_TEXTS))
+
+    def test_shared_cache(self):
+        '''
+        Tests if phrases are scored once across processes
+        sharing the cache, and if single words are scored
+        without using it.
+        '''
+        cache_path = os.path.join(self.tmp_dir.name, 'cache.sqlite')
+        model = CachedProfanityModel(self.model, DiskCache(cache_path))
+        other_process = CachedProfanityModel(
+            self.model, DiskCache(cache_path)
+        )
+        expected = self.model.predict_prob(TEST_TEXTS)
+        np.testing.assert_array_equal(model.predict_prob(TEST_TEXTS), expected)
+        np.testing.assert_array_equal(
+            other_process.predict_prob(TEST_TEXTS), expected
+        )
+        # Only texts with several known terms are shared
+        phrases = sum(
+            len(self.model.term_counts(text)) > 1 for text in TEST_TEXTS
+        )
+        self.assertGreater(phrases, 0)
+        other_process.cache.flush()
+        self.assertEqual(
+            model.stats()['shared'],
+            {
+                'hits': phrases, 'misses': phrases,
+                'hit_rate': 0.5, 'entries': phrases
+            }
+        )
+
+    def test_export_checks(self):
+        '''
+        Tests if a vectoriser the NumPy model can't
+        reproduce is refused.
+        '''
+        from profanity_check import profanity_check
+        vectorizer = profanity_check.vectorizer
+        ngram_range = vectorizer.ngram_range
+        vectorizer.ngram_range = (1, 2)
+        try:
+            self.assertRaises(
+                ValueError, export_profanity_model,
+                os.path.join(self.tmp_dir.name, 'bigrams.bin'), vectorizer
+            )
+        finally:
+            vectorizer.ngram_range = ngram_range
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,15 +1,24 @@
 # Imports
 # Python
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import os
+import tempfile
 import unittest
+from unittest.mock import patch
 # Internal
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+import validation
 from validation import (
     validate_name,
     validate_menu_value,
     validate_vowels,
     check_profanity,
+    is_profane,
+    profanity_tier_stats,
     check_dictionary,
+    prefetch_meanings,
     print_word_meaning,
     check_letters_used,
     validate_numbers,
@@ -17,9 +26,12 @@ from validation import (
     check_numbers_used,
     validate_user_numbers,
     validate_user_solution,
-    validate_user_conundrum
+    validate_user_conundrum,
+    check_conundrum_answer
 )
 from run import Player, Letters, Numbers, Conundrum
+from dictionary import InMemoryDictionaryProvider
+from lexicon import Lexicon, build_lexicon
 # Third Party
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 from profanity_check import predict_prob
@@ -84,6 +96,9 @@ class TestValidation(unittest.TestCase):
         self.assertEqual(validate_vowels('a'), False)
         self.assertEqual(validate_vowels(' '), False)
         self.assertEqual(validate_vowels('0'), False)
+        # Larger racks allow more vowels
+        self.assertEqual(validate_vowels('12', 15), True)
+        self.assertEqual(validate_vowels('16', 15), False)
 
     def test_check_profanity(self):
         '''
@@ -98,6 +113,30 @@ class TestValidation(unittest.TestCase):
         self.assertGreater(check_profanity('shit'), 0.9)
         self.assertGreater(check_profanity('bastard'), 0.9)
 
+    def test_is_profane(self):
+        '''
+        Tests if is_profane function decides lexicon words
+        from the blocklist and allowlist, and other text
+        with the profanity model, counting each tier.
+        '''
+        self.assertIsNotNone(validation.profanity_lists)
+        before = profanity_tier_stats()['checks']
+        for text, profane, tier in [
+            ('bastard', True, 'blocklist'),
+            ('Hello', False, 'allowlist'),
+            ('you bloody idiot', True, 'model'),
+        ]:
+            counts = validation.profanity_tiers.copy()
+            self.assertEqual(is_profane(text), profane)
+            # Only the expected tier counted the check
+            counted = validation.profanity_tiers - counts
+            self.assertEqual(counted, Counter({tier: 1}))
+        stats = profanity_tier_stats()
+        self.assertEqual(stats['checks'], before + 3)
+        self.assertAlmostEqual(
+            stats['blocklist'] + stats['allowlist'] + stats['model'], 1
+        )
+
     def test_check_dictionary(self):
         '''
         Tests if check_dictionary function
@@ -125,6 +164,32 @@ class TestValidation(unittest.TestCase):
         self.assertEqual(print_word_meaning('snozzberry'), False)
         self.assertEqual(print_word_meaning('flibbidyflobbedy'), False)
 
+    def test_prefetch_meanings(self):
+        '''
+        Tests if prefetch_meanings function
+        returns expected values. Should look up each word
+        once, on the prefetch threads, and give the same
+        results as check_dictionary.
+        '''
+        provider = InMemoryDictionaryProvider({'jig': {'Noun': ['a dance']}})
+        with ThreadPoolExecutor(max_workers=2) as pool, \
+                patch.object(validation, 'dictionary', provider), \
+                patch.object(validation, 'dictionary_pool', pool):
+            meanings = prefetch_meanings(['jig', 'JIG', 'snozzberry'])
+            self.assertEqual(list(meanings), ['jig', 'snozzberry'])
+            self.assertEqual(meanings['jig'].result(), {'Noun': ['a dance']})
+            self.assertIsNone(meanings['snozzberry'].result())
+            self.assertEqual(provider.lookups, ['jig', 'snozzberry'])
+            self.assertEqual(
+                meanings['jig'].result(), check_dictionary('jig')
+            )
+            self.assertEqual(
+                print_word_meaning(
+                    'jig', word_meaning=meanings['jig'].result()
+                ),
+                True
+            )
+
     def test_check_letters_used(self):
         '''
         Tests if check_letters_used function
@@ -171,6 +236,14 @@ class TestValidation(unittest.TestCase):
             check_letters_used(' ', new_player, new_conundrum),
             False
         )
+        # Blank tiles stand for any letter
+        new_player.chosen_letters = [
+            'r', 'a', 'p', 'r', 'm', 'e', 'm', '?', '?'
+        ]
+        self.assertEqual(check_letters_used('programme', new_player), True)
+        self.assertEqual(check_letters_used('party', new_player), True)
+        self.assertEqual(check_letters_used('excellent', new_player), False)
+        self.assertEqual(check_letters_used('ram?', new_player), False)
 
     def test_validate_numbers(self):
         '''
@@ -334,6 +407,38 @@ class TestValidation(unittest.TestCase):
             False
         )
 
+    def test_check_conundrum_answer(self):
+        '''
+        Tests if check_conundrum_answer function
+        returns 'target' for the conundrum word,
+        'valid alternative' for another word using
+        all its letters and None otherwise.
+        '''
+        # The game's pool only holds words with one answer,
+        # so alternatives are checked against a test lexicon
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        path = os.path.join(tmp_dir.name, 'lexicon.bin')
+        build_lexicon({'ALGORITHM', 'LOGARITHM', 'COUNTDOWN'}, [], path)
+        lexicon = Lexicon(path)
+        new_conundrum = Conundrum()
+        new_conundrum.target = 'ALGORITHM'
+        self.assertEqual(
+            check_conundrum_answer('algorithm', new_conundrum, lexicon),
+            'target'
+        )
+        self.assertEqual(
+            check_conundrum_answer('logarithm', new_conundrum, lexicon),
+            'valid alternative'
+        )
+        self.assertIsNone(
+            check_conundrum_answer('mhtirogla', new_conundrum, lexicon)
+        )
+        self.assertIsNone(
+            check_conundrum_answer('countdown', new_conundrum, lexicon)
+        )
+        self.assertIsNone(check_conundrum_answer('', new_conundrum, lexicon))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,116 @@
+# Imports
+# Python
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+import os
+import tempfile
+import unittest
+# Internal
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from lexicon import Lexicon, build_lexicon
+from letters_solver import LetterCountEngine
+from word_frequency import (
+    MAX_FAMILIARITY,
+    FrequencyTable,
+    WORD_FREQUENCY_PATH,
+    build_frequency_table,
+    read_word_counts
+)
+
+TEST_WORDS = {'CAT', 'ACT', 'TACO', 'COAT', 'COATS', 'TACOS', 'ASCOT'}
+
+
+class TestWordFrequency(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.lexicon_path = os.path.join(self.tmp_dir.name, 'lexicon.bin')
+        build_lexicon(TEST_WORDS, [], self.lexicon_path)
+        self.lexicon = Lexicon(self.lexicon_path)
+        self.path = os.path.join(self.tmp_dir.name, 'frequency.bin')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_read_word_counts(self):
+        '''
+        Tests if frequency lists with and without counts
+        are read, giving words without a count one from
+        their rank.
+        '''
+        list_path = os.path.join(self.tmp_dir.name, 'counts.txt')
+        with open(list_path, 'w') as f:
+            f.write('cat 500\ncoat 20\n\nice-cream 9\n')
+        self.assertEqual(
+            read_word_counts(list_path), {'CAT': 500.0, 'COAT': 20.0}
+        )
+        with open(list_path, 'w') as f:
+            f.write('cat\ncoat\n')
+        counts = read_word_counts(list_path)
+        self.assertEqual(counts['CAT'], 2 * counts['COAT'])
+
+    def test_shipped_word_frequencies(self):
+        '''
+        Tests if the shipped frequency list reads with
+        its comment lines skipped and ranks common words
+        above rare ones.
+        '''
+        counts = read_word_counts(WORD_FREQUENCY_PATH)
+        self.assertGreater(len(counts), 20000)
+        self.assertEqual(max(counts, key=counts.get), 'THE')
+        self.assertGreater(counts['CAT'], counts['ASCOT'])
+        self.assertTrue(all(word.isalpha() for word in counts))
+
+    def test_frequency_table(self):
+        '''
+        Tests if scores are aligned by word id, rank the
+        most common word highest and leave unknown words
+        at 0, and if a table built for another lexicon is
+        rejected.
+        '''
+        known = build_frequency_table(
+            self.lexicon,
+            {'CAT': 1000, 'COAT': 10, 'ASCOT': 1, 'DOG': 50},
+            self.path
+        )
+        self.assertEqual(known, 3)
+        table = FrequencyTable(self.path, self.lexicon)
+        score = {
+            word: table.score(self.lexicon.word_id(word))
+            for word in TEST_WORDS
+        }
+        self.assertEqual(score['CAT'], MAX_FAMILIARITY)
+        self.assertEqual(score['ASCOT'], 1)
+        self.assertGreater(score['COAT'], score['ASCOT'])
+        self.assertEqual(score['TACO'], 0)
+        other_path = os.path.join(self.tmp_dir.name, 'other.bin')
+        build_lexicon({'DOG'}, [], other_path)
+        self.assertRaises(
+            ValueError, FrequencyTable, self.path, Lexicon(other_path)
+        )
+
+    def test_ranked_words(self):
+        '''
+        Tests if the letter count engine ranks words of the
+        same length most familiar first, by score array or
+        sort key.
+        '''
+        build_frequency_table(
+            self.lexicon, {'TACOS': 100, 'COAT': 50, 'ACT': 20}, self.path
+        )
+        table = FrequencyTable(self.path, self.lexicon)
+        engine = LetterCountEngine(self.lexicon)
+        self.assertEqual(
+            list(engine.iter_words(list('COATS'), ranking=table.scores)),
+            ['TACOS', 'ASCOT', 'COATS', 'COAT', 'TACO', 'ACT', 'CAT']
+        )
+        ranked = list(engine.iter_words(
+            'COATS',
+            key=lambda word: -table.score(self.lexicon.word_id(word))
+        ))
+        self.assertEqual(
+            ranked, list(engine.iter_words('COATS', ranking=table.scores))
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
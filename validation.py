@@ -3,15 +3,56 @@
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 from re import search, findall
 from collections import Counter
+import os
+from concurrent.futures import ThreadPoolExecutor
+# Internal
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from dictionary import DictionaryUnavailable, load_dictionary_provider
+from disk_cache import DiskCache
+from letters_solver import BLANK_TILE
+from lexicon import DEFAULT_LEXICON, get_lexicon
+from profanity_lists import load_profanity_lists
+from profanity_model import (
+    PROFANITY_CACHE_PATH,
+    PROFANITY_SHARED_CACHE_SIZE,
+    CachedProfanityModel,
+    load_profanity_model
+)
 # Third Party
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 from colorama import Fore
-from profanity_check import predict_prob
-from PyDictionary import PyDictionary
 import numexpr as ne
 
-# Create instance of PyDictionary
-dictionary = PyDictionary()
+# Map the profanity model exported from alt-profanity-check,
+# scored with NumPy so scikit-learn is never imported, and
+# keep the scores of repeated texts. The SHARED_PROFANITY_CACHE
+# environment variable also shares phrase scores between
+# processes and runs, which measured slower than memory alone
+# (python benchmark.py profanity_sessions), so it is off
+shared_profanity_cache = None
+if int(os.environ.get('SHARED_PROFANITY_CACHE', 0)):
+    shared_profanity_cache = DiskCache(
+        PROFANITY_CACHE_PATH, PROFANITY_SHARED_CACHE_SIZE
+    )
+profanity_model = CachedProfanityModel(
+    load_profanity_model(), shared_profanity_cache
+)
+# Blocklist and allowlist of the session's lexicon words,
+# None if not built, in which case every text goes to the
+# profanity model
+lexicon_name = os.environ.get('LEXICON', DEFAULT_LEXICON)
+profanity_lists = load_profanity_lists(get_lexicon(lexicon_name), lexicon_name)
+# How many profanity checks each tier decided
+profanity_tiers = Counter()
+# Create the dictionary provider, the bundled local
+# definitions store if built or PyDictionary if not
+dictionary = load_dictionary_provider()
+# Threads looking up meanings ahead of the feedback screens
+DICTIONARY_PREFETCH_WORKERS = 4
+dictionary_pool = ThreadPoolExecutor(
+    max_workers=DICTIONARY_PREFETCH_WORKERS,
+    thread_name_prefix='dictionary'
+)
 
 
 def validate_name(name):
@@ -33,7 +74,7 @@ def validate_name(name):
         Returns False on ValueError.
     """
     try:
-        if check_profanity(name) >= 0.9:
+        if is_profane(name):
             raise ValueError(
                 "That name doesn't pass our profanity check"
             )
@@ -106,15 +147,17 @@ def validate_menu_value(number, current_screen):
         return False
 
 
-def validate_vowels(number):
+def validate_vowels(number, rack_size=9):
     """
     Check player has selected no less than 3 and no
-    more than 9 vowels.
+    more than rack_size vowels.
 
     Parameters
     ----------
     number : string
         Number string input by player.
+    rack_size : int
+        Number of tiles in the letters round.
 
     Returns
     -------
@@ -122,12 +165,15 @@ def validate_vowels(number):
         Returns False on ValueError.
     """
     try:
-        if 3 <= int(number) <= 9:
+        if 3 <= int(number) <= rack_size:
             return True
         else:
             raise ValueError
     except ValueError:
-        print(Fore.RED + 'Please enter only numbers between 3 and 9')
+        print(
+            Fore.RED +
+            f'Please enter only numbers between 3 and {rack_size}'
+        )
         return False
 
 
@@ -142,15 +188,62 @@ def check_profanity(word):
 
     Returns
     -------
-    return predict_prob([word]) : float
+    return profanity_model.predict_prob([word]) : float
         Probablity that a string contains profanity.
     """
-    return predict_prob([word])
+    return profanity_model.predict_prob([word])
+
+
+def is_profane(text):
+    """
+    Check if text is profane, deciding known words with
+    the blocklist and allowlist and only scoring other
+    text with the profanity model.
+
+    Parameters
+    ----------
+    text : string
+        String input by player.
+
+    Returns
+    -------
+    boolean
+        True if the text is profane.
+    """
+    if profanity_lists is not None:
+        if text in profanity_lists.blocklist:
+            profanity_tiers['blocklist'] += 1
+            return True
+        elif text in profanity_lists.allowlist:
+            profanity_tiers['allowlist'] += 1
+            return False
+    profanity_tiers['model'] += 1
+    return bool(check_profanity(text) >= 0.9)
+
+
+def profanity_tier_stats():
+    """
+    Return the fraction of profanity checks each tier
+    decided.
+
+    Returns
+    -------
+    dict
+        blocklist, allowlist and model fractions, and the
+        total number of checks.
+    """
+    checks = sum(profanity_tiers.values())
+    stats = {
+        tier: profanity_tiers[tier] / checks if checks else 0.0
+        for tier in ('blocklist', 'allowlist', 'model')
+    }
+    stats['checks'] = checks
+    return stats
 
 
 def check_dictionary(word):
     """
-    Check if word is used in PyDictionary
+    Check if word is used in the dictionary provider
 
     Parameters
     ----------
@@ -159,20 +252,47 @@ def check_dictionary(word):
 
     Returns
     -------
-    word_meaning : list or None
-        Word meaning if found in PyDictionary.
+    word_meaning : dict, None or False
+        Word meaning if found in the dictionary, None if
+        not found and False if the dictionary didn't
+        answer in time.
     """
     try:
-        word_meaning = dictionary.meaning(word, disable_errors=True)
-    except IndexError:
-        return None
-    else:
-        return word_meaning
+        return dictionary.meaning(word.lower())
+    except DictionaryUnavailable:
+        return False
 
 
-def print_word_meaning(word, new_player=None):
+def prefetch_meanings(words):
     """
-    Check if word is used in PyDictionary
+    Start looking up the meanings of words concurrently
+    so they are ready by the time they're printed.
+
+    Each word is looked up once however many times it
+    appears in words.
+
+    Parameters
+    ----------
+    words : iterable
+        Words to look up.
+
+    Returns
+    -------
+    meanings : dict
+        Lowercase words mapped to futures whose results
+        are what check_dictionary returns for them.
+    """
+    meanings = {}
+    for word in words:
+        word = word.lower()
+        if word not in meanings:
+            meanings[word] = dictionary_pool.submit(check_dictionary, word)
+    return meanings
+
+
+def print_word_meaning(word, new_player=None, word_meaning=None):
+    """
+    Check if word is used in the dictionary
     and print the word length and meaning
 
     Parameters
@@ -181,15 +301,21 @@ def print_word_meaning(word, new_player=None):
         String input by player.
     new_player : object
         Current Player Object.
+    word_meaning : dict
+        Meaning already looked up for word, looked up
+        here if not given.
 
     Returns
     -------
     valid_word: boolean
-        True if word found in PyDictionary
+        True if word found in the dictionary
         and false if not.
     """
-    word_meaning_found = check_dictionary(word.lower())
-    if word_meaning_found is None:
+    if word_meaning is None:
+        word_meaning_found = check_dictionary(word.lower())
+    else:
+        word_meaning_found = word_meaning
+    if not word_meaning_found:
         # Return false so calling function can handle
         # printing no meaning found message
         valid_word = False
@@ -233,7 +359,9 @@ def check_letters_used(word, new_player=None, new_conundrum=None):
     -------
     boolean
         True if word only users letters in
-        conundrum and false if not.
+        conundrum and false if not. Blank tiles
+        in the chosen letters can stand for any
+        letter.
     """
     # Convert user input word and conundrum letters
     # or chosen letters to counter dictionaries
@@ -250,10 +378,14 @@ def check_letters_used(word, new_player=None, new_conundrum=None):
         )
     word_counter = Counter(word.lower())
 
+    # Count the letters the chosen letters are short of,
+    # which the blank tiles have to cover
+    missing = 0
     for char, count in word_counter.items():
-        if char not in chosen_counter or count > chosen_counter[char]:
+        if char == BLANK_TILE:
             return False
-    return True
+        missing += max(count - chosen_counter[char], 0)
+    return missing <= chosen_counter[BLANK_TILE]
 
 
 def validate_numbers(number):
@@ -304,7 +436,7 @@ def validate_user_word(user_word, new_player=None):
         # Check if word is profane
         if check_letters_used(user_word, new_player) is False:
             raise ValueError("You can only user the letters above!")
-        elif check_profanity(user_word) >= 0.9:
+        elif is_profane(user_word):
             raise ValueError(
                 "That word is on our profanity list and is not allowed."
             )
@@ -474,7 +606,7 @@ def validate_user_conundrum(user_word, new_player=None, new_conundrum=None):
         # Check if word is profane
         if check_letters_used(user_word, new_player, new_conundrum) is False:
             raise ValueError("You can only user the letters above!")
-        elif check_profanity(user_word) >= 0.9:
+        elif is_profane(user_word):
             raise ValueError(
                 "That word is on our profanity list and is not allowed."
             )
@@ -491,3 +623,36 @@ def validate_user_conundrum(user_word, new_player=None, new_conundrum=None):
     except ValueError as e:
         print(Fore.LIGHTRED_EX + str(e))
         return False
+
+
+def check_conundrum_answer(user_word, new_conundrum, lexicon):
+    """
+    Check a conundrum guess against the target word and
+    any other word spelt with the same letters.
+
+    Alternatives are found through the lexicon's letter
+    signature index, so no dictionary lookup is needed.
+
+    Parameters
+    ----------
+    user_word : string
+        Solution string input by player.
+    new_conundrum : object
+        Current Conundrum Object.
+    lexicon : object
+        Lexicon with an anagram index.
+
+    Returns
+    -------
+    string or None
+        'target' if the guess is the conundrum word,
+        'valid alternative' if it is another word using
+        all of its letters and None if it isn't a word.
+    """
+    user_word = user_word.upper()
+    target = ''.join(new_conundrum.target).upper()
+    if user_word == target:
+        return 'target'
+    elif user_word in lexicon.anagrams(target):
+        return 'valid alternative'
+    return None
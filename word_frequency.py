@@ -0,0 +1,229 @@
+# Imports
+# Python
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from math import log
+import mmap
+import os
+# Internal
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from lexicon import (
+    DATA_DIR,
+    DEFAULT_LEXICON,
+    LEXICONS,
+    read_section_table,
+    write_artifact
+)
+# Third Party
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+import numpy as np
+
+# Word frequency list used to build the tables, one word
+# per line, most common first, optionally followed by its
+# count. The shipped list is the alphabetic words of the
+# pinned wordfreq 3.1.1 English list, next to this module
+WORD_FREQUENCY_PATH = os.environ.get(
+    'WORD_FREQUENCY_PATH',
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'word_frequencies.txt'
+    )
+)
+# Highest familiarity score, given to the most common word
+MAX_FAMILIARITY = 255
+# Sections every frequency table must contain
+FREQUENCY_SECTIONS = ('lexsum', 'freq')
+# Format version of frequency table artifacts
+FREQUENCY_VERSION = 5
+
+
+class FrequencyTable:
+    """
+    Memory-mapped, read-only familiarity score for each
+    word in a lexicon.
+
+    Scores run from 0 for words no frequency source knows
+    to 255 for the most common word, one byte per word in
+    word id order, so ranking any number of words is a
+    single array lookup.
+
+    Attributes
+    ----------
+    path : string
+        Path to the frequency table artifact.
+    scores : ndarray
+        uint8 familiarity score by word id.
+
+    Methods
+    -------
+    score(word_id)
+        Return the familiarity score of a word id.
+    """
+    def __init__(self, path, lexicon):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        version, checksum, sections = read_section_table(
+            self._mmap, path, FREQUENCY_SECTIONS, FREQUENCY_VERSION
+        )
+        offset, length = sections['lexsum']
+        if self._mmap[offset:offset + length] != lexicon.word_checksum:
+            raise ValueError(f'{path} was built for a different lexicon')
+        offset, length = sections['freq']
+        self.scores = np.frombuffer(
+            self._mmap, dtype=np.uint8, count=length, offset=offset
+        )
+        if len(self.scores) != len(lexicon):
+            raise ValueError(f'{path} has the wrong number of words')
+
+    def score(self, word_id):
+        """
+        Return the familiarity score of a word id.
+
+        Parameters
+        ----------
+        word_id : int
+            Position of the word in sorted order.
+
+        Returns
+        -------
+        int
+            0 for unknown words up to 255.
+        """
+        return int(self.scores[word_id])
+
+
+def frequency_path(name=DEFAULT_LEXICON):
+    """
+    Return the frequency table path of a named lexicon.
+
+    Parameters
+    ----------
+    name : string
+        One of LEXICONS.
+
+    Returns
+    -------
+    string
+        Path of the artifact.
+    """
+    if name not in LEXICONS:
+        raise ValueError(f'LEXICON must be one of {", ".join(LEXICONS)}')
+    return os.path.join(DATA_DIR, f'frequency_{name}.bin')
+
+
+def read_word_counts(path=WORD_FREQUENCY_PATH):
+    """
+    Read a word frequency list.
+
+    Lines hold a word, most common first, optionally
+    followed by how often it was seen. Words without a
+    count are given one from their rank, as word
+    frequencies fall off roughly as one over rank.
+
+    Parameters
+    ----------
+    path : string
+        Path of the frequency list.
+
+    Returns
+    -------
+    counts : dict
+        Uppercase words mapped to counts.
+    """
+    counts = {}
+    with open(path) as f:
+        for rank, line in enumerate(f, 1):
+            fields = line.split()
+            if not fields or not fields[0].isalpha():
+                continue
+            count = float(fields[1]) if len(fields) > 1 else 1e9 / rank
+            word = fields[0].upper()
+            counts[word] = max(counts.get(word, 0), count)
+    return counts
+
+
+def familiarity_scores(lexicon, counts):
+    """
+    Scale word counts to a familiarity score per word id.
+
+    Parameters
+    ----------
+    lexicon : object
+        Lexicon the scores are aligned with.
+    counts : dict
+        Uppercase words mapped to counts.
+
+    Returns
+    -------
+    scores : ndarray
+        uint8 familiarity score by word id, 0 for words
+        without a count.
+    """
+    scores = np.zeros(len(lexicon), dtype=np.uint8)
+    known = {
+        word_id: count for word_id, count in (
+            (lexicon.word_id(word), count) for word, count in counts.items()
+            if count > 0
+        )
+        if word_id is not None
+    }
+    if not known:
+        return scores
+    # Counts span orders of magnitude so score their logs,
+    # keeping 0 for unknown words
+    floor = min(known.values())
+    spread = log(max(known.values()) / floor) or 1
+    for word_id, count in known.items():
+        scores[word_id] = 1 + round(
+            (MAX_FAMILIARITY - 1) * log(count / floor) / spread
+        )
+    return scores
+
+
+def build_frequency_table(lexicon, counts, path):
+    """
+    Write a lexicon's familiarity scores to a frequency
+    table artifact.
+
+    Parameters
+    ----------
+    lexicon : object
+        Lexicon the table is aligned with.
+    counts : dict
+        Uppercase words mapped to counts.
+    path : string
+        Destination path of the artifact.
+
+    Returns
+    -------
+    known : int
+        Number of words with a count.
+    """
+    scores = familiarity_scores(lexicon, counts)
+    write_artifact(path, {
+        'lexsum': lexicon.word_checksum,
+        'freq': scores.tobytes(),
+    }, FREQUENCY_VERSION)
+    return int(np.count_nonzero(scores))
+
+
+def load_frequency_table(lexicon, name=DEFAULT_LEXICON):
+    """
+    Map a lexicon's frequency table.
+
+    Parameters
+    ----------
+    lexicon : object
+        Lexicon the table is aligned with.
+    name : string
+        One of LEXICONS.
+
+    Returns
+    -------
+    object or None
+        FrequencyTable, or None if it hasn't been built
+        for this lexicon.
+    """
+    try:
+        return FrequencyTable(frequency_path(name), lexicon)
+    except (OSError, ValueError):
+        return None